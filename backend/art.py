@@ -1,112 +1,269 @@
-import sys
+#!/usr/bin/env python3
+"""
+Synchronisation du dossier images avec la TV, en ligne de commande.
+Utilise le même catalogue, le même pré-encodage et le même contrôleur TV que le backend.
+
+    python3 art.py                          # envoie (si besoin) et affiche une image au hasard
+    python3 art.py --upload-all             # envoie toutes les images absentes de la TV
+    python3 art.py --upload-all --dry-run   # affiche ce qui serait envoyé, sans rien modifier
+    python3 art.py --debug                  # vérifie que la TV est joignable
+
+Une synchronisation interrompue (Ctrl+C, coupure) reprend là où elle s'était arrêtée:
+les images déjà envoyées sont enregistrées dans le catalogue (remote_filename) et ne
+sont pas renvoyées. Les envois vers la TV se font un par un (la TV n'accepte qu'un
+transfert à la fois); seule la préparation des images suivantes se fait en parallèle.
+"""
+
+import argparse
+import asyncio
 import logging
 import os
 import random
-import json
-import argparse
+import sys
+import time
+from typing import Dict, List
+
+from dotenv import load_dotenv
+
+# art.py fait partie du package backend (imports relatifs)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from backend.budget import StorageBudget
+from backend.catalog import ImageCatalog
+from backend.encoder import FrameEncoder
+from backend.imaging import shutdown_pool
+from backend.transfers import TransferService, TransferError
+from backend.tv_controller import TvController
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+load_dotenv(os.path.join(BASE_DIR, ".env"))
+
+# Mêmes emplacements que le backend
+IMAGE_DIR = os.path.join(BASE_DIR, "images")
+UPLOAD_MAP_PATH = os.path.join(BASE_DIR, "uploaded_files.json")
+CATALOG_DB_PATH = os.getenv("CATALOG_DB_PATH", os.path.join(BASE_DIR, "catalog.db"))
+CACHE_DIR = os.getenv("CACHE_DIR", os.path.join(BASE_DIR, "cache"))
+
+# Réglage du catalogue où est mémorisée la synchronisation en cours
+CHECKPOINT_KEY = "art_sync"
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("art")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Envoie les images du dossier images vers la Samsung Frame.",
+        epilog="Les envois se font un par un (préparation de l'image suivante pendant l'envoi en cours). "
+               "Relancer une synchronisation interrompue reprend avec les images absentes de la TV: "
+               "celles déjà envoyées sont connues du catalogue.",
+    )
+    parser.add_argument("--upload-all", action="store_true",
+                        help="Envoie toutes les images absentes de la TV (reprend une synchronisation interrompue)")
+    parser.add_argument("--dry-run", action="store_true", help="Affiche les changements sans rien envoyer")
+    parser.add_argument("--debug", action="store_true", help="Vérifie que la TV est joignable")
+    parser.add_argument("--tv-ip", default=os.getenv("TV_IP"), help="Adresse IP de la TV (défaut: TV_IP du .env)")
+    return parser.parse_args()
+
+
+def plan(catalog: ImageCatalog) -> Dict[str, List[str]]:
+    """Différence entre le dossier images et le catalogue (lecture seule)"""
+    remote = {entry["file"]: entry["remote_filename"] for entry in catalog.list_all()}
+    # Mappings que l'import de uploaded_files.json ajouterait
+    imported = catalog.preview_json_import(UPLOAD_MAP_PATH)
+    known = set(remote) | set(imported)
+    remote.update(imported)
+    on_disk = sorted(catalog.scan_directory())
+    present = set(on_disk)
+    return {
+        "new": [file for file in on_disk if file not in known],
+        "to_upload": [file for file in on_disk if file in known and not remote[file]],
+        "on_tv": [file for file in on_disk if file in known and remote[file]],
+        "removed": sorted(file for file in known if file not in present),
+    }
+
+
+def print_plan(changes: Dict[str, List[str]]):
+    print("=== Simulation (--dry-run): aucune modification ===")
+    print(f"Déjà sur la TV: {len(changes['on_tv'])}")
+    print(f"Nouvelles images à ajouter au catalogue puis envoyer: {len(changes['new'])}")
+    for file in changes["new"]:
+        print(f"  + {file}")
+    print(f"Images du catalogue à envoyer: {len(changes['to_upload'])}")
+    for file in changes["to_upload"]:
+        print(f"  > {file}")
+    print(f"Images disparues du dossier (retirées du catalogue): {len(changes['removed'])}")
+    for file in changes["removed"]:
+        print(f"  - {file}")
+    print("Les doublons de contenu d'une image déjà envoyée ne seront pas renvoyés.")
+
+
+def print_summary(done: Dict, failed: List[Dict]):
+    elapsed = done.get("elapsed") or 0.0
+    megabytes = done.get("bytes", 0) / (1024 * 1024)
+    print()
+    print(f"=== Synchronisation terminée en {elapsed:.1f}s ===")
+    print(f"Envoyées: {done['sent']}  Déjà présentes: {done['skipped']}  Échecs: {done['failed']}")
+    if elapsed > 0 and done["sent"]:
+        print(f"Débit: {done['sent'] * 60 / elapsed:.1f} images/min, {megabytes / elapsed:.2f} Mo/s "
+              f"({megabytes:.1f} Mo envoyés)")
+    for result in failed:
+        print(f"  ✗ {result['file']}: {result.get('error')}")
+
+
+async def upload_all(catalog: ImageCatalog, transfers: TransferService) -> int:
+    """Envoie toutes les images absentes de la TV (préparation de la suivante pendant chaque envoi)"""
+    checkpoint = catalog.get_setting(CHECKPOINT_KEY)
+    await asyncio.to_thread(catalog.sync_directory)
+
+    # Les images déjà envoyées ont un remote_filename dans le catalogue: le
+    # point de reprise n'a besoin que de la date de début
+    files = sorted(entry["file"] for entry in catalog.list_all() if not entry["remote_filename"])
+    if checkpoint:
+        started = time.strftime("%d/%m %H:%M", time.localtime(checkpoint["started_at"]))
+        logger.info(f"Reprise de la synchronisation du {started}: {len(files)} images restantes")
+    if not files:
+        logger.info("Toutes les images sont déjà sur la TV")
+        catalog.set_setting(CHECKPOINT_KEY, None)
+        return 0
+
+    if not checkpoint:
+        catalog.set_setting(CHECKPOINT_KEY, {"started_at": time.time()})
+    logger.info(f"Envoi de {len(files)} images vers la TV. Cela peut prendre un moment...")
+
+    failed: List[Dict] = []
+    failures = 0
+    async for event in transfers.send_batch(files):
+        if event["event"] == "progress":
+            if event["status"] == "failed":
+                failed.append(event)
+            size = f" ({event['bytes'] / (1024 * 1024):.1f} Mo)" if event.get("bytes") else ""
+            logger.info(f"[{event['completed']}/{event['total']}] {event['file']}: {event['status']}{size}")
+        elif event["event"] == "error":
+            logger.error(event["detail"])
+        elif event["event"] == "done":
+            failures = event["failed"]
+            print_summary(event, failed)
+
+    if not failures:
+        catalog.set_setting(CHECKPOINT_KEY, None)
+        return 0
+    # Les échecs restent sans remote_filename: la prochaine exécution les reprend
+    return 1
+
+
+async def show_random(catalog: ImageCatalog, transfers: TransferService, tv_controller: TvController) -> int:
+    """Envoie si besoin puis affiche une image choisie au hasard"""
+    await asyncio.to_thread(catalog.sync_directory)
+    files = [entry["file"] for entry in catalog.list_all()]
+    if not files:
+        logger.info("Aucune image dans le dossier images")
+        return 0
+    file = random.choice(files)
+    logger.info(f"Image choisie au hasard: {file}")
+    try:
+        remote_filename = await transfers.send(file)
+    except TransferError as exc:
+        logger.error(f"Envoi impossible: {exc.detail}")
+        return 1
+    try:
+        selected = await tv_controller.select_image(remote_filename, show=True)
+    except Exception as exc:
+        logger.error(f"Sélection refusée par la TV: {exc}")
+        return 1
+    if not selected:
+        logger.error("Échec de la sélection via les deux méthodes (directe et SmartThings)")
+        return 1
+    logger.info(f"Image affichée: {remote_filename}")
+    return 0
+
+
+async def check_tv(tv_controller: TvController) -> int:
+    logger.info(f"Vérification de la TV {tv_controller.tv_ip}:{tv_controller.port}")
+    if not await tv_controller.is_reachable():
+        logger.error("La TV ne répond pas sur le réseau")
+        return 1
+    info = await tv_controller.get_device_info()
+    if not info:
+        logger.error("La TV répond mais refuse la connexion (autorisation acceptée sur la TV ?)")
+        return 1
+    logger.info(f"TV joignable: {info}")
+    return 0
+
+
+async def main() -> int:
+    args = parse_args()
+    if args.dry_run:
+        # Base ouverte en lecture seule (en mémoire si elle n'existe pas encore)
+        if os.path.exists(CATALOG_DB_PATH):
+            catalog = ImageCatalog(CATALOG_DB_PATH, IMAGE_DIR, read_only=True)
+        else:
+            catalog = ImageCatalog(":memory:", IMAGE_DIR)
+        try:
+            print_plan(plan(catalog))
+        finally:
+            catalog.close()
+        return 0
+
+    catalog = ImageCatalog(CATALOG_DB_PATH, IMAGE_DIR)
+    try:
+        # Reprendre les mappings écrits par une ancienne version de art.py
+        with catalog.json_lock(UPLOAD_MAP_PATH):
+            catalog.import_json(UPLOAD_MAP_PATH)
+        if not args.tv_ip:
+            logger.error("Adresse IP de la TV manquante (TV_IP dans backend/.env ou --tv-ip)")
+            return 2
+        tv_controller = TvController(
+            tv_ip=args.tv_ip,
+            smartthings_token=os.getenv("SMARTTHINGS_TOKEN"),
+            device_id=os.getenv("SMARTTHINGS_DEVICE_ID"),
+            port=int(os.getenv("TV_PORT", "8002")),
+            smartthings_base_url=os.getenv("SMARTTHINGS_API_BASE", "https://api.smartthings.com/v1"),
+            device_cache_path=os.path.join(CACHE_DIR, "smartthings_devices.json"),
+        )
+
+        async def get_tv_controller() -> TvController:
+            return tv_controller
+
+        encoder = FrameEncoder(
+            os.path.join(CACHE_DIR, "tv"),
+            int(os.getenv("TV_ENCODE_CACHE_MAX_MB", "2048")) * 1024 * 1024,
+            width=int(os.getenv("FRAME_WIDTH", "3840")),
+            height=int(os.getenv("FRAME_HEIGHT", "2160")),
+            fit=os.getenv("FRAME_FIT", "contain"),
+            target_bytes=int(float(os.getenv("FRAME_TARGET_MB", "4")) * 1024 * 1024),
+        )
+        # Même budget de stockage TV que le backend (TV_MAX_IMAGES / TV_MAX_MB)
+        budget = StorageBudget(
+            catalog,
+            get_tv_controller,
+            max_images=int(os.getenv("TV_MAX_IMAGES", "0")),
+            max_bytes=int(float(os.getenv("TV_MAX_MB", "0")) * 1024 * 1024),
+        )
+        tv_controller.listeners.append(budget.art_shown)
+        transfers = TransferService(catalog, encoder, get_tv_controller, budget=budget)
+        try:
+            if args.debug:
+                return await check_tv(tv_controller)
+            if args.upload_all:
+                return await upload_all(catalog, transfers)
+            return await show_random(catalog, transfers, tv_controller)
+        finally:
+            await tv_controller.close()
+            shutdown_pool()
+            # uploaded_files.json reste lisible par les anciens outils
+            with catalog.json_lock(UPLOAD_MAP_PATH):
+                catalog.import_json(UPLOAD_MAP_PATH)
+                catalog.export_json(UPLOAD_MAP_PATH)
+    finally:
+        catalog.close()
+
 
-sys.path.append('../')
-
-from samsungtvws import SamsungTVWS
-
-# Add command line argument parsing
-parser = argparse.ArgumentParser(description='Upload images to Samsung TV.')
-parser.add_argument('--upload-all', action='store_true', help='Upload all images at once')
-parser.add_argument('--debug', action='store_true', help='Enable debug mode to check if TV is reachable')
-args = parser.parse_args()
-
-# Set the path to the folder containing the images
-folder_path = './images/'
-
-# Set the path to the file that will store the list of uploaded filenames
-upload_list_path = './uploaded_files.json'
-
-# Load the list of uploaded filenames from the file
-if os.path.isfile(upload_list_path):
-		with open(upload_list_path, 'r') as f:
-				uploaded_files = json.load(f)
-else:
-		uploaded_files = []
-
-# Increase debug level
-logging.basicConfig(level=logging.INFO)
-
-# Set your TVs local IP address. Highly recommend using a static IP address for your TV.
-tv = SamsungTVWS('192.168.0.9')
-
-# Check if TV is reachable in debug mode
-if args.debug:
-		try:
-				logging.info('Checking if the TV can be reached.')
-				info = tv.rest_device_info()
-				logging.info('If you do not see an error, your TV could be reached.')
-				sys.exit()
-		except Exception as e:
-				logging.error('Could not reach the TV: ' + str(e))
-				sys.exit()
-
-# Checks if the TV supports art mode
-art_mode = tv.art().supported()
-
-if art_mode == True:
-		# Retrieve information about the currently selected art
-		current_art = tv.art().get_current()
-
-		# Get a list of JPG/PNG files in the folder, and searches recursively if you want to use subdirectories
-		files = [os.path.join(root, f) for root, dirs, files in os.walk(folder_path) for f in files if f.endswith('.jpg') or f.endswith('.png')]
-
-		if args.upload_all:
-				logging.info('Bulk uploading all photos. This may take a while...')
-
-				# Remove the filenames of images that have already been uploaded
-				files = list(set(files) - set([f['file'] for f in uploaded_files]))
-				files_to_upload = files
-		else:
-				if len(files) == 0:
-						logging.info('No new images to upload.')
-				else:
-						logging.info('Choosing random image.')
-						files_to_upload = [random.choice(files)]
-
-		for file in files_to_upload:
-				# Read the contents of the file
-				with open(file, 'rb') as f:
-						data = f.read()
-
-				# Upload the file to the TV and select it as the current art, or select it using the remote filename if it has already been uploaded
-				remote_filename = None
-				for uploaded_file in uploaded_files:
-						if uploaded_file['file'] == file:
-								remote_filename = uploaded_file['remote_filename']
-								logging.info('Image already uploaded.')
-								break
-				if remote_filename is None:
-						logging.info('Uploading new image: ' + str(file))
-
-						try:
-							if file.endswith('.jpg'):
-									remote_filename = tv.art().upload(data, file_type='JPEG', matte="none")
-							elif file.endswith('.png'):
-									remote_filename = tv.art().upload(data, file_type='PNG', matte="none")
-						except Exception as e:
-							logging.error('There was an error: ' + str(e))
-							sys.exit()
-							
-						# Add the filename to the list of uploaded filenames
-						uploaded_files.append({'file': file, 'remote_filename': remote_filename})
-
-						if not args.upload_all:
-							# Select the uploaded image using the remote file name
-							tv.art().select_image(remote_filename, show=False)
-
-				else:
-						if not args.upload_all:
-								# Select the image using the remote file name only if not in 'upload-all' mode
-								logging.info('Setting existing image, skipping upload')
-								tv.art().select_image(remote_filename, show=True)
-
-				# Save the list of uploaded filenames to the file
-				with open(upload_list_path, 'w') as f:
-						json.dump(uploaded_files, f)
-else:
-		logging.warning('Your TV does not support art mode.')
\ No newline at end of file
+if __name__ == "__main__":
+    try:
+        sys.exit(asyncio.run(main()))
+    except KeyboardInterrupt:
+        logger.warning("Interrompu: relancer la même commande pour reprendre")
+        sys.exit(130)
@@ -0,0 +1,133 @@
+# Budget de stockage des images sur la TV (éviction LRU)
+
+import asyncio
+import logging
+from typing import Optional, Dict, Any, Awaitable, Callable
+
+from .catalog import ImageCatalog
+from .scheduler import SchedulerBusy, CommandCancelled
+from .tv_controller import TvController
+
+logger = logging.getLogger(__name__)
+
+
+class StorageBudgetError(Exception):
+    """Place insuffisante sur la TV, avec le code HTTP correspondant"""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class StorageBudget:
+    """
+    Limite le nombre d'images (`max_images`) et la place occupée (`max_bytes`)
+    sur la TV; 0 désactive la limite. Avant un envoi qui dépasserait le budget,
+    les images les moins récemment affichées sont supprimées de la TV. Les
+    favoris de la TV, les images épinglées, l'image affichée et les images
+    envoyées par d'autres clients (sans copie locale pour les renvoyer) ne
+    sont jamais supprimés.
+    """
+
+    def __init__(self, catalog: ImageCatalog, get_controller: Callable[[], Awaitable[TvController]],
+                 max_images: int = 0, max_bytes: int = 0):
+        self.catalog = catalog
+        self.get_controller = get_controller
+        self.max_images = max_images
+        self.max_bytes = max_bytes
+        self.evicted = 0
+        self.current: Optional[str] = None
+        # Place réservée par les envois en cours (pas encore enregistrés dans le catalogue)
+        self.reserved_images = 0
+        self.reserved_bytes = 0
+        self._lock = asyncio.Lock()
+
+    def art_shown(self, event: str, data: Dict[str, Any]):
+        """Abonné aux événements du contrôleur: compte les affichages de chaque image"""
+        if event != "current-art":
+            return
+        content_id = (data.get("current_art") or {}).get("content_id")
+        if content_id and content_id != self.current:
+            self.current = content_id
+            self.catalog.record_shown(content_id)
+
+    async def make_room(self, incoming_bytes: int):
+        """
+        Libère la place nécessaire à un nouvel envoi de `incoming_bytes` octets et
+        la réserve jusqu'à release(), une fois l'envoi enregistré ou échoué.
+        """
+        async with self._lock:
+            await self._free(incoming_bytes)
+            self.reserved_images += 1
+            self.reserved_bytes += incoming_bytes
+
+    def release(self, incoming_bytes: int):
+        """Rend la place réservée par make_room()"""
+        self.reserved_images -= 1
+        self.reserved_bytes -= incoming_bytes
+
+    async def _free(self, incoming_bytes: int):
+        if not self.max_images and not self.max_bytes:
+            return
+        usage = await asyncio.to_thread(self.catalog.storage_usage)
+        # Les envois en cours ne figurent pas encore dans le catalogue
+        images = usage["images"] + self.reserved_images + 1
+        total = usage["bytes"] + self.reserved_bytes + incoming_bytes
+        need_images = images - self.max_images if self.max_images else 0
+        need_bytes = total - self.max_bytes if self.max_bytes else 0
+        if need_images <= 0 and need_bytes <= 0:
+            return
+
+        tv_controller = await self.get_controller()
+        if self.current is None:
+            # Aucun événement current-art reçu depuis le démarrage: ne pas supprimer l'image affichée
+            try:
+                current = await tv_controller.get_current_art()
+            except (SchedulerBusy, CommandCancelled):
+                raise
+            except Exception as exc:
+                logger.warning(f"Image affichée inconnue ({exc!r})")
+                current = None
+            if isinstance(current, dict) and current.get("content_id"):
+                self.current = current["content_id"]
+        candidates = await asyncio.to_thread(self.catalog.eviction_candidates, self.current)
+        if self.current is None:
+            # Image affichée inconnue: la dernière image affichée est sans doute encore à l'écran
+            shown = [candidate for candidate in candidates if candidate["last_shown"] is not None]
+            if shown:
+                candidates.remove(max(shown, key=lambda candidate: candidate["last_shown"]))
+        average = usage["bytes"] // usage["images"] if usage["images"] else 0
+        victims = []
+        for candidate in candidates:
+            if need_images <= 0 and need_bytes <= 0:
+                break
+            victims.append(candidate["content_id"])
+            need_images -= 1
+            need_bytes -= candidate["size"] if candidate["size"] is not None else average
+        if need_images > 0 or need_bytes > 0:
+            raise StorageBudgetError(
+                507, "Espace TV insuffisant: les images restantes sont épinglées, favorites ou sans copie locale")
+
+        try:
+            deleted = await tv_controller.delete_images(victims)
+        except (SchedulerBusy, CommandCancelled):
+            raise
+        except Exception as exc:
+            # Refus de la TV (ex: image déjà supprimée): la prochaine réconciliation corrigera le catalogue
+            raise StorageBudgetError(502, f"Suppression refusée par la TV: {exc}")
+        if not deleted:
+            raise StorageBudgetError(503, "Impossible de libérer de la place sur la TV (connexion directe requise)")
+        await asyncio.to_thread(self.catalog.forget_remote, victims)
+        self.evicted += len(victims)
+        logger.info(f"{len(victims)} images supprimées de la TV pour respecter le budget: {victims}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            **self.catalog.storage_usage(),
+            "max_images": self.max_images,
+            "max_bytes": self.max_bytes,
+            "reserved_images": self.reserved_images,
+            "reserved_bytes": self.reserved_bytes,
+            "evicted": self.evicted,
+        }
@@ -0,0 +1,642 @@
+# Catalogue des images locales
+
+import base64
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import urllib.parse
+import uuid
+from typing import Optional, Dict, List, Any
+
+try:
+    import fcntl
+except ImportError:  # Windows: pas de verrou entre processus
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+
+# Clés de tri exposées par l'API -> colonnes SQL (le nom de fichier sert de départage)
+SORT_COLUMNS = {"name": "file", "added": "added_at", "size": "size"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS images (
+    file TEXT PRIMARY KEY,
+    content_hash TEXT,
+    remote_filename TEXT,
+    size INTEGER NOT NULL DEFAULT 0,
+    mtime REAL NOT NULL DEFAULT 0,
+    added_at REAL NOT NULL,
+    mapped_at REAL  -- date d'enregistrement de remote_filename
+);
+CREATE INDEX IF NOT EXISTS idx_images_content_hash ON images(content_hash);
+CREATE INDEX IF NOT EXISTS idx_images_remote_filename ON images(remote_filename);
+CREATE INDEX IF NOT EXISTS idx_images_added_at ON images(added_at, file);
+CREATE INDEX IF NOT EXISTS idx_images_size ON images(size, file);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS remote_art (
+    content_id TEXT PRIMARY KEY,
+    file TEXT,
+    info TEXT,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    size INTEGER,
+    select_count INTEGER NOT NULL DEFAULT 0,
+    last_shown REAL,
+    favourite INTEGER NOT NULL DEFAULT 0,
+    pinned INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_remote_art_file ON remote_art(file);
+CREATE TABLE IF NOT EXISTS playlists (
+    name TEXT PRIMARY KEY,
+    files TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+class InvalidCursor(ValueError):
+    """Curseur de pagination illisible ou incompatible avec le tri demandé"""
+
+
+def _encode_cursor(sort: str, key: Any, file: str) -> str:
+    raw = json.dumps([sort, key, file], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str, sort: str) -> tuple:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_sort, key, file = json.loads(raw)
+    except Exception as e:
+        raise InvalidCursor(f"Curseur invalide: {e}")
+    if cursor_sort != sort:
+        raise InvalidCursor("Le curseur ne correspond pas au tri demandé")
+    return key, file
+
+
+def hash_file(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """Calcule le hash SHA-256 d'un fichier par blocs"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as fp:
+        for chunk in iter(lambda: fp.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ImageCatalog:
+    """
+    Catalogue SQLite des images locales et de leur correspondance sur la TV.
+    Les recherches par nom de fichier, hash de contenu et remote_filename sont indexées.
+    """
+
+    def __init__(self, db_path: str, image_dir: str, read_only: bool = False):
+        self.db_path = db_path
+        self.image_dir = image_dir
+        self._lock = threading.RLock()
+        if read_only:
+            # Lecture seule (art.py --dry-run): pas de création de la base.
+            # Sans journal WAL à relire (base fermée proprement), immutable=1 évite que
+            # SQLite crée les fichiers -wal et -shm; sinon le backend tourne (ou s'est
+            # arrêté brutalement) et ces fichiers existent déjà: mode=ro les lit.
+            path = os.path.abspath(db_path)
+            mode = "mode=ro" if os.path.exists(f"{path}-wal") else "immutable=1"
+            uri = f"file:{urllib.parse.quote(path)}?{mode}"
+            self._conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            self._conn.row_factory = sqlite3.Row
+            self.catalog_id = self._get_meta("catalog_id")
+            return
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        # Journal WAL: chaque transaction est ajoutée en fin de journal (pas de réécriture
+        # de la base), un crash ne laisse jamais la base à moitié écrite. Avec
+        # synchronous=NORMAL le fsync n'a lieu qu'aux checkpoints.
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._lock, self._conn:
+            self._conn.executescript(_SCHEMA)
+            self.catalog_id = self._get_meta("catalog_id")
+            if self.catalog_id is None:
+                self.catalog_id = uuid.uuid4().hex[:12]
+                self._set_meta("catalog_id", self.catalog_id)
+
+    @property
+    def revision(self) -> int:
+        """Révision du catalogue, lue dans la base (art.py écrit la même base depuis un autre processus)"""
+        with self._lock:
+            return int(self._get_meta("revision") or 0)
+
+    @property
+    def etag(self) -> str:
+        """ETag faible dérivé de l'état du catalogue"""
+        return f'W/"{self.catalog_id}-{self.revision}"'
+
+    # ------------------------------------------------------------------
+    # Utilitaires
+    # ------------------------------------------------------------------
+
+    def _relative(self, path: str) -> Optional[str]:
+        """Convertit un chemin en nom relatif à image_dir (None si hors du dossier)"""
+        rel = os.path.relpath(os.path.abspath(path), os.path.abspath(self.image_dir))
+        if rel.startswith(os.pardir):
+            return None
+        return rel.replace(os.sep, "/")
+
+    def path_for(self, file: str) -> str:
+        """Chemin absolu d'une image du catalogue"""
+        return os.path.join(self.image_dir, *file.split("/"))
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else None
+
+    def _set_meta(self, key: str, value: str):
+        self._conn.execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, value),
+        )
+
+    def _bump_revision(self):
+        """Incrémente la révision du catalogue (à appeler dans une transaction)"""
+        # Incrément dans la base: deux processus ne peuvent pas obtenir la même révision
+        self._conn.execute(
+            "INSERT INTO meta (key, value) VALUES ('revision', 1) "
+            "ON CONFLICT(key) DO UPDATE SET value = CAST(meta.value AS INTEGER) + 1"
+        )
+
+    # ------------------------------------------------------------------
+    # Migration et synchronisation
+    # ------------------------------------------------------------------
+
+    @contextlib.contextmanager
+    def json_lock(self, json_path: str):
+        """
+        Verrou exclusif entre processus sur uploaded_files.json: à tenir de
+        l'import jusqu'à l'export pour ne pas écraser les mappings écrits
+        entre-temps par art.py.
+        """
+        with open(json_path + ".lock", "a") as fp:
+            if fcntl:
+                fcntl.flock(fp, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(fp, fcntl.LOCK_UN)
+
+    def import_json(self, json_path: str) -> int:
+        """
+        Importe les mappings de uploaded_files.json (format art.py) s'il a été
+        modifié depuis le dernier import ou export. Les mappings déjà connus
+        du catalogue ne sont pas écrasés.
+        """
+        with self._lock:
+            if not os.path.isfile(json_path):
+                return 0
+            mtime = str(os.stat(json_path).st_mtime_ns)
+            if self._get_meta("json_mtime") == mtime:
+                return 0
+
+            mappings = self._read_json(json_path)
+            if mappings is None:
+                return 0
+            imported = 0
+            now = time.time()
+            with self._conn:
+                for file, remote_filename in mappings.items():
+                    imported += self._conn.execute(
+                        "INSERT INTO images (file, remote_filename, added_at, mapped_at) VALUES (?, ?, ?, ?) "
+                        "ON CONFLICT(file) DO UPDATE SET remote_filename = excluded.remote_filename, "
+                        "mapped_at = excluded.mapped_at WHERE images.remote_filename IS NULL",
+                        (file, remote_filename, now, now),
+                    ).rowcount
+                self._set_meta("json_mtime", mtime)
+                if imported:
+                    self._bump_revision()
+
+            logger.info(f"Import de {json_path}: {imported} mappings importés")
+            return imported
+
+    def _read_json(self, json_path: str) -> Optional[Dict[str, str]]:
+        """Mappings valides de uploaded_files.json, par chemin relatif au dossier images (None si illisible)"""
+        try:
+            with open(json_path, "r", encoding="utf-8") as fp:
+                mappings: List[Dict[str, Any]] = json.load(fp)
+        except (OSError, ValueError) as e:
+            logger.error(f"Lecture de {json_path} impossible: {e}")
+            return None
+
+        base_dir = os.path.dirname(os.path.abspath(json_path))
+        result = {}
+        for mapping in mappings:
+            path = mapping.get("file")
+            remote_filename = mapping.get("remote_filename")
+            if not path or not remote_filename:
+                continue
+            # art.py enregistre des chemins relatifs (./images/...)
+            if not os.path.isabs(path):
+                path = os.path.join(base_dir, path)
+            file = self._relative(path)
+            if file is None:
+                logger.warning(f"Mapping ignoré (hors du dossier images): {mapping['file']}")
+                continue
+            result.setdefault(file, remote_filename)
+        return result
+
+    def preview_json_import(self, json_path: str) -> Dict[str, str]:
+        """Mappings que import_json() ajouterait, sans rien écrire (simulation)"""
+        with self._lock:
+            if not os.path.isfile(json_path):
+                return {}
+            json_mtime = self._get_meta("json_mtime")
+            if json_mtime == str(os.stat(json_path).st_mtime_ns):
+                return {}
+            mapped = {
+                row["file"]
+                for row in self._conn.execute("SELECT file FROM images WHERE remote_filename IS NOT NULL")
+            }
+        mappings = self._read_json(json_path) or {}
+        return {file: remote for file, remote in mappings.items() if file not in mapped}
+
+    def export_json(self, json_path: str) -> int:
+        """
+        Écrit les mappings envoyés sur la TV dans uploaded_files.json (format art.py).
+        Écriture atomique: fichier temporaire, fsync puis renommage.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT file, remote_filename FROM images WHERE remote_filename IS NOT NULL ORDER BY file"
+            ).fetchall()
+
+        base_dir = os.path.dirname(os.path.abspath(json_path))
+        prefix = os.path.relpath(os.path.abspath(self.image_dir), base_dir).replace(os.sep, "/")
+        mappings = [{"file": f"./{prefix}/{row['file']}", "remote_filename": row["remote_filename"]} for row in rows]
+
+        fd, tmp_path = tempfile.mkstemp(prefix=".uploaded_files-", dir=base_dir)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as fp:
+                json.dump(mappings, fp)
+                fp.flush()
+                os.fsync(fp.fileno())
+            os.replace(tmp_path, json_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+        # Ne pas réimporter notre propre export au prochain démarrage
+        with self._lock, self._conn:
+            self._set_meta("json_mtime", str(os.stat(json_path).st_mtime_ns))
+        return len(mappings)
+
+    def checkpoint(self):
+        """Reporte le journal WAL dans la base puis le tronque"""
+        with self._lock:
+            busy, pages, _ = self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+        if busy:
+            logger.warning("Checkpoint du catalogue incomplet (base occupée)")
+        return pages
+
+    def scan_directory(self) -> Dict[str, os.stat_result]:
+        """Images du dossier et de ses sous-dossiers (chemins relatifs avec /), hors fichiers cachés"""
+        found = {}
+        for root, dirs, files in os.walk(self.image_dir):
+            dirs[:] = [name for name in dirs if not name.startswith(".")]
+            for name in files:
+                if name.startswith(".") or not name.lower().endswith(IMAGE_EXTENSIONS):
+                    continue
+                path = os.path.join(root, name)
+                found[self._relative(path)] = os.stat(path)
+        return found
+
+    def sync_directory(self) -> Dict[str, int]:
+        """Synchronise le catalogue avec le contenu du dossier images"""
+        with self._lock:
+            known = {
+                row["file"]: row
+                for row in self._conn.execute("SELECT file, content_hash, size, mtime FROM images")
+            }
+
+        seen = set()
+        added = updated = 0
+        for file, stat in self.scan_directory().items():
+            seen.add(file)
+            row = known.get(file)
+            if row and row["content_hash"] and row["size"] == stat.st_size and row["mtime"] == stat.st_mtime:
+                continue
+            if row is None:
+                added += 1
+            else:
+                updated += 1
+            self.add_file(file)
+
+        removed = [file for file in known if file not in seen]
+        if removed:
+            with self._lock, self._conn:
+                self._conn.executemany("DELETE FROM images WHERE file = ?", ((file,) for file in removed))
+                self._bump_revision()
+
+        result = {"added": added, "updated": updated, "removed": len(removed), "total": len(seen)}
+        logger.info(f"Synchronisation du catalogue: {result}")
+        return result
+
+    # ------------------------------------------------------------------
+    # Écritures
+    # ------------------------------------------------------------------
+
+    def add_file(self, file: str, content_hash: Optional[str] = None) -> Dict[str, Any]:
+        """Ajoute ou rafraîchit une image du dossier dans le catalogue"""
+        path = self.path_for(file)
+        stat = os.stat(path)
+        if content_hash is None:
+            content_hash = hash_file(path)
+
+        with self._lock, self._conn:
+            previous = self._conn.execute(
+                "SELECT content_hash FROM images WHERE file = ?", (file,)
+            ).fetchone()
+            if previous and previous["content_hash"] and previous["content_hash"] != content_hash:
+                # Le contenu a changé: l'image présente sur la TV ne correspond plus
+                logger.info(f"Contenu modifié pour {file}, mapping TV invalidé")
+                self._conn.execute("UPDATE images SET remote_filename = NULL WHERE file = ?", (file,))
+            self._conn.execute(
+                "INSERT INTO images (file, content_hash, size, mtime, added_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(file) DO UPDATE SET content_hash = excluded.content_hash, "
+                "size = excluded.size, mtime = excluded.mtime",
+                (file, content_hash, stat.st_size, stat.st_mtime, time.time()),
+            )
+            # Un contenu identique déjà présent sur la TV n'a pas besoin d'être renvoyé
+            self._conn.execute(
+                "UPDATE images SET (remote_filename, mapped_at) = ("
+                "  SELECT remote_filename, mapped_at FROM images"
+                "  WHERE content_hash = ? AND remote_filename IS NOT NULL LIMIT 1"
+                ") WHERE file = ? AND remote_filename IS NULL",
+                (content_hash, file),
+            )
+            self._bump_revision()
+        return self.get(file)
+
+    def set_remote(self, file: str, remote_filename: Optional[str], size: Optional[int] = None):
+        """Enregistre l'identifiant TV d'une image (et de toutes ses copies de même contenu)"""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE images SET remote_filename = ?, mapped_at = ? WHERE file = ? OR content_hash = ("
+                "  SELECT content_hash FROM images WHERE file = ?"
+                ")",
+                (remote_filename, now if remote_filename else None, file, file),
+            )
+            if remote_filename:
+                self._conn.execute(
+                    "INSERT INTO remote_art (content_id, file, size, first_seen, last_seen) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT(content_id) DO UPDATE SET file = excluded.file, last_seen = excluded.last_seen, "
+                    "size = COALESCE(excluded.size, remote_art.size)",
+                    (remote_filename, file, size, now, now),
+                )
+            self._bump_revision()
+
+    def apply_tv_inventory(self, items: List[Dict[str, Any]], favourites: Optional[List[str]] = None,
+                           fetched_at: Optional[float] = None) -> Dict[str, int]:
+        """
+        Aligne le catalogue sur la liste des images présentes sur la TV, demandée à `fetched_at`:
+        - les mappings vers une image supprimée de la TV sont effacés (elle sera renvoyée),
+          sauf ceux enregistrés après `fetched_at` (envois terminés pendant la requête);
+        - les images envoyées par d'autres clients sont adoptées (sans fichier local);
+        - les favoris de la TV sont repris si `favourites` est fourni.
+        """
+        present = {item["content_id"]: item for item in items if item.get("content_id")}
+        now = time.time()
+        if fetched_at is None:
+            fetched_at = now
+        with self._lock, self._conn:
+            self._conn.execute("CREATE TEMP TABLE IF NOT EXISTS tv_present (content_id TEXT PRIMARY KEY)")
+            self._conn.execute("DELETE FROM tv_present")
+            self._conn.executemany("INSERT INTO tv_present VALUES (?)", ((cid,) for cid in present))
+
+            stale = self._conn.execute(
+                "UPDATE images SET remote_filename = NULL, mapped_at = NULL WHERE remote_filename IS NOT NULL "
+                "AND COALESCE(mapped_at, 0) < ? AND remote_filename NOT IN (SELECT content_id FROM tv_present)",
+                (fetched_at,),
+            ).rowcount
+            forgotten = self._conn.execute(
+                "DELETE FROM remote_art WHERE last_seen < ? AND content_id NOT IN (SELECT content_id FROM tv_present)",
+                (fetched_at,),
+            ).rowcount
+            known = {
+                row["content_id"]
+                for row in self._conn.execute("SELECT content_id FROM remote_art")
+            }
+            adopted = 0
+            for content_id, item in present.items():
+                if content_id in known:
+                    self._conn.execute(
+                        "UPDATE remote_art SET info = ?, last_seen = ? WHERE content_id = ?",
+                        (json.dumps(item), now, content_id),
+                    )
+                    continue
+                row = self._conn.execute(
+                    "SELECT file FROM images WHERE remote_filename = ? LIMIT 1", (content_id,)
+                ).fetchone()
+                self._conn.execute(
+                    "INSERT INTO remote_art (content_id, file, info, first_seen, last_seen) VALUES (?, ?, ?, ?, ?)",
+                    (content_id, row["file"] if row else None, json.dumps(item), now, now),
+                )
+                if row is None:
+                    adopted += 1
+            if favourites is not None:
+                self._conn.execute("UPDATE remote_art SET favourite = 0")
+                self._conn.executemany(
+                    "UPDATE remote_art SET favourite = 1 WHERE content_id = ?", ((cid,) for cid in favourites)
+                )
+            self._conn.execute("DELETE FROM tv_present")
+            if stale:
+                self._bump_revision()
+        return {"on_tv": len(present), "stale": stale, "forgotten": forgotten, "adopted": adopted}
+
+    def forget_remote(self, content_ids: List[str]):
+        """Oublie des images supprimées de la TV (elles seront renvoyées si besoin)"""
+        with self._lock, self._conn:
+            for content_id in content_ids:
+                self._conn.execute("UPDATE images SET remote_filename = NULL WHERE remote_filename = ?", (content_id,))
+                self._conn.execute("DELETE FROM remote_art WHERE content_id = ?", (content_id,))
+            self._bump_revision()
+
+    def record_shown(self, content_id: str):
+        """Compte un affichage de l'image sur la TV (pour l'éviction LRU)"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE remote_art SET select_count = select_count + 1, last_shown = ? WHERE content_id = ?",
+                (time.time(), content_id),
+            )
+
+    def set_pinned(self, content_id: str, pinned: bool) -> bool:
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "UPDATE remote_art SET pinned = ? WHERE content_id = ?", (int(pinned), content_id)
+            ).rowcount > 0
+
+    def storage_usage(self) -> Dict[str, int]:
+        """Nombre d'images sur la TV et place occupée (taille moyenne pour les images de taille inconnue)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) AS images, COUNT(size) AS sized, COALESCE(SUM(size), 0) AS bytes FROM remote_art"
+            ).fetchone()
+        images, sized, total = row["images"], row["sized"], row["bytes"]
+        if sized and sized < images:
+            total += (images - sized) * (total // sized)
+        return {"images": images, "bytes": total, "unknown_size": images - sized}
+
+    def eviction_candidates(self, exclude: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Images supprimables de la TV, de la moins récemment affichée à la plus récente.
+        Seules les images envoyées par ce backend (avec un fichier local) sont candidates.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT content_id, file, size, select_count, last_shown FROM remote_art "
+                "WHERE pinned = 0 AND favourite = 0 AND file IS NOT NULL AND content_id != ? "
+                "ORDER BY COALESCE(last_shown, first_seen), select_count, content_id",
+                (exclude or "",),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def list_remote_art(self) -> List[Dict[str, Any]]:
+        """Images présentes sur la TV lors de la dernière réconciliation"""
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM remote_art ORDER BY first_seen, content_id").fetchall()
+        return [{**dict(row), "info": json.loads(row["info"]) if row["info"] else None} for row in rows]
+
+    # ------------------------------------------------------------------
+    # Lectures
+    # ------------------------------------------------------------------
+
+    def get(self, file: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM images WHERE file = ?", (file,)).fetchone()
+        return dict(row) if row else None
+
+    def find_by_hash(self, content_hash: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM images WHERE content_hash = ?", (content_hash,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def find_existing(self, content_hash: str) -> Optional[Dict[str, Any]]:
+        """Image déjà présente sur disque pour ce contenu (de préférence déjà envoyée sur la TV)"""
+        for entry in sorted(self.find_by_hash(content_hash), key=lambda e: e["remote_filename"] is None):
+            if os.path.exists(self.path_for(entry["file"])):
+                return entry
+        return None
+
+    def find_by_remote(self, remote_filename: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM images WHERE remote_filename = ?", (remote_filename,)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def list_all(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM images ORDER BY file").fetchall()
+        return [dict(row) for row in rows]
+
+    def list_page(
+        self,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        sort: str = "name",
+        order: str = "asc",
+        status: Optional[str] = None,
+        query: Optional[str] = None,
+    ) -> tuple:
+        """
+        Retourne une page d'images et le curseur de la page suivante (pagination par clé).
+        Le coût dépend de la taille de la page, pas de celle de la bibliothèque.
+        """
+        column = SORT_COLUMNS[sort]
+        descending = order == "desc"
+        clauses = []
+        params: List[Any] = []
+
+        if cursor:
+            key, file = _decode_cursor(cursor, sort)
+            clauses.append(f"({column}, file) {'<' if descending else '>'} (?, ?)")
+            params.extend([key, file])
+        if status == "remote":
+            clauses.append("remote_filename IS NOT NULL")
+        elif status == "local":
+            clauses.append("remote_filename IS NULL")
+        if query:
+            clauses.append("file LIKE ? ESCAPE '\\'")
+            escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            params.append(f"%{escaped}%")
+
+        direction = "DESC" if descending else "ASC"
+        sql = "SELECT * FROM images"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += f" ORDER BY {column} {direction}, file {direction} LIMIT ?"
+        params.append(limit + 1)
+
+        with self._lock:
+            rows = [dict(row) for row in self._conn.execute(sql, params).fetchall()]
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = _encode_cursor(sort, last[column], last["file"])
+        return rows, next_cursor
+
+    # ------------------------------------------------------------------
+    # Playlists et réglages
+    # ------------------------------------------------------------------
+
+    def save_playlist(self, name: str, files: List[str]) -> Dict[str, Any]:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO playlists (name, files, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET files = excluded.files, updated_at = excluded.updated_at",
+                (name, json.dumps(files), time.time()),
+            )
+        return self.get_playlist(name)
+
+    def get_playlist(self, name: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM playlists WHERE name = ?", (name,)).fetchone()
+        return {**dict(row), "files": json.loads(row["files"])} if row else None
+
+    def list_playlists(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM playlists ORDER BY name").fetchall()
+        return [{**dict(row), "files": json.loads(row["files"])} for row in rows]
+
+    def delete_playlist(self, name: str) -> bool:
+        with self._lock, self._conn:
+            return self._conn.execute("DELETE FROM playlists WHERE name = ?", (name,)).rowcount > 0
+
+    def get_setting(self, key: str) -> Optional[Any]:
+        """Réglage persistant (valeur JSON) stocké dans la table meta"""
+        with self._lock:
+            value = self._get_meta(f"setting:{key}")
+        return json.loads(value) if value is not None else None
+
+    def set_setting(self, key: str, value: Any):
+        with self._lock, self._conn:
+            self._set_meta(f"setting:{key}", json.dumps(value))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,93 @@
+# Disjoncteur (circuit breaker) pour les chemins de communication avec la TV
+
+import logging
+import time
+from typing import Optional, Dict, Any, Callable
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    État de santé d'un chemin (direct, SmartThings):
+    - closed: les requêtes passent normalement;
+    - open: après `failure_threshold` échecs consécutifs, le chemin est ignoré
+      jusqu'à la prochaine sonde;
+    - half_open: une seule requête sert de sonde. Succès -> closed,
+      échec -> open avec un délai de sonde doublé (jusqu'à `max_delay`).
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 2,
+                 base_delay: float = 5.0, max_delay: float = 300.0, probe_timeout: float = 60.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.probe_timeout = probe_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_count = 0  # ouvertures consécutives, pour le délai exponentiel
+        self.next_probe_at = 0.0
+        self.probe_started_at = 0.0
+        self.last_error: Optional[str] = None
+        self.last_change = time.time()
+        self.on_change: Optional[Callable[[], None]] = None  # appelé à chaque changement d'état
+
+    def _set_state(self, state: str):
+        if state != self.state:
+            logger.info(f"Chemin {self.name}: {self.state} -> {state}")
+            self.state = state
+            self.last_change = time.time()
+            if self.on_change:
+                self.on_change()
+
+    def allow(self) -> bool:
+        """Indique si une requête peut emprunter ce chemin maintenant"""
+        if self.state == CLOSED:
+            return True
+        now = time.monotonic()
+        if self.state == OPEN and now >= self.next_probe_at:
+            self._set_state(HALF_OPEN)
+            self.probe_started_at = now
+            return True
+        if self.state == HALF_OPEN and now - self.probe_started_at >= self.probe_timeout:
+            # La sonde précédente n'a jamais rendu de résultat (annulée)
+            self.probe_started_at = now
+            return True
+        # Ouvert, ou sonde déjà en cours
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_count = 0
+        self.last_error = None
+        self._set_state(CLOSED)
+
+    def record_failure(self, error: Any = None):
+        self.failures += 1
+        if error is not None:
+            self.last_error = str(error)
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            delay = min(self.max_delay, self.base_delay * 2 ** self.opened_count)
+            self.opened_count += 1
+            self.next_probe_at = time.monotonic() + delay
+            if self.state != OPEN:
+                logger.warning(f"Chemin {self.name} désactivé, nouvelle sonde dans {delay:.0f}s ({self.last_error})")
+            self._set_state(OPEN)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """État exposé par /api/tv-status"""
+        retry_in = None
+        if self.state == OPEN:
+            retry_in = round(max(0.0, self.next_probe_at - time.monotonic()), 1)
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "last_error": self.last_error,
+            "retry_in": retry_in,
+            "since": self.last_change,
+        }
@@ -0,0 +1,98 @@
+# Cache disque borné en taille (éviction LRU)
+
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class DiskCache:
+    """
+    Cache de fichiers sur disque, borné en octets.
+    L'ordre LRU est tenu en mémoire et persisté via le mtime des fichiers,
+    ce qui permet de le reconstruire au démarrage.
+    """
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+        self._load()
+
+    def _load(self):
+        """Reconstruit l'index LRU à partir du contenu du dossier"""
+        found = []
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                if name.startswith(".tmp"):
+                    # Reste d'une écriture interrompue
+                    os.unlink(os.path.join(dirpath, name))
+                    continue
+                stat = os.stat(os.path.join(dirpath, name))
+                found.append((stat.st_mtime, name, stat.st_size))
+        for _, name, size in sorted(found):
+            self._entries[name] = size
+            self.total_bytes += size
+        logger.info(f"Cache {self.root}: {len(self._entries)} fichiers, {self.total_bytes} octets")
+        self._evict()
+
+    def path_for(self, key: str) -> str:
+        # Répartition en sous-dossiers pour éviter des répertoires géants
+        return os.path.join(self.root, key[:2], key)
+
+    def get(self, key: str) -> Optional[str]:
+        """Retourne le chemin du fichier en cache (et le marque comme récent)"""
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+        path = self.path_for(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                size = self._entries.pop(key, 0)
+                self.total_bytes -= size
+            return None
+        return path
+
+    def put(self, key: str, data: bytes) -> str:
+        """Écrit atomiquement une entrée puis applique la limite de taille"""
+        path = self.path_for(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=".tmp", dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, "wb") as fp:
+                fp.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+        with self._lock:
+            self.total_bytes -= self._entries.pop(key, 0)
+            self._entries[key] = len(data)
+            self.total_bytes += len(data)
+        self._evict()
+        return path
+
+    def _evict(self):
+        while True:
+            with self._lock:
+                if self.total_bytes <= self.max_bytes or len(self._entries) <= 1:
+                    return
+                key, size = self._entries.popitem(last=False)
+                self.total_bytes -= size
+            try:
+                os.unlink(self.path_for(key))
+            except FileNotFoundError:
+                pass
+            logger.debug(f"Cache {self.root}: éviction de {key}")
@@ -0,0 +1,62 @@
+# Pré-encodage des images au format natif de la Frame avant envoi
+
+import asyncio
+import logging
+from typing import Dict
+
+from .disk_cache import DiskCache
+from .imaging import get_pool, encode_for_frame
+
+logger = logging.getLogger(__name__)
+
+
+class FrameEncoder:
+    """
+    Transcode les images en JPEG à la résolution du panneau (3840x2160 par défaut)
+    avec une qualité adaptée à une taille cible. Le résultat est mis en cache
+    par hash de contenu: un renvoi vers la TV ne réencode pas l'image.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int, width: int = 3840, height: int = 2160,
+                 fit: str = "contain", target_bytes: int = 4 * 1024 * 1024):
+        self.cache = DiskCache(cache_dir, max_bytes)
+        self.width = width
+        self.height = height
+        self.fit = fit
+        self.target_bytes = target_bytes
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def cache_key(self, content_hash: str) -> str:
+        return f"{content_hash}_{self.width}x{self.height}_{self.fit}_{self.target_bytes}.jpg"
+
+    async def encode(self, source_path: str, content_hash: str) -> bytes:
+        """Retourne les octets JPEG prêts à être envoyés à la TV"""
+        key = self.cache_key(content_hash)
+        path = self.cache.get(key)
+        if path:
+            try:
+                return await asyncio.to_thread(_read_file, path)
+            except FileNotFoundError:
+                pass  # évincé entre-temps, on réencode
+
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._encode(key, source_path))
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        path = await asyncio.shield(future)
+        return await asyncio.to_thread(_read_file, path)
+
+    async def _encode(self, key: str, source_path: str) -> str:
+        loop = asyncio.get_running_loop()
+        data = await loop.run_in_executor(
+            get_pool(), encode_for_frame, source_path, self.width, self.height, self.fit, self.target_bytes
+        )
+        path = await asyncio.to_thread(self.cache.put, key, data)
+        logger.info(f"Image préparée pour la TV: {key} ({len(data)} octets)")
+        return path
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as fp:
+        return fp.read()
@@ -0,0 +1,52 @@
+# Diffusion des changements d'état aux clients connectés (Server-Sent Events)
+
+import asyncio
+import logging
+from typing import Dict, Any, Set
+
+logger = logging.getLogger(__name__)
+
+class EventBroker:
+    """
+    Diffuse chaque événement à tous les abonnés. Une seule source côté TV
+    (la connexion directe supervisée) alimente un nombre quelconque de clients.
+    Le dernier message de chaque type d'état est rejoué aux nouveaux abonnés.
+    """
+
+    # Types dont la dernière valeur décrit l'état courant (rejoués à l'abonnement)
+    STATEFUL = ("current-art", "art-mode", "connection-health", "slideshow")
+
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._last: Dict[str, Dict[str, Any]] = {}
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        for event in self.STATEFUL:
+            if event in self._last:
+                queue.put_nowait((event, self._last[event]))
+        self._subscribers.add(queue)
+        logger.info(f"Nouvel abonné aux événements ({len(self._subscribers)} connectés)")
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+        logger.info(f"Abonné aux événements déconnecté ({len(self._subscribers)} connectés)")
+
+    def publish(self, event: str, data: Dict[str, Any]):
+        """Publie un événement (non bloquant, utilisable depuis n'importe quelle coroutine)"""
+        self.published += 1
+        if event in self.STATEFUL:
+            self._last[event] = data
+        for queue in self._subscribers:
+            if queue.full():
+                # Client trop lent: on sacrifie le plus ancien message plutôt que de bloquer
+                queue.get_nowait()
+                self.dropped += 1
+            queue.put_nowait((event, data))
+
+    def stats(self) -> Dict[str, Any]:
+        return {"subscribers": len(self._subscribers), "published": self.published, "dropped": self.dropped}
@@ -0,0 +1,102 @@
+# Traitements d'images exécutés dans un pool de processus
+
+import io
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """Pool de processus partagé pour le décodage et le redimensionnement"""
+    global _pool
+    if _pool is None:
+        workers = int(os.getenv("IMAGE_WORKERS", "0")) or None
+        logger.info(f"Démarrage du pool de traitement d'images (workers={workers or os.cpu_count()})")
+        _pool = ProcessPoolExecutor(max_workers=workers)
+    return _pool
+
+
+def shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def render_thumbnail(path: str, size: int, fmt: str) -> bytes:
+    """Génère une miniature tenant dans un carré size x size (exécuté dans le pool)"""
+    with Image.open(path) as source:
+        # draft() laisse le décodeur JPEG réduire l'image dès le décodage
+        source.draft("RGB", (size, size))
+        image = ImageOps.exif_transpose(source)
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        image.thumbnail((size, size), Image.Resampling.LANCZOS)
+
+    buffer = io.BytesIO()
+    if fmt == "webp":
+        image.save(buffer, format="WEBP", quality=80, method=4)
+    else:
+        image.save(buffer, format="JPEG", quality=82, optimize=True, progressive=True)
+    return buffer.getvalue()
+
+
+def encode_for_frame(path: str, width: int, height: int, fit: str, target_bytes: int) -> bytes:
+    """
+    Prépare une image pour la Frame (exécuté dans le pool): JPEG à la résolution
+    native du panneau, avec la meilleure qualité qui tient dans target_bytes.
+    """
+    with Image.open(path) as source:
+        # Déjà au format natif et assez léger: envoyer l'original tel quel
+        if (
+            source.format == "JPEG"
+            and source.size == (width, height)
+            and os.path.getsize(path) <= target_bytes
+            and source.getexif().get(0x0112, 1) == 1
+        ):
+            with open(path, "rb") as fp:
+                return fp.read()
+
+        source.draft("RGB", (width, height))
+        image = ImageOps.exif_transpose(source)
+        if image.mode in ("RGBA", "LA", "P"):
+            # Aplatir la transparence sur fond noir (comme le cadre de la TV)
+            image = image.convert("RGBA")
+            background = Image.new("RGB", image.size, (0, 0, 0))
+            background.paste(image, mask=image.getchannel("A"))
+            image = background
+        elif image.mode != "RGB":
+            image = image.convert("RGB")
+
+    if fit == "cover":
+        image = ImageOps.fit(image, (width, height), Image.Resampling.LANCZOS)
+    else:
+        image = ImageOps.pad(image, (width, height), Image.Resampling.LANCZOS, color=(0, 0, 0))
+
+    def encode(quality: int) -> bytes:
+        buffer = io.BytesIO()
+        image.save(buffer, format="JPEG", quality=quality, optimize=True, subsampling="4:2:0")
+        return buffer.getvalue()
+
+    # Recherche dichotomique de la qualité la plus haute sous la taille cible
+    best = encode(95)
+    if len(best) <= target_bytes:
+        return best
+    low, high = 50, 94
+    best = encode(low)
+    while low <= high:
+        quality = (low + high) // 2
+        data = encode(quality)
+        if len(data) <= target_bytes:
+            best = data
+            low = quality + 1
+        else:
+            high = quality - 1
+    return best
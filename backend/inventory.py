@@ -0,0 +1,95 @@
+# Réconciliation du catalogue avec les images réellement présentes sur la TV
+
+import asyncio
+import logging
+import time
+from typing import Optional, Dict, Any, Awaitable, Callable
+
+from .catalog import ImageCatalog
+from .tv_controller import TvController
+
+logger = logging.getLogger(__name__)
+
+
+class ArtInventory:
+    """
+    Compare périodiquement la liste des images de la TV (available) au catalogue:
+    les mappings vers des images supprimées sur la TV sont effacés, les images
+    envoyées par d'autres clients sont adoptées. La réconciliation a lieu à
+    chaque (re)connexion directe puis toutes les `interval` secondes, jamais
+    pendant une requête.
+    """
+
+    def __init__(self, catalog: ImageCatalog, get_controller: Callable[[], Awaitable[TvController]],
+                 interval: float = 600.0, on_change: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.catalog = catalog
+        self.get_controller = get_controller
+        self.interval = interval
+        self.on_change = on_change  # appelé avec le résultat quand le catalogue a changé
+        self.last_result: Optional[Dict[str, Any]] = None
+        self.last_run: Optional[float] = None
+        self._requested = asyncio.Event()
+        self._connected = False
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def request(self):
+        """Demande une réconciliation dès que possible (ex: image introuvable sur la TV)"""
+        self._requested.set()
+
+    def connection_changed(self, event: str, data: Dict[str, Any]):
+        """Abonné aux événements du contrôleur: réconcilie à chaque nouvelle connexion directe"""
+        if event != "connection-health":
+            return
+        connected = data["direct"]["connected"]
+        if connected and not self._connected:
+            self.request()
+        self._connected = connected
+
+    async def reconcile(self) -> Optional[Dict[str, Any]]:
+        """Réconcilie maintenant; None si la TV n'a pas pu fournir sa liste"""
+        async with self._lock:
+            tv_controller = await self.get_controller()
+            # Les envois terminés après cette date ne peuvent pas figurer dans la liste
+            fetched_at = time.time()
+            items = await tv_controller.available_art()
+            if items is None:
+                logger.info("Réconciliation du catalogue reportée: liste des images TV indisponible")
+                return None
+            # Favoris de la TV: jamais supprimés par le budget de stockage
+            favourites = await tv_controller.available_art("MY-C0004")
+            if favourites is not None:
+                favourites = [item["content_id"] for item in favourites if item.get("content_id")]
+            result = await asyncio.to_thread(self.catalog.apply_tv_inventory, items, favourites, fetched_at)
+            self.last_result = result
+            self.last_run = time.time()
+            if result["stale"] or result["adopted"] or result["forgotten"]:
+                logger.info(f"Catalogue réconcilié avec la TV: {result}")
+                if self.on_change:
+                    self.on_change(result)
+            return result
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._requested.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._requested.clear()
+            try:
+                await self.reconcile()
+            except Exception as e:
+                logger.warning(f"Réconciliation du catalogue impossible: {e}")
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"last_run": self.last_run, "last_result": self.last_result, "interval": self.interval}
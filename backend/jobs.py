@@ -0,0 +1,290 @@
+# File de travaux persistante pour les opérations TV
+
+import asyncio
+import json
+import logging
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Optional, Dict, List, Any, Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_run_at REAL NOT NULL,
+    last_error TEXT,
+    result TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_due ON jobs(status, next_run_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_created ON jobs(created_at);
+"""
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+
+class PermanentJobError(Exception):
+    """Échec qui ne sera pas résolu par une nouvelle tentative (fichier absent, format invalide...)"""
+
+
+class JobQueue:
+    """
+    File de travaux (upload, select...) persistée dans SQLite.
+    Les travaux survivent à un redémarrage du backend, sont réessayés avec un
+    délai exponentiel et sont relancés dès que la TV redevient joignable.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        handlers: Dict[str, JobHandler],
+        is_reachable: Callable[[], Awaitable[bool]],
+        workers: int = 1,
+        max_attempts: int = 8,
+        base_delay: float = 5.0,
+        max_delay: float = 600.0,
+        probe_interval: float = 15.0,
+        on_change: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ):
+        self.handlers = handlers
+        self.is_reachable = is_reachable
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.probe_interval = probe_interval
+        self.on_change = on_change  # appelé avec le travail à chaque changement de statut
+        self.tv_reachable = True
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.executescript(_SCHEMA)
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+
+    # ------------------------------------------------------------------
+    # Accès au stockage
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def _update(self, job_id: str, **fields):
+        fields["updated_at"] = time.time()
+        assignments = ", ".join(f"{key} = ?" for key in fields)
+        with self._lock, self._conn:
+            self._conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+        if "status" in fields:
+            self._changed(job_id)
+
+    def _changed(self, job_id: str):
+        if self.on_change is None:
+            return
+        try:
+            self.on_change(self.get(job_id))
+        except Exception as exc:
+            logger.warning(f"Erreur de notification du travail {job_id}: {exc}")
+
+    def enqueue(self, kind: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Ajoute un travail (ou retourne le travail identique déjà en attente)"""
+        if kind not in self.handlers:
+            raise ValueError(f"Type de travail inconnu: {kind}")
+        encoded = json.dumps(payload, sort_keys=True)
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT * FROM jobs WHERE kind = ? AND payload = ? AND status IN ('pending', 'running')",
+                (kind, encoded),
+            ).fetchone()
+            if row:
+                return self._to_dict(row)
+            job_id = uuid.uuid4().hex
+            self._conn.execute(
+                "INSERT INTO jobs (id, kind, payload, status, next_run_at, created_at, updated_at) "
+                "VALUES (?, ?, ?, 'pending', ?, ?, ?)",
+                (job_id, kind, encoded, now, now, now),
+            )
+        logger.info(f"Travail {kind} ajouté à la file: {job_id} {payload}")
+        self._wakeup.set()
+        self._changed(job_id)
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def list(self, status: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        sql = "SELECT * FROM jobs"
+        params: List[Any] = []
+        if status:
+            sql += " WHERE status = ?"
+            params.append(status)
+        sql += " ORDER BY created_at DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        return {row["status"]: row["n"] for row in rows}
+
+    def _claim_next(self) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT * FROM jobs WHERE status = 'pending' AND next_run_at <= ? "
+                "ORDER BY next_run_at, created_at LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                (now, row["id"]),
+            )
+        job = self._to_dict(row)
+        job["attempts"] += 1
+        self._changed(job["id"])
+        return job
+
+    def _next_due_in(self) -> Optional[float]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MIN(next_run_at) AS due FROM jobs WHERE status = 'pending'"
+            ).fetchone()
+        if row["due"] is None:
+            return None
+        return max(0.0, row["due"] - time.time())
+
+    def _release_all(self, reason: str):
+        """Rend immédiatement exécutables les travaux en attente"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET next_run_at = ?, updated_at = ? WHERE status = 'pending'",
+                (time.time(), time.time()),
+            )
+        logger.info(f"Relance des travaux en attente: {reason}")
+        self._wakeup.set()
+
+    # ------------------------------------------------------------------
+    # Exécution
+    # ------------------------------------------------------------------
+
+    async def start(self):
+        # Reprise après redémarrage: les travaux interrompus repartent en attente
+        with self._lock, self._conn:
+            resumed = self._conn.execute(
+                "UPDATE jobs SET status = 'pending', next_run_at = ?, updated_at = ? WHERE status = 'running'",
+                (time.time(), time.time()),
+            ).rowcount
+        if resumed:
+            logger.info(f"{resumed} travaux interrompus remis en file")
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._watch_reachability()))
+        logger.info(f"File de travaux démarrée ({self.workers} worker(s), {self.counts()})")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        with self._lock:
+            self._conn.close()
+
+    async def _wait(self, timeout: Optional[float]):
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _worker(self, index: int):
+        while True:
+            if not self.tv_reachable:
+                # Inutile de consommer des tentatives tant que la TV est injoignable
+                await self._wait(None)
+                continue
+
+            job = self._claim_next()
+            if job is None:
+                await self._wait(self._next_due_in())
+                continue
+
+            logger.info(f"Worker {index}: exécution du travail {job['kind']} {job['id']} (tentative {job['attempts']})")
+            try:
+                result = await self.handlers[job["kind"]](job["payload"])
+            except asyncio.CancelledError:
+                self._update(job["id"], status="pending", attempts=job["attempts"] - 1)
+                raise
+            except PermanentJobError as exc:
+                if await self._probe():
+                    logger.error(f"Travail {job['id']} en échec définitif: {exc}")
+                    self._update(job["id"], status="failed", last_error=str(exc))
+                    continue
+                # Réponse d'une TV injoignable: l'échec n'est pas fiable, le travail sera réessayé
+                self._requeue(job, exc)
+                self._suspend()
+                continue
+            except Exception as exc:
+                if await self._probe():
+                    self._retry_later(job, exc)
+                else:
+                    self._requeue(job, exc)
+                    self._suspend()
+                continue
+
+            logger.info(f"Travail {job['id']} terminé: {result}")
+            self._update(job["id"], status="done", result=json.dumps(result), last_error=None)
+
+    def _suspend(self):
+        self.tv_reachable = False
+        logger.warning("TV injoignable, travaux suspendus jusqu'à son retour")
+
+    def _retry_later(self, job: Dict[str, Any], exc: Exception):
+        if job["attempts"] >= self.max_attempts:
+            logger.error(f"Travail {job['id']} abandonné après {job['attempts']} tentatives: {exc}")
+            self._update(job["id"], status="failed", last_error=str(exc))
+            return
+        delay = min(self.max_delay, self.base_delay * 2 ** (job["attempts"] - 1))
+        delay *= random.uniform(0.8, 1.2)
+        logger.warning(f"Travail {job['id']} en erreur ({exc}), nouvelle tentative dans {delay:.1f}s")
+        self._update(job["id"], status="pending", last_error=str(exc), next_run_at=time.time() + delay)
+
+    def _requeue(self, job: Dict[str, Any], exc: Exception):
+        """Échec pendant que la TV était injoignable: la tentative n'est pas comptée"""
+        logger.warning(f"Travail {job['id']} interrompu, TV injoignable ({exc})")
+        self._update(job["id"], status="pending", attempts=job["attempts"] - 1, last_error=str(exc),
+                     next_run_at=time.time())
+
+    async def _probe(self) -> bool:
+        try:
+            return await self.is_reachable()
+        except Exception:
+            return False
+
+    async def _watch_reachability(self):
+        """Surveille la TV tant qu'elle est injoignable et relance la file à son retour"""
+        while True:
+            await asyncio.sleep(self.probe_interval)
+            if self.tv_reachable or not self.counts().get("pending"):
+                continue
+            if await self._probe():
+                self.tv_reachable = True
+                self._release_all("TV de nouveau joignable")
@@ -1,18 +1,35 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 import os
 import json
-from typing import List
+from typing import Any, Dict, List, Literal, Optional, Tuple
 from dotenv import load_dotenv
-import requests
 from samsungtvws.async_art import SamsungTVAsyncArt
 from fastapi.staticfiles import StaticFiles
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 import logging
 import asyncio
 import base64
+import re
+import uuid
 import traceback
+import weakref
 from .tv_controller import TvController
+from .scheduler import SchedulerBusy
+from .catalog import ImageCatalog, InvalidCursor
+from .persistence import CatalogPersistence
+from .thumbnails import ThumbnailService, THUMBNAIL_SIZES, THUMBNAIL_FORMATS
+from .imaging import shutdown_pool
+from .encoder import FrameEncoder
+from .transfers import TransferService, TransferError
+from .jobs import JobQueue, PermanentJobError
+from .unsplash import UnsplashClient, UnsplashError
+from .uploads import UploadSink, UploadError, receive_multipart_file, remove_stale_uploads
+from .events import EventBroker
+from .slideshow import SlideshowEngine
+from .inventory import ArtInventory
+from .budget import StorageBudget
 
 # Load environment variables (.env at project root)
 load_dotenv()
@@ -34,6 +51,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
 # Middleware pour capturer les erreurs non gérées
@@ -47,6 +65,11 @@ async def catch_exceptions_middleware(request, call_next):
         logger.error(f"Traceback complet:\n{traceback.format_exc()}")
         raise HTTPException(status_code=500, detail=f"Erreur interne du serveur: {exc}")
 
+# File de commandes TV pleine: le client réessaie plus tard
+@app.exception_handler(SchedulerBusy)
+async def scheduler_busy_handler(request: Request, exc: SchedulerBusy):
+    return JSONResponse(status_code=exc.status_code, content={"detail": exc.detail}, headers={"Retry-After": "2"})
+
 # Configuration des logs
 logging.basicConfig(
     level=logging.INFO,
@@ -57,6 +80,9 @@ logger = logging.getLogger(__name__)
 # Ajouter des logs plus détaillés pour les erreurs
 import traceback
 
+# Diffusion des changements d'état (TV, envois) aux clients de /api/events
+events = EventBroker()
+
 # Instantiate the TV controller once
 _tv_controller: TvController | None = None
 
@@ -69,8 +95,15 @@ async def get_tv_controller() -> TvController:
             _tv_controller = TvController(
                 tv_ip=TV_IP,
                 smartthings_token=SMARTTHINGS_TOKEN,
-                device_id=SMARTTHINGS_DEVICE_ID
+                device_id=SMARTTHINGS_DEVICE_ID,
+                port=int(os.getenv("TV_PORT", "8002")),
+                smartthings_base_url=os.getenv("SMARTTHINGS_API_BASE", "https://api.smartthings.com/v1"),
+                device_cache_path=os.path.join(CACHE_DIR, "smartthings_devices.json"),
+                device_cache_ttl=float(os.getenv("SMARTTHINGS_DEVICE_CACHE_TTL", "86400")),
             )
+            _tv_controller.listeners.append(events.publish)
+            _tv_controller.listeners.append(inventory.connection_changed)
+            _tv_controller.listeners.append(storage_budget.art_shown)
             logger.info("Contrôleur TV créé avec succès")
         except Exception as e:
             logger.error(f"Erreur lors de la création du contrôleur TV: {e}")
@@ -84,79 +117,275 @@ async def get_tv_controller() -> TvController:
 IMAGE_DIR = os.path.join(os.path.dirname(__file__), "images")
 os.makedirs(IMAGE_DIR, exist_ok=True)
 
-# File that persists the mapping between local file and remote filename
+# Taille maximale acceptée par /api/upload (les images sont réencodées avant l'envoi à la TV)
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_MB", "30")) * 1024 * 1024
+
+# Fichier de mapping local/remote partagé avec art.py (synchronisé avec le catalogue)
 UPLOAD_MAP_PATH = os.path.join(os.path.dirname(__file__), "uploaded_files.json")
 
-# Load persisted mapping
-if os.path.isfile(UPLOAD_MAP_PATH):
-    with open(UPLOAD_MAP_PATH, "r", encoding="utf-8") as fp:
-        uploaded_files: List[dict] = json.load(fp)
-else:
-    uploaded_files = []
+# Catalogue SQLite des images locales et de leur identifiant sur la TV
+CATALOG_DB_PATH = os.getenv("CATALOG_DB_PATH", os.path.join(os.path.dirname(__file__), "catalog.db"))
+catalog = ImageCatalog(CATALOG_DB_PATH, IMAGE_DIR)
+with catalog.json_lock(UPLOAD_MAP_PATH):
+    catalog.import_json(UPLOAD_MAP_PATH)
+
+# Export différé de uploaded_files.json (pour art.py) et compaction du journal
+catalog_persistence = CatalogPersistence(
+    catalog,
+    UPLOAD_MAP_PATH,
+    export_delay=float(os.getenv("UPLOAD_MAP_EXPORT_DELAY", "2")),
+)
+
+# Cache disque des miniatures (indexé par hash de contenu, éviction LRU)
+CACHE_DIR = os.getenv("CACHE_DIR", os.path.join(os.path.dirname(__file__), "cache"))
+THUMBNAIL_CACHE_MAX_MB = int(os.getenv("THUMBNAIL_CACHE_MAX_MB", "512"))
+thumbnails = ThumbnailService(os.path.join(CACHE_DIR, "thumbnails"), THUMBNAIL_CACHE_MAX_MB * 1024 * 1024)
+
+# Variantes pré-encodées pour la TV (résolution native du panneau, taille cible)
+TV_ENCODE_CACHE_MAX_MB = int(os.getenv("TV_ENCODE_CACHE_MAX_MB", "2048"))
+frame_encoder = FrameEncoder(
+    os.path.join(CACHE_DIR, "tv"),
+    TV_ENCODE_CACHE_MAX_MB * 1024 * 1024,
+    width=int(os.getenv("FRAME_WIDTH", "3840")),
+    height=int(os.getenv("FRAME_HEIGHT", "2160")),
+    fit=os.getenv("FRAME_FIT", "contain"),
+    target_bytes=int(float(os.getenv("FRAME_TARGET_MB", "4")) * 1024 * 1024),
+)
+
+# Budget de stockage sur la TV (0: illimité); les images les moins affichées sont supprimées d'abord
+storage_budget = StorageBudget(
+    catalog,
+    get_tv_controller,
+    max_images=int(os.getenv("TV_MAX_IMAGES", "0")),
+    max_bytes=int(float(os.getenv("TV_MAX_MB", "0")) * 1024 * 1024),
+)
+
+transfers = TransferService(catalog, frame_encoder, get_tv_controller, budget=storage_budget)
+
+
+async def _run_upload_job(payload: dict) -> dict:
+    try:
+        remote_filename = await transfers.send(payload["filename"])
+    except TransferError as exc:
+        # 429: file des commandes TV pleine, le travail sera réessayé
+        if exc.status_code < 500 and exc.status_code != 429:
+            raise PermanentJobError(exc.detail)
+        raise
+    return {"file": payload["filename"], "remote_filename": remote_filename}
+
+
+async def _run_select_job(payload: dict) -> dict:
+    tv_controller = await get_tv_controller()
+    if not await tv_controller.select_image(payload["remote_filename"], show=payload.get("show", True)):
+        inventory.request()
+        raise RuntimeError("Échec de la sélection via les deux méthodes (directe et SmartThings)")
+    return {"remote_filename": payload["remote_filename"]}
+
+
+def _publish_job(job: dict):
+    if job and job["kind"] == "upload":
+        events.publish("upload-progress", {"job": job})
+
+
+async def _tv_reachable() -> bool:
+    return await (await get_tv_controller()).is_reachable()
+
+
+# Client Unsplash partagé (connexions persistantes, cache TTL, préchargement des populaires)
+unsplash = UnsplashClient(
+    UNSPLASH_ACCESS_KEY,
+    base_url=os.getenv("UNSPLASH_API_BASE", "https://api.unsplash.com"),
+    ttl=float(os.getenv("UNSPLASH_CACHE_TTL", "300")),
+)
+
+# Nombre de photos Unsplash téléchargées simultanément lors d'un import
+UNSPLASH_IMPORT_CONCURRENCY = int(os.getenv("UNSPLASH_IMPORT_CONCURRENCY", "3"))
+_unsplash_import_slots = asyncio.Semaphore(UNSPLASH_IMPORT_CONCURRENCY)
+UNSPLASH_ID_PATTERN = re.compile(r"[A-Za-z0-9_-]+")
+
+# File persistante des opérations TV (reprise après redémarrage, relance au retour de la TV)
+JOBS_DB_PATH = os.getenv("JOBS_DB_PATH", os.path.join(os.path.dirname(__file__), "jobs.db"))
+job_queue = JobQueue(
+    JOBS_DB_PATH,
+    handlers={"upload": _run_upload_job, "select": _run_select_job},
+    is_reachable=_tv_reachable,
+    on_change=_publish_job,
+)
+
+# Réconciliation du catalogue avec les images présentes sur la TV (à la connexion puis périodiquement)
+inventory = ArtInventory(
+    catalog,
+    get_tv_controller,
+    interval=float(os.getenv("TV_RECONCILE_INTERVAL", "600")),
+    on_change=lambda result: events.publish("tv-art", result),
+)
+
+# Diaporama côté serveur (les prochaines images sont préchargées sur la TV)
+slideshow = SlideshowEngine(
+    catalog,
+    transfers,
+    get_tv_controller,
+    lookahead=int(os.getenv("SLIDESHOW_LOOKAHEAD", "2")),
+    on_change=lambda state: events.publish("slideshow", state),
+    inventory=inventory,
+)
 
 
-def save_uploaded_map():
-    with open(UPLOAD_MAP_PATH, "w", encoding="utf-8") as fp:
-        json.dump(uploaded_files, fp, ensure_ascii=False, indent=2)
+@app.on_event("startup")
+async def startup_event():
+    logger.info("Synchronisation du catalogue avec le dossier images")
+    await asyncio.to_thread(catalog.sync_directory)
+    await asyncio.to_thread(remove_stale_uploads, IMAGE_DIR)
+    catalog_persistence.start()
+    # Ouvre la connexion directe à la TV dès le démarrage (supervisée ensuite)
+    (await get_tv_controller()).start()
+    inventory.start()
+    await job_queue.start()
+    unsplash.start()
+    slideshow.start()
 
 
 class ImageItem(BaseModel):
     file: str  # local filepath
     remote_filename: str | None = None  # identifier on the TV
+    duplicate: bool = False  # contenu déjà présent dans la bibliothèque
 
 
-@app.get("/api/images", response_model=List[ImageItem])
-async def list_images():
-    """Liste toutes les images locales, ainsi que leur remote_filename si déjà téléversées."""
-    logger.info("Récupération de la liste des images locales")
-    # Scan local files (jpg/png)
-    local_files = [f for f in os.listdir(IMAGE_DIR) if f.lower().endswith((".jpg", ".jpeg", ".png"))]
-    logger.info(f"Trouvé {len(local_files)} fichiers locaux")
-    
-    items: List[ImageItem] = []
-    for fname in local_files:
-        full_path = os.path.join(IMAGE_DIR, fname)
-        mapping = next((m for m in uploaded_files if os.path.abspath(m["file"]) == os.path.abspath(full_path)), None)
-        items.append(
-            ImageItem(
-                file=fname,
-                remote_filename=mapping["remote_filename"] if mapping else None,
-            )
+class ImagePage(BaseModel):
+    items: List[ImageItem]
+    next_cursor: Optional[str] = None  # à renvoyer pour obtenir la page suivante
+
+
+@app.get("/api/images", response_model=ImagePage)
+async def list_images(
+    request: Request,
+    response: Response,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    sort: Literal["name", "added", "size"] = "name",
+    order: Literal["asc", "desc"] = "asc",
+    status: Optional[Literal["local", "remote"]] = None,
+    q: Optional[str] = None,
+):
+    """Liste paginée des images locales, avec leur remote_filename si déjà téléversées."""
+    etag = catalog.etag
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+
+    logger.info(f"Récupération des images locales (limit={limit}, sort={sort} {order}, status={status})")
+    try:
+        entries, next_cursor = catalog.list_page(
+            limit=limit, cursor=cursor, sort=sort, order=order, status=status, query=q
         )
-    logger.info(f"Retour de {len(items)} éléments")
-    return items
+    except InvalidCursor as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
 
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+    logger.info(f"Retour de {len(entries)} éléments")
+    return ImagePage(
+        items=[ImageItem(file=entry["file"], remote_filename=entry["remote_filename"]) for entry in entries],
+        next_cursor=next_cursor,
+    )
 
-@app.post("/api/upload", response_model=ImageItem)
-async def upload_image(file: UploadFile = File(...)):
-    """Téléverse une nouvelle image localement seulement."""
-    logger.info(f"Début upload: {file.filename}, type: {file.content_type}")
-    
-    if file.content_type not in ["image/jpeg", "image/png"]:
-        logger.error(f"Type de fichier non supporté: {file.content_type}")
-        raise HTTPException(status_code=400, detail="Seuls les fichiers JPEG ou PNG sont autorisés")
 
-    # Save file locally
-    ext = ".jpg" if file.content_type == "image/jpeg" else ".png"
-    filename = file.filename or f"image{ext}"
+# Un verrou par contenu: deux réceptions simultanées du même fichier ne créent pas deux copies
+# (libéré dès qu'aucune réception de ce contenu n'est en cours)
+_content_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+
+async def _store_upload(sink: UploadSink, filename: str) -> Tuple[Dict[str, Any], bool]:
+    """
+    Enregistre un fichier reçu dans le catalogue, sauf si son contenu y est déjà.
+    Retourne (entrée du catalogue, doublon).
+    """
+    async with _content_locks.setdefault(sink.content_hash, asyncio.Lock()):
+        # Déduplication par contenu: pas de seconde copie locale ni de second envoi TV
+        existing = await asyncio.to_thread(catalog.find_existing, sink.content_hash)
+        if existing:
+            await asyncio.to_thread(sink.abort)
+            return existing, True
+        final_name = await asyncio.to_thread(sink.commit, filename)
+        entry = await asyncio.to_thread(catalog.add_file, final_name, content_hash=sink.content_hash)
+        return entry, False
+
+
+@app.post(
+    "/api/upload",
+    response_model=ImageItem,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "properties": {"file": {"type": "string", "format": "binary"}},
+                        "required": ["file"],
+                    }
+                }
+            },
+        }
+    },
+)
+async def upload_image(request: Request):
+    """Téléverse une nouvelle image localement seulement (réception en flux)."""
+    logger.info("Début upload")
+    sink = await asyncio.to_thread(UploadSink, IMAGE_DIR, MAX_UPLOAD_BYTES)
+    try:
+        client_filename = await receive_multipart_file(request, "file", sink)
+        logger.info(f"Fichier reçu: {client_filename}, type détecté: {sink.mime_type}, taille: {sink.size} bytes")
+        entry, duplicate = await _store_upload(sink, client_filename)
+    except UploadError as exc:
+        await asyncio.to_thread(sink.abort)
+        logger.error(f"Upload refusé: {exc.detail}")
+        raise HTTPException(status_code=exc.status_code, detail=exc.detail)
+    except BaseException:
+        await asyncio.to_thread(sink.abort)
+        raise
+
+    if duplicate:
+        logger.info(f"Contenu déjà présent: {entry['file']} (remote_filename: {entry['remote_filename']})")
+        return ImageItem(file=entry["file"], remote_filename=entry["remote_filename"], duplicate=True)
+    filename = entry["file"]
     local_path = os.path.join(IMAGE_DIR, filename)
-    i = 1
-    while os.path.exists(local_path):
-        filename = f"{os.path.splitext(file.filename)[0]}_{i}{ext}"
-        local_path = os.path.join(IMAGE_DIR, filename)
-        i += 1
-
-    logger.info(f"Sauvegarde locale: {local_path}")
-    contents = await file.read()
-    logger.info(f"Taille du fichier: {len(contents)} bytes")
-    
-    with open(local_path, "wb") as fp:
-        fp.write(contents)
+    thumbnails.warm(local_path, entry["content_hash"])
 
     logger.info(f"Upload local terminé avec succès: {filename}")
     return ImageItem(file=filename, remote_filename=None)
 
 
+@app.get("/api/thumbnails/{file:path}")
+async def get_thumbnail(
+    file: str,
+    request: Request,
+    size: int = Query(512),
+    format: Optional[Literal["webp", "jpeg"]] = None,
+):
+    """Miniature d'une image locale (WebP si le navigateur l'accepte, sinon JPEG)."""
+    if size not in THUMBNAIL_SIZES:
+        raise HTTPException(status_code=400, detail=f"Taille non supportée (valeurs possibles: {list(THUMBNAIL_SIZES)})")
+
+    entry = catalog.get(file)
+    if entry is None or not entry["content_hash"]:
+        raise HTTPException(status_code=404, detail="Fichier non trouvé")
+
+    fmt = format or ("webp" if "image/webp" in request.headers.get("accept", "") else "jpeg")
+    etag = f'"{ThumbnailService.cache_key(entry["content_hash"], size, fmt)}"'
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=3600", "Vary": "Accept"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    try:
+        path = await thumbnails.get(catalog.path_for(file), entry["content_hash"], size, fmt)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Fichier non trouvé")
+    except Exception as exc:
+        logger.error(f"Erreur génération miniature {file}: {exc}")
+        raise HTTPException(status_code=500, detail=f"Erreur lors de la génération de la miniature: {exc}")
+    return FileResponse(path, media_type=THUMBNAIL_FORMATS[fmt], headers=headers)
+
+
 class SendToTVRequest(BaseModel):
     filename: str
 
@@ -165,70 +394,222 @@ class SendToTVRequest(BaseModel):
 async def send_to_tv(req: SendToTVRequest):
     """Envoie une image locale vers la TV et la marque comme remote."""
     logger.info(f"Envoi vers TV demandé: {req.filename}")
-    
-    local_path = os.path.join(IMAGE_DIR, req.filename)
-    if not os.path.exists(local_path):
-        logger.error(f"Fichier local non trouvé: {local_path}")
-        raise HTTPException(status_code=404, detail="Fichier non trouvé")
-    
-    # Vérifier si déjà envoyé
-    existing_mapping = next((m for m in uploaded_files if os.path.abspath(m["file"]) == os.path.abspath(local_path)), None)
-    if existing_mapping:
-        logger.info(f"Image déjà envoyée, remote_filename: {existing_mapping['remote_filename']}")
-        return ImageItem(file=req.filename, remote_filename=existing_mapping["remote_filename"])
-    
-    # Lire le fichier
-    logger.info(f"Lecture du fichier: {local_path}")
-    with open(local_path, "rb") as fp:
-        contents = fp.read()
-    
-    logger.info(f"Taille du fichier: {len(contents)} bytes")
-    
-    # Upload to TV
-    logger.info("Début envoi vers la TV")
-    tv_controller = await get_tv_controller()
     try:
-        # Vérifier si la TV supporte l'art mode
-        logger.info("Vérification du support Art Mode")
-        if not await tv_controller.supported():
-            logger.error("TV ne supporte pas l'Art Mode")
-            raise HTTPException(status_code=400, detail="Cette TV ne supporte pas l'Art Mode")
-        
-        # Vérifier la taille du fichier (limite Samsung ~10MB)
-        if len(contents) > 10 * 1024 * 1024:
-            logger.error(f"Fichier trop volumineux: {len(contents)} bytes")
-            raise HTTPException(status_code=400, detail="Fichier trop volumineux (max 10MB)")
-
-        # Déterminer le type de fichier
-        ext = os.path.splitext(req.filename)[1].lower()
-        logger.info(f"Envoi {ext} vers la TV...")
-        
-        if ext in [".jpg", ".jpeg"]:
-            remote_filename = await tv_controller.upload_image(contents, file_type="JPEG", matte="none")
-        elif ext == ".png":
-            remote_filename = await tv_controller.upload_image(contents, file_type="PNG", matte="none")
-        else:
-            raise HTTPException(status_code=400, detail="Format de fichier non supporté")
-        
-        if remote_filename:
-            logger.info(f"Envoi réussi, remote_filename: {remote_filename}")
-        else:
-            raise HTTPException(status_code=500, detail="Échec de l'upload via les deux méthodes (directe et SmartThings)")
-    except Exception as exc:
-        logger.error(f"Erreur envoi TV: {exc}")
-        logger.error(f"Type d'erreur: {type(exc).__name__}")
-        logger.error(f"Traceback complet:\n{traceback.format_exc()}")
-        raise HTTPException(status_code=500, detail=f"Erreur lors de l'envoi vers la TV: {exc}")
-
-    # Persist mapping
-    logger.info("Sauvegarde du mapping local/remote")
-    uploaded_files.append({"file": local_path, "remote_filename": remote_filename})
-    save_uploaded_map()
+        remote_filename = await transfers.send(req.filename)
+    except TransferError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=exc.detail)
 
     logger.info(f"Envoi vers TV terminé avec succès: {req.filename}")
     return ImageItem(file=req.filename, remote_filename=remote_filename)
 
 
+class SendBatchRequest(BaseModel):
+    filenames: List[str]
+
+
+def sse_message(event: str, data: dict) -> str:
+    """Formate un message Server-Sent Events"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@app.post("/api/send-to-tv/batch")
+async def send_batch_to_tv(req: SendBatchRequest):
+    """Envoie plusieurs images vers la TV sur une seule session; progression en SSE."""
+    logger.info(f"Envoi groupé vers TV demandé: {len(req.filenames)} images")
+
+    batch_id = uuid.uuid4().hex[:8]
+
+    async def stream():
+        async for event in transfers.send_batch(req.filenames):
+            name = event.pop("event")
+            events.publish("upload-progress", {"batch": batch_id, "event": name, **event})
+            yield sse_message(name, event)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/api/events")
+async def stream_events(request: Request):
+    """
+    Flux SSE des changements: current-art, art-mode, upload-progress, connection-health.
+    L'état courant est envoyé dès la connexion; un commentaire keepalive part toutes les 15s.
+    """
+    queue = events.subscribe()
+
+    async def stream():
+        try:
+            while not await request.is_disconnected():
+                try:
+                    name, data = await asyncio.wait_for(queue.get(), 15)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield sse_message(name, data)
+        finally:
+            events.unsubscribe(queue)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+class JobRequest(BaseModel):
+    kind: Literal["upload", "select"]
+    filename: Optional[str] = None  # pour "upload"
+    remote_filename: Optional[str] = None  # pour "select"
+    show: bool = True
+
+
+@app.post("/api/jobs", status_code=202)
+async def create_job(req: JobRequest):
+    """Met en file un envoi ou une sélection TV et retourne immédiatement l'identifiant du travail."""
+    if req.kind == "upload":
+        if not req.filename or catalog.get(req.filename) is None:
+            raise HTTPException(status_code=404, detail="Fichier non trouvé")
+        payload = {"filename": req.filename}
+    else:
+        if not req.remote_filename:
+            raise HTTPException(status_code=400, detail="remote_filename requis")
+        payload = {"remote_filename": req.remote_filename, "show": req.show}
+    return job_queue.enqueue(req.kind, payload)
+
+
+@app.get("/api/jobs")
+async def list_jobs(status: Optional[Literal["pending", "running", "done", "failed"]] = None,
+                    limit: int = Query(50, ge=1, le=500)):
+    """Liste les travaux récents et l'état de la file."""
+    return {
+        "tv_reachable": job_queue.tv_reachable,
+        "counts": job_queue.counts(),
+        "jobs": job_queue.list(status=status, limit=limit),
+    }
+
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Travail non trouvé")
+    return job
+
+
+@app.get("/api/tv/commands")
+async def list_tv_commands():
+    """Commandes TV en cours et état des files par priorité (profondeur, temps d'attente)."""
+    tv_controller = await get_tv_controller()
+    return tv_controller.scheduler.snapshot()
+
+
+@app.delete("/api/tv/commands/{command_id}")
+async def cancel_tv_command(command_id: int):
+    """Annule une commande TV en attente ou en cours (ex: un envoi trop long)."""
+    tv_controller = await get_tv_controller()
+    if not tv_controller.scheduler.cancel(command_id):
+        raise HTTPException(status_code=404, detail="Commande non trouvée")
+    return {"status": "cancelled", "id": command_id}
+
+
+@app.get("/api/tv/art")
+async def list_tv_art():
+    """Images présentes sur la TV lors de la dernière réconciliation (file: image locale, ou None)."""
+    return {**inventory.snapshot(), "storage": storage_budget.snapshot(), "items": catalog.list_remote_art()}
+
+
+@app.post("/api/tv/art/{content_id}/pin")
+async def pin_tv_art(content_id: str):
+    """Épingle une image: elle ne sera jamais supprimée par le budget de stockage."""
+    if not catalog.set_pinned(content_id, True):
+        raise HTTPException(status_code=404, detail="Image non trouvée sur la TV")
+    return {"content_id": content_id, "pinned": True}
+
+
+@app.delete("/api/tv/art/{content_id}/pin")
+async def unpin_tv_art(content_id: str):
+    if not catalog.set_pinned(content_id, False):
+        raise HTTPException(status_code=404, detail="Image non trouvée sur la TV")
+    return {"content_id": content_id, "pinned": False}
+
+
+@app.post("/api/tv/art/reconcile")
+async def reconcile_tv_art():
+    """Réconcilie immédiatement le catalogue avec la liste des images de la TV."""
+    result = await inventory.reconcile()
+    if result is None:
+        raise HTTPException(status_code=503, detail="Liste des images de la TV indisponible (connexion directe requise)")
+    return result
+
+
+PLAYLIST_NAME_PATTERN = re.compile(r"[\w .-]{1,64}")
+
+
+class PlaylistRequest(BaseModel):
+    files: List[str]
+
+
+class SlideshowRequest(BaseModel):
+    # Seuls les champs fournis sont appliqués (null n'est accepté que pour playlist)
+    enabled: bool = False
+    playlist: Optional[str] = None  # None: tout le catalogue
+    mode: Literal["shuffle", "sequential"] = "shuffle"
+    interval: float = Field(900, ge=10)  # secondes entre deux images
+
+
+@app.get("/api/playlists")
+async def list_playlists():
+    return catalog.list_playlists()
+
+
+@app.put("/api/playlists/{name}")
+async def save_playlist(name: str, req: PlaylistRequest):
+    """Crée ou remplace une playlist (liste ordonnée d'images du catalogue)."""
+    if not PLAYLIST_NAME_PATTERN.fullmatch(name):
+        raise HTTPException(status_code=400, detail="Nom de playlist invalide")
+    missing = [file for file in req.files if catalog.get(file) is None]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Fichiers non trouvés: {', '.join(missing)}")
+    return catalog.save_playlist(name, list(dict.fromkeys(req.files)))
+
+
+@app.delete("/api/playlists/{name}")
+async def delete_playlist(name: str):
+    if not catalog.delete_playlist(name):
+        raise HTTPException(status_code=404, detail="Playlist non trouvée")
+    return {"status": "deleted", "name": name}
+
+
+@app.get("/api/slideshow")
+async def get_slideshow():
+    """État du diaporama: configuration, image courante et prochaines images."""
+    return slideshow.snapshot()
+
+
+@app.put("/api/slideshow")
+async def configure_slideshow(req: SlideshowRequest):
+    """Active, désactive ou reconfigure le diaporama (seuls les champs fournis changent)."""
+    changes = req.model_dump(exclude_unset=True)
+    if changes.get("playlist") and catalog.get_playlist(changes["playlist"]) is None:
+        raise HTTPException(status_code=404, detail="Playlist non trouvée")
+    try:
+        return await slideshow.configure(**changes)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
+@app.post("/api/slideshow/next")
+async def slideshow_next():
+    """Passe immédiatement à l'image suivante du diaporama."""
+    if not slideshow.snapshot()["running"]:
+        raise HTTPException(status_code=409, detail="Diaporama arrêté")
+    slideshow.next()
+    return {"status": "ok"}
+
+
 class SelectImageRequest(BaseModel):
     remote_filename: str
 
@@ -244,7 +625,11 @@ async def set_image(req: SelectImageRequest):
             logger.info("Image sélectionnée avec succès")
             return {"status": "success", "message": "Image sélectionnée sur la TV"}
         else:
+            # L'image a peut-être été supprimée sur la TV: revérifier les mappings
+            inventory.request()
             raise HTTPException(status_code=500, detail="Échec de la sélection via les deux méthodes (directe et SmartThings)")
+    except SchedulerBusy:
+        raise
     except Exception as exc:
         logger.error(f"Erreur lors de la sélection: {exc}")
         logger.error(f"Type d'erreur: {type(exc).__name__}")
@@ -253,13 +638,13 @@ async def set_image(req: SelectImageRequest):
 
 
 @app.get("/api/current-image")
-async def get_current_image():
-    """Récupère l'image actuellement affichée sur la TV."""
+async def get_current_image(refresh: bool = False):
+    """Récupère l'image actuellement affichée sur la TV (état en mémoire, sauf si refresh)."""
     logger.info("Récupération de l'image actuelle")
     tv_controller = await get_tv_controller()
     try:
         # Essayer de récupérer l'image actuelle
-        current = await tv_controller.get_current_art()
+        current = await tv_controller.get_current_art(refresh=refresh)
         logger.info(f"Image actuelle récupérée: {current}")
         
         if current:
@@ -288,6 +673,8 @@ async def get_current_image():
             "message": "Aucune image actuellement affichée sur la TV",
             "content_id": None
         }
+    except SchedulerBusy:
+        raise
     except Exception as exc:
         logger.error(f"Erreur récupération image actuelle: {exc}")
         logger.error(f"Type d'erreur: {type(exc).__name__}")
@@ -296,37 +683,13 @@ async def get_current_image():
 
 
 @app.get("/api/search-unsplash")
-async def search_unsplash(query: str):
-    logger.info(f"Recherche Unsplash: '{query}'")
-    if not UNSPLASH_ACCESS_KEY:
-        logger.error("Clé API Unsplash manquante")
-        raise HTTPException(status_code=500, detail="Clé API Unsplash manquante")
-
-    url = "https://api.unsplash.com/search/photos"
-    params = {"query": query, "client_id": UNSPLASH_ACCESS_KEY, "per_page": 30}
-    logger.info(f"Appel API Unsplash: {url}")
-    r = requests.get(url, params=params, timeout=10)
-    logger.info(f"Réponse Unsplash: status={r.status_code}")
-    if r.status_code != 200:
-        logger.error(f"Erreur API Unsplash: {r.status_code} - {r.text}")
-        raise HTTPException(status_code=r.status_code, detail="Erreur lors de la recherche Unsplash")
-
-    data = r.json()
-    logger.info(f"Résultats Unsplash: {len(data.get('results', []))} photos")
-    # Return subset of data to limit payload size
-    results = [
-        {
-            "id": p["id"],
-            "description": p.get("description") or p.get("alt_description"),
-            "urls": p["urls"],
-            "user": {
-                "name": p["user"]["name"],
-                "profile": p["user"]["links"]["html"],
-            },
-            "download_location": p["links"].get("download_location"),
-        }
-        for p in data.get("results", [])
-    ]
+async def search_unsplash(query: str, page: int = Query(1, ge=1)):
+    logger.info(f"Recherche Unsplash: '{query}' (page {page})")
+    try:
+        results = await unsplash.search(query, page=page)
+    except UnsplashError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=exc.detail)
+    logger.info(f"Résultats Unsplash: {len(results)} photos")
     return results
 
 # Serve uploaded images statically
@@ -334,63 +697,118 @@ app.mount("/images", StaticFiles(directory=IMAGE_DIR), name="images")
 
 # Endpoint pour récupérer des photos populaires/featured
 @app.get("/api/unsplash-featured")
-async def unsplash_featured():
+async def unsplash_featured(page: int = Query(1, ge=1)):
     logger.info("Récupération des photos Unsplash populaires")
-    if not UNSPLASH_ACCESS_KEY:
-        logger.error("Clé API Unsplash manquante")
-        raise HTTPException(status_code=500, detail="Clé API Unsplash manquante")
-
-    url = "https://api.unsplash.com/photos"
-    params = {"client_id": UNSPLASH_ACCESS_KEY, "per_page": 30, "order_by": "popular"}
-    logger.info(f"Appel API Unsplash featured: {url}")
-    r = requests.get(url, params=params, timeout=10)
-    logger.info(f"Réponse Unsplash featured: status={r.status_code}")
-    if r.status_code != 200:
-        logger.error(f"Erreur API Unsplash featured: {r.status_code} - {r.text}")
-        raise HTTPException(status_code=r.status_code, detail="Erreur Unsplash")
-
-    data = r.json()
-    logger.info(f"Photos populaires récupérées: {len(data)} photos")
-    results = [
-        {
-            "id": p["id"],
-            "description": p.get("description") or p.get("alt_description"),
-            "urls": p["urls"],
-            "user": {
-                "name": p["user"]["name"],
-                "profile": p["user"]["links"]["html"],
-            },
-            "download_location": p["links"].get("download_location"),
-        }
-        for p in data
-    ]
+    try:
+        results = await unsplash.featured(page=page)
+    except UnsplashError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=exc.detail)
+    logger.info(f"Photos populaires récupérées: {len(results)} photos")
     return results
 
+
+class UnsplashImportRequest(BaseModel):
+    ids: List[str]
+    resolution: Literal["raw", "full", "regular"] = "full"
+    send_to_tv: bool = False  # ajoute chaque photo importée à la file d'envoi TV
+
+
+class UnsplashImportResult(BaseModel):
+    id: str
+    file: Optional[str] = None
+    remote_filename: Optional[str] = None
+    duplicate: bool = False
+    job_id: Optional[str] = None
+    error: Optional[str] = None
+
+
+async def _import_unsplash_photo(photo_id: str, resolution: str, send_to_tv: bool) -> UnsplashImportResult:
+    """Télécharge une photo Unsplash directement dans IMAGE_DIR et l'enregistre dans le catalogue"""
+    result = UnsplashImportResult(id=photo_id)
+    async with _unsplash_import_slots:
+        try:
+            photo = await unsplash.photo(photo_id)
+            url = photo.get("urls", {}).get(resolution)
+            if not url:
+                raise UnsplashError(404, f"Résolution '{resolution}' indisponible")
+            await unsplash.track_download(photo)
+
+            logger.info(f"Import Unsplash {photo_id} ({resolution})")
+            sink = await asyncio.to_thread(UploadSink, IMAGE_DIR, MAX_UPLOAD_BYTES)
+            try:
+                await unsplash.download(url, sink.write)
+                # Même déduplication par contenu que /api/upload
+                entry, result.duplicate = await _store_upload(sink, f"unsplash-{photo_id}")
+            except BaseException:
+                await asyncio.to_thread(sink.abort)
+                raise
+            result.file = entry["file"]
+            result.remote_filename = entry["remote_filename"]
+            if result.duplicate:
+                logger.info(f"Photo {photo_id} déjà présente: {result.file}")
+        except (UnsplashError, UploadError) as exc:
+            logger.error(f"Import Unsplash {photo_id} en échec: {exc.detail}")
+            result.error = exc.detail
+            return result
+        except Exception as exc:
+            # Erreur inattendue: seule cette photo échoue, les autres continuent
+            logger.error(f"Import Unsplash {photo_id} en échec: {exc!r}")
+            result.error = f"Erreur interne: {exc}"
+            return result
+
+    if not result.duplicate:
+        thumbnails.warm(os.path.join(IMAGE_DIR, result.file), entry["content_hash"])
+        logger.info(f"Photo Unsplash importée: {result.file} ({sink.size} bytes)")
+    if send_to_tv and not result.remote_filename:
+        result.job_id = job_queue.enqueue("upload", {"filename": result.file})["id"]
+    return result
+
+
+@app.post("/api/unsplash/import", response_model=List[UnsplashImportResult])
+async def import_unsplash(req: UnsplashImportRequest):
+    """
+    Importe des photos Unsplash côté serveur (sans passer par le navigateur).
+    Un échec sur une photo n'interrompt pas les autres: voir le champ `error`.
+    """
+    if not req.ids:
+        raise HTTPException(status_code=400, detail="Aucune photo à importer")
+    ids = list(dict.fromkeys(req.ids))
+    invalid = [i for i in ids if not UNSPLASH_ID_PATTERN.fullmatch(i)]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Identifiants Unsplash invalides: {', '.join(invalid)}")
+    return await asyncio.gather(*(_import_unsplash_photo(i, req.resolution, req.send_to_tv) for i in ids))
+
 @app.get("/api/tv-status")
 async def get_tv_status():
     """Diagnostic de l'état de la TV et de ses capacités."""
     logger.info("Diagnostic TV demandé")
     tv_controller = await get_tv_controller()
     try:
-        # Test de connexion basique
+        # Support, art actuel et infos device demandés en parallèle
         logger.info("Test de connexion TV")
-        supported = await tv_controller.supported()
+        supported, current_art, device_info = await asyncio.gather(
+            tv_controller.supported(),
+            tv_controller.get_current_art(),
+            tv_controller.get_device_info(),
+        )
         logger.info(f"Art Mode supporté: {supported}")
         
+        if supported is None:
+            return {
+                "status": "error",
+                "message": "TV injoignable: support de l'Art Mode inconnu",
+                "art_mode_supported": None,
+                "paths": tv_controller.health()
+            }
         if not supported:
             return {
                 "status": "error",
                 "message": "Cette TV ne supporte pas l'Art Mode",
-                "art_mode_supported": False
+                "art_mode_supported": False,
+                "paths": tv_controller.health()
             }
         
-        # Récupérer des informations sur l'état actuel
-        logger.info("Récupération des informations TV")
-        current_art = await tv_controller.get_current_art()
         logger.info(f"Art actuel: {current_art}")
-        
-        # Récupérer les informations du device
-        device_info = await tv_controller.get_device_info()
         logger.info(f"Info device: {device_info}")
         
         return {
@@ -399,15 +817,19 @@ async def get_tv_status():
             "tv_ip": TV_IP,
             "art_mode_supported": True,
             "current_art": current_art,
-            "device_info": device_info
+            "device_info": device_info,
+            "paths": tv_controller.health()
         }
+    except SchedulerBusy:
+        raise
     except Exception as exc:
         logger.error(f"Erreur diagnostic TV: {exc}")
         return {
             "status": "error",
             "message": f"Erreur de connexion à la TV: {exc}",
             "tv_ip": TV_IP,
-            "art_mode_supported": False
+            "art_mode_supported": False,
+            "paths": tv_controller.health()
         }
 
 # =============================================================================
@@ -423,6 +845,8 @@ async def debug_api_version():
         device_info = await tv_controller.get_device_info()
         logger.info(f"DEBUG: Device info: {device_info}")
         return {"device_info": device_info}
+    except SchedulerBusy:
+        raise
     except Exception as exc:
         logger.error(f"DEBUG: Erreur info device: {exc}")
         return {"error": str(exc)}
@@ -435,31 +859,41 @@ async def debug_tv_status():
     try:
         status = {}
         
-        # Support Art Mode
-        status["art_supported"] = await tv_controller.supported()
+        # Support Art Mode, état actuel et infos device en parallèle
+        supported, current_art, device_info = await asyncio.gather(
+            tv_controller.supported(),
+            tv_controller.get_current_art(),
+            tv_controller.get_device_info(),
+            return_exceptions=True,
+        )
+        if isinstance(supported, BaseException):
+            raise supported
+        status["art_supported"] = supported
         logger.info(f"DEBUG: Art Mode supporté: {status['art_supported']}")
         
-        # Récupérer l'état actuel
         if status["art_supported"]:
-            try:
-                current_art = await tv_controller.get_current_art()
-                status["current_art"] = current_art
-                logger.info(f"DEBUG: Art actuel: {current_art}")
-            except:
-                status["current_art"] = "unknown"
-        
-        # Informations du device
-        try:
-            device_info = await tv_controller.get_device_info()
-            status["device_info"] = device_info
-        except:
-            status["device_info"] = "unknown"
+            status["current_art"] = "unknown" if isinstance(current_art, BaseException) else current_art
+            logger.info(f"DEBUG: Art actuel: {status['current_art']}")
         
+        status["device_info"] = "unknown" if isinstance(device_info, BaseException) else device_info
+
+        # Santé des chemins direct / SmartThings et état en cache
+        status["paths"] = tv_controller.health()
+        status["state"] = tv_controller.state.snapshot()
+        status["events"] = events.stats()
         return status
+    except SchedulerBusy:
+        raise
     except Exception as exc:
         logger.error(f"DEBUG: Erreur statut TV: {exc}")
         return {"error": str(exc)}
 
+@app.get("/api/debug/tv-calls")
+async def debug_tv_calls():
+    """Debug: Compteurs des appels TV (cache, appels réels, appels mutualisés)."""
+    tv_controller = await get_tv_controller()
+    return tv_controller.call_snapshot()
+
 @app.post("/api/debug/set-artmode")
 async def debug_set_artmode(request: dict):
     """Debug: Test du système hybride."""
@@ -478,6 +912,8 @@ async def debug_set_artmode(request: dict):
             "device_info": device_info is not None,
             "current_art": current_art is not None
         }
+    except SchedulerBusy:
+        raise
     except Exception as exc:
         logger.error(f"DEBUG: Erreur test système: {exc}")
         return {"error": str(exc)}
@@ -488,17 +924,24 @@ async def debug_available_art():
     logger.info("DEBUG: Informations système hybride")
     tv_controller = await get_tv_controller()
     try:
-        # Tester toutes les fonctionnalités
+        # Tester toutes les fonctionnalités (en parallèle)
+        supported, device_info, current_art = await asyncio.gather(
+            tv_controller.supported(),
+            tv_controller.get_device_info(),
+            tv_controller.get_current_art(),
+        )
         info = {
-            "art_supported": await tv_controller.supported(),
-            "device_info_available": (await tv_controller.get_device_info()) is not None,
-            "current_art_available": (await tv_controller.get_current_art()) is not None,
+            "art_supported": supported,
+            "device_info_available": device_info is not None,
+            "current_art_available": current_art is not None,
             "smartthings_token_configured": tv_controller.smartthings_token is not None,
             "device_id_configured": tv_controller.device_id is not None
         }
         
         logger.info(f"DEBUG: Informations système: {info}")
         return info
+    except SchedulerBusy:
+        raise
     except Exception as exc:
         logger.error(f"DEBUG: Erreur informations système: {exc}")
         return {"error": str(exc)}
@@ -523,6 +966,8 @@ async def debug_artmode_settings():
                 "smartthings_enabled": False,
                 "message": "Token SmartThings non configuré"
             }
+    except SchedulerBusy:
+        raise
     except Exception as exc:
         logger.error(f"DEBUG: Erreur test SmartThings: {exc}")
         return {"error": str(exc)}
@@ -589,6 +1034,8 @@ async def debug_test_upload(request: dict):
         else:
             return {"error": "Échec de l'upload via les deux méthodes"}
         
+    except SchedulerBusy:
+        raise
     except Exception as exc:
         logger.error(f"DEBUG: Erreur test upload: {exc}")
         logger.error(f"DEBUG: Type d'erreur: {type(exc).__name__}")
@@ -610,35 +1057,29 @@ async def debug_slideshow_status():
             "current_art": False
         }
         
-        # Test Art Mode supporté
-        try:
-            result["art_supported"] = await tv_controller.supported()
-        except:
-            pass
-        
-        # Test informations device
-        try:
-            device_info = await tv_controller.get_device_info()
+        # Tests Art Mode, informations device, art actuel et détection SmartThings en parallèle
+        async def no_smartthings():
+            return None
+
+        supported, device_info, current_art, device_id = await asyncio.gather(
+            tv_controller.supported(),
+            tv_controller.get_device_info(),
+            tv_controller.get_current_art(),
+            tv_controller.find_device_id() if tv_controller.smartthings_token else no_smartthings(),
+            return_exceptions=True,
+        )
+        if not isinstance(supported, BaseException):
+            result["art_supported"] = supported
+        if not isinstance(device_info, BaseException):
             result["device_info"] = device_info is not None
-        except:
-            pass
-        
-        # Test art actuel
-        try:
-            current_art = await tv_controller.get_current_art()
+        if not isinstance(current_art, BaseException):
             result["current_art"] = current_art is not None
-        except:
-            pass
-        
-        # Test détection SmartThings
-        if tv_controller.smartthings_token:
-            try:
-                device_id = await tv_controller.find_device_id()
-                result["smartthings_test"] = device_id is not None
-            except:
-                pass
+        if tv_controller.smartthings_token and not isinstance(device_id, BaseException):
+            result["smartthings_test"] = device_id is not None
         
         return result
+    except SchedulerBusy:
+        raise
     except Exception as exc:
         logger.error(f"DEBUG: Erreur test complet: {exc}")
         return {"error": str(exc)}
@@ -655,6 +1096,8 @@ async def debug_power_on():
             return {"status": "success", "message": "Touche Power envoyée"}
         else:
             return {"error": "Échec envoi touche Power via les deux méthodes"}
+    except SchedulerBusy:
+        raise
     except Exception as exc:
         logger.error(f"DEBUG: Erreur envoi touche Power: {exc}")
         return {"error": str(exc)}
@@ -676,6 +1119,8 @@ async def debug_send_key(request: dict):
         else:
             logger.error(f"DEBUG: Échec envoi touche: {key}")
             return {"error": "Échec de l'envoi de la touche via les deux méthodes"}
+    except SchedulerBusy:
+        raise
     except Exception as exc:
         logger.error(f"DEBUG: Erreur envoi touche: {exc}")
         return {"error": str(exc)}
@@ -689,6 +1134,8 @@ async def debug_device_info():
         device_info = await tv_controller.get_device_info()
         logger.info(f"DEBUG: Info device récupérées")
         return device_info
+    except SchedulerBusy:
+        raise
     except Exception as exc:
         logger.error(f"DEBUG: Erreur info device: {exc}")
         return {"error": str(exc)}
@@ -712,6 +1159,8 @@ async def debug_app_list():
             "device_info_available": device_info is not None,
             "device_id": device_id
         }
+    except SchedulerBusy:
+        raise
     except Exception as exc:
         logger.error(f"DEBUG: Erreur test SmartThings: {exc}")
         return {"error": str(exc)}
@@ -730,6 +1179,8 @@ async def debug_run_app(request: dict):
             return {"status": "success", "key": key}
         else:
             return {"error": f"Échec envoi touche {key} via les deux méthodes"}
+    except SchedulerBusy:
+        raise
     except Exception as exc:
         logger.error(f"DEBUG: Erreur envoi touche {key}: {exc}")
         return {"error": str(exc)}
@@ -738,7 +1189,14 @@ async def debug_run_app(request: dict):
 @app.on_event("shutdown")
 async def shutdown_event():
     global _tv_controller
+    await slideshow.stop()
+    await inventory.stop()
+    await job_queue.stop()
     if _tv_controller:
         logger.info("Fermeture du contrôleur TV")
         await _tv_controller.close()
         _tv_controller = None
+    await unsplash.close()
+    shutdown_pool()
+    await catalog_persistence.stop()
+    catalog.close()
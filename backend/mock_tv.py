@@ -0,0 +1,469 @@
+#!/usr/bin/env python3
+"""
+Fausse Samsung Frame et faux SmartThings pour tester le backend sans matériel.
+
+    python -m backend.mock_tv --latency 0.05 --loss 0.02 --disconnect-every 120 --upload-rate 2000000
+
+puis dans backend/.env:
+
+    TV_IP=127.0.0.1
+    TV_PORT=8001
+    SMARTTHINGS_TOKEN=mock-token
+    SMARTTHINGS_API_BASE=http://127.0.0.1:8090/v1
+
+La TV simulée parle le protocole du canal art (websocket com.samsung.art-app,
+messages d2d_service_message, envoi des images par socket D2D) et répond à
+GET /api/v2/ comme une Frame. Latence, perte de réponses, coupures, débit
+d'envoi et capacité de stockage sont réglables, ainsi que la latence, le taux
+d'erreurs 5xx et la limite de débit (429) de l'API SmartThings.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import random
+import secrets
+import sys
+import time
+from dataclasses import dataclass
+from http import HTTPStatus
+from typing import Optional, Dict, List, Any, Set
+
+from websockets.asyncio.server import serve, ServerConnection
+from websockets.exceptions import ConnectionClosed
+
+logger = logging.getLogger(__name__)
+
+ART_CHANNEL = "/api/v2/channels/com.samsung.art-app"
+REMOTE_CHANNEL = "/api/v2/channels/samsung.remote.control"
+MY_PHOTOS = "MY-C0002"
+FAVOURITES = "MY-C0004"
+
+
+@dataclass
+class Faults:
+    """Défauts injectés dans les réponses de la TV simulée"""
+    latency: float = 0.0            # délai avant chaque réponse (secondes)
+    jitter: float = 0.0             # variation aléatoire ajoutée au délai
+    loss: float = 0.0               # probabilité de ne jamais répondre à une requête
+    disconnect_every: float = 0.0   # coupe toutes les connexions toutes les N secondes (0: jamais)
+    upload_rate: float = 0.0        # débit de réception des images en octets/s (0: illimité)
+    max_images: int = 0             # capacité de stockage (0: illimitée)
+
+    async def delay(self):
+        wait = self.latency + random.uniform(0, self.jitter)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def lost(self) -> bool:
+        return self.loss > 0 and random.random() < self.loss
+
+
+class MockFrameTV:
+    """Frame simulée: état du mode Art et bibliothèque « Mes photos » en mémoire"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8001, faults: Optional[Faults] = None,
+                 images: int = 3):
+        self.host = host
+        self.port = port
+        self.faults = faults or Faults()
+        self.art_mode = "on"
+        self.content: Dict[str, Dict[str, Any]] = {}
+        self.favourites: Set[str] = set()
+        self._ids = itertools.count(1)
+        for _ in range(images):
+            self._add_content(file_size=0)
+        self.current: Optional[str] = next(iter(self.content), None)
+        self.connections: Set[ServerConnection] = set()
+        self.stats = {"requests": 0, "dropped": 0, "uploads": 0, "uploaded_bytes": 0, "disconnects": 0}
+        self._uploads: Dict[str, Dict[str, Any]] = {}  # clé D2D -> envoi en attente
+        self._tasks: List[asyncio.Task] = []
+        self._requests: Set[asyncio.Task] = set()  # requêtes art en cours de traitement
+        self._servers: List[Any] = []
+        self.d2d_port: Optional[int] = None
+
+    def _add_content(self, file_size: int, matte: str = "none") -> str:
+        content_id = f"MY_F{next(self._ids):04d}"
+        self.content[content_id] = {
+            "content_id": content_id,
+            "category_id": MY_PHOTOS,
+            "file_size": file_size,
+            "matte_id": matte,
+            "width": 3840,
+            "height": 2160,
+            "image_date": time.strftime("%Y:%m:%d %H:%M:%S"),
+        }
+        return content_id
+
+    # ------------------------------------------------------------------
+    # Serveurs
+    # ------------------------------------------------------------------
+
+    def _process_request(self, connection: ServerConnection, request):
+        """Requêtes HTTP simples (GET /api/v2/), sans passage en websocket"""
+        if request.headers.get("Upgrade", "").lower() == "websocket":
+            return None
+        if request.path.rstrip("/") == "/api/v2":
+            response = connection.respond(HTTPStatus.OK, json.dumps(self.device_info()))
+            response.headers["Content-Type"] = "application/json"
+            return response
+        return connection.respond(HTTPStatus.NOT_FOUND, "Not found\n")
+
+    def device_info(self) -> Dict[str, Any]:
+        return {
+            "id": "uuid:mock-frame",
+            "name": "[TV] Samsung Frame (mock)",
+            "type": "Samsung SmartTV",
+            "uri": f"http://{self.host}:{self.port}/api/v2/",
+            "device": {
+                "FrameTVSupport": "true",
+                "PowerState": "on",
+                "modelName": "QE55LS03BAUXXN",
+                "name": "[TV] Samsung Frame (mock)",
+                "networkType": "wired",
+                "ip": self.host,
+            },
+        }
+
+    async def start(self):
+        self._servers.append(await serve(
+            self._handle, self.host, self.port, process_request=self._process_request, max_size=None,
+        ))
+        d2d = await asyncio.start_server(self._receive_image, self.host, 0)
+        self.d2d_port = d2d.sockets[0].getsockname()[1]
+        self._servers.append(d2d)
+        if self.faults.disconnect_every > 0:
+            self._tasks.append(asyncio.create_task(self._disconnect_loop()))
+        logger.info(f"TV simulée sur ws://{self.host}:{self.port} (D2D: {self.d2d_port}, {len(self.content)} images)")
+
+    async def stop(self):
+        tasks = [*self._tasks, *self._requests]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for server in self._servers:
+            server.close()
+            await server.wait_closed()
+
+    async def _disconnect_loop(self):
+        while True:
+            await asyncio.sleep(self.faults.disconnect_every)
+            if self.connections:
+                logger.info(f"Coupure simulée de {len(self.connections)} connexion(s)")
+                self.stats["disconnects"] += 1
+                for connection in list(self.connections):
+                    await connection.close(1011, "coupure simulée")
+
+    # ------------------------------------------------------------------
+    # Websocket
+    # ------------------------------------------------------------------
+
+    async def _handle(self, connection: ServerConnection):
+        path = connection.request.path.split("?")[0]
+        if path not in (ART_CHANNEL, REMOTE_CHANNEL):
+            await connection.close(1008, "canal inconnu")
+            return
+        await connection.send(json.dumps({
+            "event": "ms.channel.connect",
+            "data": {"id": secrets.token_hex(8), "token": "mock-token", "clients": []},
+        }))
+        if path == ART_CHANNEL:
+            await connection.send(json.dumps({"event": "ms.channel.ready", "data": {}}))
+        self.connections.add(connection)
+        try:
+            async for message in connection:
+                if isinstance(message, bytes):
+                    continue
+                # Référence gardée jusqu'à la fin: la boucle ne garde les tâches que faiblement
+                task = asyncio.create_task(self._on_message(connection, json.loads(message)))
+                self._requests.add(task)
+                task.add_done_callback(self._request_done)
+        except ConnectionClosed:
+            pass
+        finally:
+            self.connections.discard(connection)
+
+    def _request_done(self, task: asyncio.Task):
+        self._requests.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Erreur de traitement d'une requête: {task.exception()!r}")
+
+    async def _on_message(self, connection: ServerConnection, message: Dict[str, Any]):
+        if message.get("method") == "ms.remote.control":
+            logger.info(f"Touche reçue: {message.get('params', {}).get('DataOfCmd')}")
+            return
+        params = message.get("params") or {}
+        if message.get("method") != "ms.channel.emit" or params.get("event") != "art_app_request":
+            return
+        data = json.loads(params["data"])
+        self.stats["requests"] += 1
+        await self.faults.delay()
+        if self.faults.lost():
+            self.stats["dropped"] += 1
+            logger.info(f"Réponse à {data.get('request')} perdue (simulation)")
+            return
+        try:
+            await self._dispatch(connection, data)
+        except ConnectionClosed:
+            pass
+
+    async def _reply(self, connection: ServerConnection, request: Dict[str, Any], event: str, **fields: Any):
+        request_id = request.get("request_id", request.get("id"))
+        await connection.send(json.dumps({
+            "event": "d2d_service_message",
+            "data": json.dumps({"event": event, "request_id": request_id, "id": request_id, **fields}),
+        }))
+
+    async def _broadcast(self, event: str, **fields: Any):
+        message = json.dumps({"event": "d2d_service_message", "data": json.dumps({"event": event, **fields})})
+        for connection in list(self.connections):
+            try:
+                await connection.send(message)
+            except ConnectionClosed:
+                pass
+
+    async def _dispatch(self, connection: ServerConnection, data: Dict[str, Any]):
+        request = data.get("request")
+        if request in ("api_version", "get_api_version"):
+            await self._reply(connection, data, request, version="4.3.4.0")
+        elif request == "get_device_info":
+            await self._reply(connection, data, request, **self.device_info()["device"])
+        elif request == "get_content_list":
+            items = list(self.content.values())
+            items += [{**self.content[cid], "category_id": FAVOURITES} for cid in self.favourites if cid in self.content]
+            await self._reply(connection, data, "content_list", content_list=json.dumps(items))
+        elif request == "get_current_artwork":
+            if self.current is None:
+                await self._error(connection, data, "-1")
+            else:
+                await self._reply(connection, data, request, **self.content[self.current])
+        elif request == "select_image":
+            content_id = data.get("content_id")
+            if content_id not in self.content:
+                await self._error(connection, data, "-1")
+                return
+            self.current = content_id
+            await self._reply(connection, data, request, content_id=content_id)
+            await self._broadcast("image_selected", content_id=content_id, is_shown="Yes" if data.get("show") else "No")
+        elif request == "get_artmode_status":
+            await self._reply(connection, data, "artmode_status", value=self.art_mode)
+        elif request == "set_artmode_status":
+            self.art_mode = data.get("value", "on")
+            await self._reply(connection, data, request, value=self.art_mode)
+            await self._broadcast("art_mode_changed", status=self.art_mode)
+        elif request == "change_favorite":
+            content_id = data.get("content_id")
+            (self.favourites.add if data.get("status") == "on" else self.favourites.discard)(content_id)
+            await self._reply(connection, data, "favorite_changed", content_id=content_id, status=data.get("status"))
+        elif request == "delete_image_list":
+            deleted = [item for item in data.get("content_id_list", []) if item["content_id"] in self.content]
+            for item in deleted:
+                self.content.pop(item["content_id"])
+                self.favourites.discard(item["content_id"])
+                if self.current == item["content_id"]:
+                    self.current = None
+            await self._reply(connection, data, "image_deleted", content_id_list=json.dumps(deleted))
+        elif request == "send_image":
+            if self.faults.max_images and len(self.content) >= self.faults.max_images:
+                # Mémoire pleine: la TV refuse l'envoi
+                await self._error(connection, data, "-11")
+                return
+            key = secrets.token_hex(8)
+            self._uploads[key] = {"connection": connection, "request": data}
+            conn_info = {"ip": self.host, "port": self.d2d_port, "key": key, "secured": False}
+            await self._reply(connection, data, "ready_to_use", conn_info=json.dumps(conn_info))
+        else:
+            await self._error(connection, data, "-7")
+
+    async def _error(self, connection: ServerConnection, request: Dict[str, Any], code: str):
+        await self._reply(connection, request, "error", error_code=code, request_data=json.dumps(request))
+
+    # ------------------------------------------------------------------
+    # Réception des images (socket D2D)
+    # ------------------------------------------------------------------
+
+    async def _receive_image(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            header_len = int.from_bytes(await reader.readexactly(4), "big")
+            header = json.loads(await reader.readexactly(header_len))
+            upload = self._uploads.pop(header.get("secKey"), None)
+            if upload is None:
+                logger.warning("Envoi D2D refusé: clé inconnue")
+                return
+            remaining = int(header["fileLength"])
+            started = time.monotonic()
+            while remaining:
+                chunk = await reader.readexactly(min(remaining, 64 * 1024))
+                remaining -= len(chunk)
+                if self.faults.upload_rate > 0:
+                    # Débit limité: la TV lit les données au rythme d'un Wi-Fi lent
+                    await asyncio.sleep(len(chunk) / self.faults.upload_rate)
+            size = int(header["fileLength"])
+            request = upload["request"]
+            content_id = self._add_content(size, request.get("matte_id", "none"))
+            self.stats["uploads"] += 1
+            self.stats["uploaded_bytes"] += size
+            logger.info(f"Image reçue: {content_id} ({size} octets en {time.monotonic() - started:.2f}s)")
+            await self.faults.delay()
+            try:
+                await self._reply(upload["connection"], request, "image_added", content_id=content_id)
+            except ConnectionClosed:
+                logger.info(f"Connexion fermée avant la confirmation de {content_id}")
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError) as e:
+            logger.warning(f"Envoi D2D interrompu: {e}")
+        finally:
+            writer.close()
+
+
+@dataclass
+class ApiFaults:
+    """Défauts injectés dans l'API SmartThings simulée"""
+    latency: float = 0.0
+    error_rate: float = 0.0   # probabilité d'une réponse 503
+    rate_limit: float = 0.0   # requêtes par seconde au-delà desquelles l'API répond 429 (0: illimité)
+
+
+def create_smartthings_app(tv: MockFrameTV, token: str = "mock-token", faults: Optional[ApiFaults] = None,
+                           device_id: str = "mock-frame-device", extra_devices: int = 0, page_size: int = 20):
+    """API SmartThings simulée: la Frame simulée et `extra_devices` lampes (liste paginée)"""
+    from fastapi import FastAPI, Request
+    from fastapi.responses import JSONResponse
+
+    faults = faults or ApiFaults()
+    app = FastAPI(title="SmartThings (mock)")
+    app.state.stats = {"requests": 0, "errors": 0, "rate_limited": 0}
+    window: List[float] = []
+    capabilities = ["switch", "tvChannel", "samsungvd.mediaInputSource", "custom.picturemode", "samsungvd.ambient"]
+    device = {
+        "deviceId": device_id,
+        "name": "Samsung Frame (mock)",
+        "label": "Frame",
+        "deviceTypeName": "Samsung OCF TV",
+        "components": [{"id": "main", "capabilities": [{"id": cap, "version": 1} for cap in capabilities]}],
+    }
+    devices = [{
+        "deviceId": f"mock-light-{index}",
+        "name": f"Lampe {index}",
+        "label": f"Lampe {index}",
+        "deviceTypeName": "c2c-switch",
+        "components": [{"id": "main", "capabilities": [{"id": "switch", "version": 1}]}],
+    } for index in range(extra_devices)] + [device]
+
+    @app.middleware("http")
+    async def inject_faults(request: Request, call_next):
+        app.state.stats["requests"] += 1
+        if request.headers.get("authorization") != f"Bearer {token}":
+            return JSONResponse({"error": {"code": "UnauthorizedError"}}, status_code=401)
+        if faults.latency:
+            await asyncio.sleep(faults.latency)
+        if faults.rate_limit:
+            now = time.monotonic()
+            window[:] = [t for t in window if now - t < 1.0]
+            if len(window) >= faults.rate_limit:
+                app.state.stats["rate_limited"] += 1
+                return JSONResponse({"error": {"code": "TooManyRequestError"}}, status_code=429,
+                                    headers={"Retry-After": "1"})
+            window.append(now)
+        if faults.error_rate and random.random() < faults.error_rate:
+            app.state.stats["errors"] += 1
+            return JSONResponse({"error": {"code": "ServiceUnavailable"}}, status_code=503)
+        return await call_next(request)
+
+    @app.get("/v1/devices")
+    async def list_devices(request: Request, page: int = 0):
+        links = {}
+        if (page + 1) * page_size < len(devices):
+            links["next"] = {"href": str(request.url.include_query_params(page=page + 1))}
+        return {"items": devices[page * page_size:(page + 1) * page_size], "_links": links}
+
+    @app.get("/v1/devices/{requested_id}")
+    async def get_device(requested_id: str):
+        if requested_id != device_id:
+            return JSONResponse({"error": {"code": "NotFoundError"}}, status_code=404)
+        return device
+
+    @app.get("/v1/devices/{requested_id}/status")
+    async def get_status(requested_id: str):
+        if requested_id != device_id:
+            return JSONResponse({"error": {"code": "NotFoundError"}}, status_code=404)
+        # Forme réelle: composants puis capabilities indexés par identifiant
+        now = time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime())
+        return {"components": {"main": {
+            "switch": {"switch": {"value": "on", "timestamp": now}},
+            "custom.picturemode": {
+                "pictureMode": {"value": "Art" if tv.art_mode == "on" else "Standard", "timestamp": now},
+                "supportedPictureModes": {"value": ["Standard", "Movie", "Dynamic", "Art"], "timestamp": now},
+            },
+        }}}
+
+    @app.post("/v1/devices/{requested_id}/commands")
+    async def run_commands(requested_id: str, request: Request):
+        if requested_id != device_id:
+            return JSONResponse({"error": {"code": "NotFoundError"}}, status_code=404)
+        body = await request.json()
+        for command in body.get("commands", []):
+            if command.get("capability") == "custom.picturemode" and command.get("command") == "setPictureMode":
+                tv.art_mode = "on" if command.get("arguments") == ["Art"] else "off"
+        return {"results": [{"id": secrets.token_hex(8), "status": "ACCEPTED"} for _ in body.get("commands", [])]}
+
+    return app
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Fausse Samsung Frame et faux SmartThings pour les tests.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001, help="Port de la TV (websocket et REST)")
+    parser.add_argument("--images", type=int, default=3, help="Images déjà présentes sur la TV")
+    parser.add_argument("--latency", type=float, default=0.0, help="Délai de réponse de la TV (s)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Variation aléatoire du délai (s)")
+    parser.add_argument("--loss", type=float, default=0.0, help="Probabilité de perdre une réponse (0-1)")
+    parser.add_argument("--disconnect-every", type=float, default=0.0, help="Coupe les connexions toutes les N s")
+    parser.add_argument("--upload-rate", type=float, default=0.0, help="Débit d'envoi des images (octets/s)")
+    parser.add_argument("--max-images", type=int, default=0, help="Capacité de stockage de la TV")
+    parser.add_argument("--smartthings-port", type=int, default=8090, help="Port de l'API SmartThings (0: désactivée)")
+    parser.add_argument("--smartthings-token", default="mock-token")
+    parser.add_argument("--smartthings-latency", type=float, default=0.0)
+    parser.add_argument("--smartthings-error-rate", type=float, default=0.0, help="Probabilité d'une réponse 503")
+    parser.add_argument("--smartthings-rate-limit", type=float, default=0.0, help="Requêtes/s avant 429")
+    parser.add_argument("--smartthings-devices", type=int, default=0, help="Autres appareils du compte simulé")
+    return parser.parse_args()
+
+
+async def main():
+    args = parse_args()
+    tv = MockFrameTV(args.host, args.port, Faults(
+        latency=args.latency, jitter=args.jitter, loss=args.loss, disconnect_every=args.disconnect_every,
+        upload_rate=args.upload_rate, max_images=args.max_images,
+    ), images=args.images)
+    await tv.start()
+    server = None
+    if args.smartthings_port:
+        import uvicorn
+
+        app = create_smartthings_app(tv, args.smartthings_token, ApiFaults(
+            latency=args.smartthings_latency, error_rate=args.smartthings_error_rate,
+            rate_limit=args.smartthings_rate_limit,
+        ), extra_devices=args.smartthings_devices)
+        server = uvicorn.Server(uvicorn.Config(app, host=args.host, port=args.smartthings_port, log_level="warning"))
+        logger.info(f"SmartThings simulé sur http://{args.host}:{args.smartthings_port}/v1")
+    try:
+        if server:
+            await server.serve()
+        else:
+            await asyncio.Event().wait()
+    finally:
+        await tv.stop()
+        logger.info(f"Statistiques de la TV simulée: {tv.stats}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        sys.exit(0)
@@ -0,0 +1,74 @@
+# Maintenance en tâche de fond du catalogue (export art.py, checkpoints WAL)
+
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from .catalog import ImageCatalog
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogPersistence:
+    """
+    Regroupe les écritures coûteuses du catalogue hors de la boucle asyncio:
+    - export de uploaded_files.json pour art.py, au plus une fois par `export_delay`
+      secondes quel que soit le nombre d'envois;
+    - checkpoint périodique du journal WAL (compaction).
+    """
+
+    def __init__(self, catalog: ImageCatalog, json_path: str,
+                 export_delay: float = 2.0, checkpoint_interval: float = 300.0):
+        self.catalog = catalog
+        self.json_path = json_path
+        self.export_delay = export_delay
+        self.checkpoint_interval = checkpoint_interval
+        self._exported_revision: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def _exchange(self) -> Optional[tuple]:
+        """Import puis export de uploaded_files.json sous verrou; (révision, nombre) si exporté"""
+        with self.catalog.json_lock(self.json_path):
+            # Reprendre d'abord les envois faits entre-temps par art.py
+            self.catalog.import_json(self.json_path)
+            revision = self.catalog.revision
+            if revision == self._exported_revision:
+                return None
+            return revision, self.catalog.export_json(self.json_path)
+
+    async def flush(self):
+        """Exporte le mapping si le catalogue a changé depuis le dernier export"""
+        try:
+            exported = await asyncio.to_thread(self._exchange)
+        except OSError as e:
+            logger.error(f"Export de {self.json_path} impossible: {e}")
+            return
+        if exported is None:
+            return
+        revision, count = exported
+        self._exported_revision = revision
+        logger.info(f"Mapping exporté pour art.py: {count} images (révision {revision})")
+
+    async def _run(self):
+        last_checkpoint = time.monotonic()
+        while True:
+            await asyncio.sleep(self.export_delay)
+            await self.flush()
+            if time.monotonic() - last_checkpoint >= self.checkpoint_interval:
+                pages = await asyncio.to_thread(self.catalog.checkpoint)
+                logger.info(f"Checkpoint du catalogue: {pages} pages reportées")
+                last_checkpoint = time.monotonic()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        # Dernier export et compaction avant la fermeture du catalogue
+        await self.flush()
+        await asyncio.to_thread(self.catalog.checkpoint)
@@ -0,0 +1,176 @@
+# Ordonnancement des commandes envoyées à la TV
+
+import asyncio
+import itertools
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Optional, Dict, List, Any, Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+# Classes de priorité, de la plus urgente à la moins urgente
+INTERACTIVE = "interactive"  # sélection d'image, touches
+STATUS = "status"            # lecture de l'état
+BULK = "bulk"                # envois d'images
+PRIORITIES = (INTERACTIVE, STATUS, BULK)
+
+DEFAULT_QUEUE_LIMITS = {INTERACTIVE: 16, STATUS: 32, BULK: 8}
+
+
+class SchedulerBusy(Exception):
+    """File de la classe pleine: le client doit réessayer plus tard (HTTP 429)"""
+
+    status_code = 429
+
+    def __init__(self, priority: str):
+        self.priority = priority
+        self.detail = f"TV occupée: trop de commandes '{priority}' en attente, réessayez plus tard"
+        super().__init__(self.detail)
+
+
+class CommandCancelled(Exception):
+    """Commande annulée à la demande (et non par l'arrêt du serveur)"""
+
+
+@dataclass
+class Command:
+    id: int
+    priority: str
+    name: str
+    factory: Callable[[], Awaitable[Any]]
+    future: asyncio.Future
+    enqueued_at: float = field(default_factory=time.monotonic)
+    started_at: Optional[float] = None
+    task: Optional[asyncio.Task] = None
+
+
+class CommandScheduler:
+    """
+    Exécute les commandes TV par ordre de priorité (interactive > status > bulk).
+    Au plus `max_concurrent` commandes sont en cours, dont une seule de classe
+    bulk: un envoi long laisse toujours une place aux commandes interactives.
+    Chaque classe a une file bornée; une file pleine refuse la commande.
+    """
+
+    def __init__(self, max_concurrent: int = 2, queue_limits: Optional[Dict[str, int]] = None):
+        self.max_concurrent = max_concurrent
+        self.queue_limits = {**DEFAULT_QUEUE_LIMITS, **(queue_limits or {})}
+        self._queues: Dict[str, deque] = {priority: deque() for priority in PRIORITIES}
+        self._running: Dict[int, Command] = {}
+        self._ids = itertools.count(1)
+        self._stats = {
+            priority: {"started": 0, "completed": 0, "rejected": 0, "cancelled": 0, "total_wait": 0.0, "max_wait": 0.0}
+            for priority in PRIORITIES
+        }
+
+    def _running_count(self, priority: Optional[str] = None) -> int:
+        return sum(1 for command in self._running.values() if priority is None or command.priority == priority)
+
+    def _dispatch(self):
+        """Démarre les commandes en attente tant qu'il reste de la place"""
+        while self._running_count() < self.max_concurrent:
+            command = None
+            for priority in PRIORITIES:
+                if not self._queues[priority]:
+                    continue
+                if priority == BULK and self._running_count(BULK) >= 1:
+                    continue
+                command = self._queues[priority].popleft()
+                break
+            if command is None:
+                return
+            self._start(command)
+
+    def _start(self, command: Command):
+        command.started_at = time.monotonic()
+        wait = command.started_at - command.enqueued_at
+        stats = self._stats[command.priority]
+        stats["started"] += 1
+        stats["total_wait"] += wait
+        stats["max_wait"] = max(stats["max_wait"], wait)
+        if wait > 1:
+            logger.info(f"Commande {command.name} ({command.priority}) démarrée après {wait:.1f}s d'attente")
+        self._running[command.id] = command
+        command.task = asyncio.ensure_future(command.factory())
+        command.task.add_done_callback(lambda task: self._finished(command, task))
+
+    def _finished(self, command: Command, task: asyncio.Task):
+        self._running.pop(command.id, None)
+        if task.cancelled():
+            self._stats[command.priority]["cancelled"] += 1
+            if not command.future.done():
+                command.future.set_exception(CommandCancelled(f"Commande {command.name} annulée"))
+        else:
+            self._stats[command.priority]["completed"] += 1
+            if not command.future.done():
+                if task.exception() is not None:
+                    command.future.set_exception(task.exception())
+                else:
+                    command.future.set_result(task.result())
+        self._dispatch()
+
+    async def run(self, priority: str, name: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Met la commande en file et attend son résultat"""
+        queue = self._queues[priority]
+        if len(queue) >= self.queue_limits[priority]:
+            self._stats[priority]["rejected"] += 1
+            logger.warning(f"Commande {name} refusée: file {priority} pleine ({len(queue)})")
+            raise SchedulerBusy(priority)
+
+        loop = asyncio.get_running_loop()
+        command = Command(next(self._ids), priority, name, factory, loop.create_future())
+        queue.append(command)
+        self._dispatch()
+        try:
+            return await asyncio.shield(command.future)
+        except asyncio.CancelledError:
+            # L'appelant abandonne: retirer la commande si elle n'a pas démarré
+            if command in queue:
+                queue.remove(command)
+            elif command.task and not command.task.done():
+                command.task.cancel()
+            raise
+
+    def cancel(self, command_id: int) -> bool:
+        """Annule une commande en attente ou en cours (ex: un envoi trop long)"""
+        command = self._running.get(command_id)
+        if command and command.task:
+            logger.info(f"Annulation de la commande en cours {command.name} ({command_id})")
+            command.task.cancel()
+            return True
+        for queue in self._queues.values():
+            for command in queue:
+                if command.id == command_id:
+                    queue.remove(command)
+                    self._stats[command.priority]["cancelled"] += 1
+                    command.future.set_exception(CommandCancelled(f"Commande {command.name} annulée"))
+                    logger.info(f"Commande en attente {command.name} ({command_id}) annulée")
+                    return True
+        return False
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Profondeur des files, temps d'attente par classe et commandes en cours"""
+        now = time.monotonic()
+        classes: Dict[str, Any] = {}
+        for priority in PRIORITIES:
+            stats = self._stats[priority]
+            queue = self._queues[priority]
+            classes[priority] = {
+                "queued": len(queue),
+                "limit": self.queue_limits[priority],
+                "running": self._running_count(priority),
+                "completed": stats["completed"],
+                "rejected": stats["rejected"],
+                "cancelled": stats["cancelled"],
+                "avg_wait": round(stats["total_wait"] / stats["started"], 3) if stats["started"] else 0.0,
+                "max_wait": round(stats["max_wait"], 3),
+                "oldest_wait": round(now - queue[0].enqueued_at, 3) if queue else 0.0,
+            }
+        running: List[Dict[str, Any]] = [
+            {"id": command.id, "name": command.name, "priority": command.priority,
+             "elapsed": round(now - command.started_at, 3)}
+            for command in self._running.values()
+        ]
+        return {"classes": classes, "running": running}
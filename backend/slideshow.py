@@ -0,0 +1,273 @@
+# Diaporama côté serveur (rotation des images sur la TV)
+
+import asyncio
+import logging
+import random
+import time
+from typing import Optional, Dict, List, Any, Awaitable, Callable
+
+from .catalog import ImageCatalog
+from .inventory import ArtInventory
+from .scheduler import SchedulerBusy
+from .transfers import TransferService, TransferError
+from .tv_controller import TvController
+
+logger = logging.getLogger(__name__)
+
+MODES = ("shuffle", "sequential")
+MIN_INTERVAL = 10  # secondes
+
+DEFAULT_CONFIG = {"enabled": False, "playlist": None, "mode": "shuffle", "interval": 900}
+
+
+class SlideshowEngine:
+    """
+    Fait tourner les images d'une playlist (ou de tout le catalogue) sur la TV,
+    en ordre aléatoire ou séquentiel, toutes les `interval` secondes.
+    Les `lookahead` prochaines images sont envoyées à l'avance (commandes bulk,
+    donc quand la TV n'a rien de plus urgent à faire): au moment du changement,
+    il ne reste qu'un select_image. Une sélection refusée par la TV déclenche
+    une réconciliation de l'`inventory` (mapping probablement périmé).
+    """
+
+    def __init__(self, catalog: ImageCatalog, transfers: TransferService,
+                 get_controller: Callable[[], Awaitable[TvController]], lookahead: int = 2,
+                 on_change: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 inventory: Optional[ArtInventory] = None):
+        self.catalog = catalog
+        self.transfers = transfers
+        self.get_controller = get_controller
+        self.lookahead = lookahead
+        self.inventory = inventory
+        self.on_change = on_change  # appelé avec snapshot() à chaque changement
+        self.config: Dict[str, Any] = {**DEFAULT_CONFIG}
+        for key, value in (catalog.get_setting("slideshow") or {}).items():
+            # Réglage enregistré invalide (ancienne version): valeur par défaut
+            try:
+                self._validate({key: value})
+            except ValueError as e:
+                logger.warning(f"Réglage du diaporama ignoré: {e}")
+                continue
+            self.config[key] = value
+        self.current: Optional[str] = None
+        self.switched_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.switches = 0
+        self.preloaded = 0
+        self._queue: List[str] = []  # prochaines images, dans l'ordre de passage
+        self._order: List[str] = []  # images du cycle (avant mélange)
+        self._order_key: Optional[tuple] = None  # état du catalogue et de la playlist de _order
+        self._skip = False  # passage forcé à l'image suivante (next())
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._prefetch: Optional[asyncio.Task] = None
+
+    # ------------------------------------------------------------------
+    # Ordre de passage
+    # ------------------------------------------------------------------
+
+    def _files(self) -> List[str]:
+        """
+        Images de la playlist active encore présentes dans le catalogue, relues
+        seulement si le catalogue ou la playlist ont changé depuis le dernier cycle
+        """
+        playlist = None
+        if self.config["playlist"]:
+            playlist = self.catalog.get_playlist(self.config["playlist"])
+            if playlist is None:
+                logger.warning(f"Playlist {self.config['playlist']} introuvable, diaporama sur tout le catalogue")
+        key = (self.catalog.revision, playlist and playlist["name"], playlist and playlist["updated_at"])
+        if key != self._order_key:
+            if playlist:
+                self._order = [file for file in playlist["files"] if self.catalog.get(file)]
+            else:
+                self._order = [entry["file"] for entry in self.catalog.list_all()]
+            self._order_key = key
+        return list(self._order)
+
+    def _new_cycle(self) -> List[str]:
+        files = self._files()
+        # Dernière image prévue (ou affichée): le nouveau cycle s'enchaîne après elle
+        previous = self._queue[-1] if self._queue else self.current
+        if self.config["mode"] == "sequential":
+            if previous in files:
+                index = files.index(previous) + 1
+                files = files[index:] + files[:index]
+            return files
+        random.shuffle(files)
+        if len(files) > 1 and files[0] == previous:
+            # Pas deux fois la même image d'affilée entre deux cycles
+            files.append(files.pop(0))
+        return files
+
+    def upcoming(self, count: int) -> List[str]:
+        """Les `count` prochaines images (un nouveau cycle est tiré si besoin)"""
+        while len(self._queue) < count:
+            cycle = self._new_cycle()
+            if not cycle:
+                break
+            self._queue.extend(cycle)
+        return self._queue[:count]
+
+    # ------------------------------------------------------------------
+    # Rotation
+    # ------------------------------------------------------------------
+
+    def _changed(self):
+        if self.on_change:
+            self.on_change(self.snapshot())
+
+    async def _show(self, file: str):
+        remote_filename = await self.transfers.send(file)
+        tv_controller = await self.get_controller()
+        try:
+            selected = await tv_controller.select_image(remote_filename)
+        except SchedulerBusy:
+            raise
+        except Exception:
+            self._stale_mapping(remote_filename)
+            raise
+        if not selected:
+            self._stale_mapping(remote_filename)
+            raise TransferError(502, "Échec de la sélection via les deux méthodes (directe et SmartThings)")
+        self.current = file
+        self.switched_at = time.time()
+        self.switches += 1
+        logger.info(f"Diaporama: {file} affichée ({remote_filename})")
+
+    def _stale_mapping(self, remote_filename: str):
+        """Sélection refusée: l'image a pu être supprimée de la TV, le catalogue est réconcilié"""
+        if self.inventory:
+            logger.info(f"Diaporama: {remote_filename} refusée par la TV, réconciliation du catalogue")
+            self.inventory.request()
+
+    async def _preload(self):
+        """Envoie à l'avance les prochaines images qui ne sont pas encore sur la TV"""
+        for file in self.upcoming(self.lookahead):
+            entry = self.catalog.get(file)
+            if entry is None or entry["remote_filename"]:
+                continue
+            try:
+                await self.transfers.send(file)
+                self.preloaded += 1
+                logger.info(f"Diaporama: {file} préchargée sur la TV")
+            except Exception as e:
+                logger.warning(f"Préchargement de {file} impossible: {getattr(e, 'detail', e)}")
+
+    def _start_preload(self):
+        if self.lookahead > 0 and (self._prefetch is None or self._prefetch.done()):
+            self._prefetch = asyncio.create_task(self._preload())
+
+    async def _step(self):
+        files = self.upcoming(1)
+        if not files:
+            self.last_error = "Aucune image à afficher"
+            logger.warning("Diaporama: aucune image à afficher")
+            return
+        file = self._queue.pop(0)
+        try:
+            await self._show(file)
+            self.last_error = None
+        except Exception as e:
+            self.last_error = str(getattr(e, "detail", e))
+            logger.warning(f"Diaporama: changement vers {file} impossible: {self.last_error}")
+        self._changed()
+        self._start_preload()
+
+    async def _run(self):
+        while True:
+            await self._step()
+            self._skip = False
+            shown_at = time.monotonic()
+            while not self._skip:
+                # Intervalle relu à chaque réveil: un nouveau réglage s'applique à l'image affichée
+                remaining = shown_at + self.config["interval"] - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+
+    # ------------------------------------------------------------------
+    # Contrôle
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Démarre la rotation si elle est activée dans la configuration"""
+        if self.config["enabled"] and (self._task is None or self._task.done()):
+            logger.info(f"Diaporama démarré: {self.config}")
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        for task in (self._task, self._prefetch):
+            if task:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+        self._task = None
+        self._prefetch = None
+
+    @staticmethod
+    def _validate(changes: Dict[str, Any]):
+        """Refuse une configuration invalide avant qu'elle ne soit persistée"""
+        unknown = set(changes) - set(DEFAULT_CONFIG)
+        if unknown:
+            raise ValueError(f"Réglages inconnus: {', '.join(sorted(unknown))}")
+        if "enabled" in changes and not isinstance(changes["enabled"], bool):
+            raise ValueError("enabled doit être un booléen")
+        if "playlist" in changes and changes["playlist"] is not None and not isinstance(changes["playlist"], str):
+            raise ValueError("playlist doit être un nom de playlist ou null")
+        if "mode" in changes and changes["mode"] not in MODES:
+            raise ValueError(f"Mode inconnu: {changes['mode']}")
+        if "interval" in changes:
+            interval = changes["interval"]
+            if isinstance(interval, bool) or not isinstance(interval, (int, float)) or interval < MIN_INTERVAL:
+                raise ValueError(f"interval doit être un nombre de secondes >= {MIN_INTERVAL}")
+
+    async def configure(self, **changes: Any) -> Dict[str, Any]:
+        """
+        Met à jour la configuration (persistée). L'image affichée reste jusqu'au
+        prochain changement: une nouvelle playlist ou un nouveau mode s'appliquent
+        à partir de l'image suivante, un nouvel intervalle à l'image affichée.
+        """
+        self._validate(changes)
+        changed = {key for key, value in changes.items() if self.config.get(key) != value}
+        self.config.update(changes)
+        self.catalog.set_setting("slideshow", self.config)
+        if changed & {"playlist", "mode"}:
+            # L'ordre de passage dépend de la playlist et du mode: nouveau cycle
+            # après l'image affichée, dont les images sont préchargées
+            self._queue.clear()
+            self._order_key = None
+        if not self.config["enabled"]:
+            await self.stop()
+        elif self._task and not self._task.done():
+            if "interval" in changed:
+                self._wakeup.set()
+            if changed & {"playlist", "mode"}:
+                self._start_preload()
+        self.start()
+        self._changed()
+        return self.snapshot()
+
+    def next(self):
+        """Passe immédiatement à l'image suivante"""
+        self._skip = True
+        self._wakeup.set()
+
+    def snapshot(self) -> Dict[str, Any]:
+        next_switch = None
+        if self._task and not self._task.done() and self.switched_at:
+            next_switch = self.switched_at + self.config["interval"]
+        return {
+            **self.config,
+            "running": self._task is not None and not self._task.done(),
+            "current": self.current,
+            "switched_at": self.switched_at,
+            "next_switch_at": next_switch,
+            "upcoming": self._queue[:self.lookahead],
+            "switches": self.switches,
+            "preloaded": self.preloaded,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,283 @@
+# Client asynchrone pour l'API SmartThings
+
+import asyncio
+import email.utils
+import json
+import logging
+import os
+import random
+import tempfile
+import time
+from typing import Optional, Dict, List, Any, Awaitable, Callable, Set
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_API_BASE = "https://api.smartthings.com/v1"
+
+# Capabilities qui identifient une Frame (mode Art / Ambient), puis une TV quelconque
+FRAME_CAPABILITIES = ("samsungvd.ambient", "samsungvd.ambient18", "samsungvd.ambientContent", "samsungvd.artMode")
+TV_CAPABILITIES = ("tvChannel", "samsungvd.mediaInputSource", "custom.picturemode")
+
+# Requêtes sans effet de bord, réessayables après une erreur 5xx ou une coupure en cours de réponse
+IDEMPOTENT_METHODS = ("GET", "HEAD")
+# Erreurs réseau survenues avant l'envoi de la requête: toujours réessayables
+UNSENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+class SmartThingsError(Exception):
+    """Erreur de l'API SmartThings, avec le code HTTP reçu (0 si erreur réseau)"""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class TokenBucket:
+    """
+    Seau à jetons partagé par toutes les requêtes: `rate` requêtes par seconde
+    en moyenne, avec des rafales jusqu'à `capacity`.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def pause(self, delay: float):
+        """Suspend toutes les requêtes pendant `delay` secondes (réponse 429)"""
+        self.paused_until = max(self.paused_until, time.monotonic() + delay)
+        self.tokens = 0
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Délai de l'en-tête Retry-After (secondes ou date HTTP)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class SmartThingsClient:
+    """
+    Client HTTP partagé (connexions keep-alive) pour l'API SmartThings.
+    Les erreurs 5xx et réseau sont réessayées avec un délai exponentiel, les
+    réponses 429 respectent Retry-After, et un seau à jetons limite le débit.
+    Une commande (POST) n'est réessayée que si elle n'a pas pu être traitée
+    (429, connexion impossible): l'appareil ne l'exécute jamais deux fois.
+    """
+
+    def __init__(self, token: str, base_url: str = DEFAULT_API_BASE, rate: float = 2.0, burst: float = 10.0,
+                 max_retries: int = 3, base_delay: float = 0.5, max_delay: float = 30.0, timeout: float = 10.0,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.bucket = TokenBucket(rate, burst)
+        self._client = httpx.AsyncClient(
+            base_url=base_url.rstrip("/") + "/",
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=10, max_keepalive_connections=5),
+            headers={"Authorization": f"Bearer {token}", "Content-Type": "application/json"},
+            transport=transport,  # httpx.MockTransport dans les tests
+        )
+
+    def _backoff(self, attempt: int) -> float:
+        return min(self.max_delay, self.base_delay * 2 ** attempt) * random.uniform(0.8, 1.2)
+
+    async def request(self, method: str, endpoint: str, data: Optional[Dict] = None) -> Any:
+        """Effectue une requête et retourne le JSON de la réponse"""
+        method = method.upper()
+        idempotent = method in IDEMPOTENT_METHODS
+        for attempt in range(self.max_retries + 1):
+            await self.bucket.acquire()
+            try:
+                r = await self._client.request(method, endpoint.lstrip("/"), json=data)
+            except httpx.HTTPError as exc:
+                error = SmartThingsError(0, f"Erreur réseau SmartThings: {exc}")
+                if not idempotent and not isinstance(exc, UNSENT_ERRORS):
+                    # Commande peut-être déjà appliquée par l'appareil
+                    raise error
+                delay = self._backoff(attempt)
+            else:
+                if r.status_code < 400:
+                    try:
+                        return r.json() if r.content else {}
+                    except ValueError as exc:
+                        raise SmartThingsError(502, f"Réponse SmartThings illisible ({r.status_code}): {exc}")
+                error = SmartThingsError(r.status_code, f"Erreur SmartThings {r.status_code}: {r.text[:200]}")
+                if r.status_code == 429:
+                    retry_after = parse_retry_after(r.headers.get("retry-after"))
+                    delay = min(self.max_delay, retry_after if retry_after is not None else self._backoff(attempt))
+                    # Les autres requêtes attendent aussi: inutile de consommer le quota
+                    self.bucket.pause(delay)
+                elif r.status_code >= 500 and idempotent:
+                    delay = self._backoff(attempt)
+                else:
+                    raise error
+
+            if attempt == self.max_retries:
+                raise error
+            logger.warning(f"{error.detail} sur {method} {endpoint}, nouvelle tentative dans {delay:.1f}s")
+            if error.status_code != 429:
+                await asyncio.sleep(delay)  # pour un 429, le seau à jetons est déjà en pause
+
+    async def close(self):
+        await self._client.aclose()
+
+
+def _summarize_device(device: Dict[str, Any]) -> Dict[str, Any]:
+    """Champs conservés en cache pour un appareil"""
+    capabilities = sorted({
+        cap["id"]
+        for component in device.get("components", [])
+        for cap in component.get("capabilities", [])
+        if "id" in cap
+    })
+    return {
+        "deviceId": device["deviceId"],
+        "name": device.get("name", ""),
+        "label": device.get("label", ""),
+        "deviceTypeName": device.get("deviceTypeName", ""),
+        "capabilities": capabilities,
+    }
+
+
+class DeviceDirectory:
+    """
+    Annuaire des appareils SmartThings du compte, persisté sur disque.
+    Les appareils sont indexés par capability; une entrée périmée (plus vieille
+    que `ttl`) reste utilisée pendant sa revalidation en tâche de fond.
+    """
+
+    def __init__(self, load_devices: Callable[[], Awaitable[Optional[List[Dict[str, Any]]]]],
+                 cache_path: Optional[str], ttl: float = 86400.0):
+        self.load_devices = load_devices
+        self.cache_path = cache_path
+        self.ttl = ttl
+        self.updated_at = 0.0
+        self.devices: Dict[str, Dict[str, Any]] = {}
+        self.by_capability: Dict[str, Set[str]] = {}
+        self._refresh: Optional[asyncio.Task] = None
+        self._read_cache()
+
+    def _index(self, devices: List[Dict[str, Any]], updated_at: float):
+        self.devices = {device["deviceId"]: device for device in devices}
+        self.by_capability = {}
+        for device in devices:
+            for capability in device["capabilities"]:
+                self.by_capability.setdefault(capability, set()).add(device["deviceId"])
+        self.updated_at = updated_at
+
+    def _read_cache(self):
+        if not self.cache_path or not os.path.isfile(self.cache_path):
+            return
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as fp:
+                data = json.load(fp)
+            self._index(data["devices"], data["updated_at"])
+            logger.info(f"Annuaire SmartThings chargé: {len(self.devices)} appareils")
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Cache des appareils SmartThings illisible: {e}")
+
+    def _write_cache(self):
+        directory = os.path.dirname(os.path.abspath(self.cache_path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=".devices-", dir=directory)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as fp:
+                json.dump({"updated_at": self.updated_at, "devices": list(self.devices.values())}, fp)
+            os.replace(tmp_path, self.cache_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    @property
+    def stale(self) -> bool:
+        return time.time() - self.updated_at > self.ttl
+
+    async def refresh(self) -> bool:
+        """Recharge la liste des appareils depuis l'API"""
+        devices = await self.load_devices()
+        if devices is None:
+            return False
+        self._index([_summarize_device(device) for device in devices], time.time())
+        logger.info(f"Annuaire SmartThings mis à jour: {len(self.devices)} appareils")
+        if self.cache_path:
+            try:
+                await asyncio.to_thread(self._write_cache)
+            except OSError as e:
+                logger.warning(f"Écriture du cache des appareils impossible: {e}")
+        return True
+
+    def _revalidate(self):
+        if self._refresh is None or self._refresh.done():
+            self._refresh = asyncio.create_task(self.refresh())
+
+    async def ensure_loaded(self):
+        """Garantit un annuaire utilisable; une entrée périmée est revalidée en arrière-plan"""
+        if not self.updated_at:
+            await self.refresh()
+        elif self.stale:
+            self._revalidate()
+
+    def with_capability(self, *capabilities: str) -> List[Dict[str, Any]]:
+        ids: Set[str] = set()
+        for capability in capabilities:
+            ids |= self.by_capability.get(capability, set())
+        return [self.devices[device_id] for device_id in sorted(ids)]
+
+    def capabilities(self, device_id: str) -> Optional[List[str]]:
+        device = self.devices.get(device_id)
+        return device["capabilities"] if device else None
+
+    async def find_frame(self) -> Optional[Dict[str, Any]]:
+        """Appareil le plus probablement une Frame: par capability, puis par nom"""
+        await self.ensure_loaded()
+        candidates = self.with_capability(*FRAME_CAPABILITIES) or self.with_capability(*TV_CAPABILITIES)
+        if not candidates:
+            # Appareils sans capabilities connues: ancienne recherche par nom
+            candidates = [
+                device for device in self.devices.values()
+                if "frame" in device["name"].lower() or "frame" in device["label"].lower()
+                or "tv" in device["deviceTypeName"].lower()
+            ]
+        if not candidates:
+            return None
+        # Entre plusieurs TV, préférer celle nommée "Frame"
+        candidates.sort(key=lambda d: "frame" not in (d["name"] + d["label"]).lower())
+        return candidates[0]
+
+    async def close(self):
+        if self._refresh:
+            self._refresh.cancel()
+            await asyncio.gather(self._refresh, return_exceptions=True)
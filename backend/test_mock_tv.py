@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Tests du contrôleur TV et de la file de travaux contre la TV simulée (mock_tv),
+sans matériel: envoi et sélection par la connexion directe, repli sur
+SmartThings quand elle est coupée, nouvelles tentatives et reprise des
+travaux au retour de la TV.
+
+    python -m backend.test_mock_tv
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import sys
+import tempfile
+import time
+
+# Modules du package backend (imports relatifs)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from backend.jobs import JobQueue
+from backend.mock_tv import MockFrameTV, ApiFaults, create_smartthings_app
+from backend.tv_controller import TvController
+
+logger = logging.getLogger(__name__)
+
+TOKEN = "mock-token"
+DEVICE_ID = "mock-frame-device"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def start_smartthings(tv: MockFrameTV, faults: ApiFaults):
+    """Lance l'API SmartThings simulée; retourne (serveur, tâche, URL de base)"""
+    import uvicorn
+
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(
+        create_smartthings_app(tv, TOKEN, faults, device_id=DEVICE_ID, extra_devices=3, page_size=2),
+        host="127.0.0.1", port=port, log_level="warning",
+    ))
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    return server, task, f"http://127.0.0.1:{port}/v1"
+
+
+def make_controller(tv_port: int, base_url: str, cache_dir: str, device_id=None) -> TvController:
+    """Contrôleur aux délais raccourcis pour les tests"""
+    controller = TvController(
+        "127.0.0.1", TOKEN, device_id, port=tv_port, smartthings_base_url=base_url,
+        device_cache_path=os.path.join(cache_dir, "devices.json"),
+        connect_wait=0.2, reconnect_base_delay=0.1, reconnect_max_delay=0.5,
+    )
+    controller.smartthings.base_delay = 0.01
+    controller.direct_breaker.base_delay = 0.1
+    controller.smartthings_breaker.base_delay = 0.1
+    return controller
+
+
+async def wait_for(condition, timeout: float = 10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("Délai dépassé")
+        await asyncio.sleep(0.05)
+
+
+async def _direct_upload_and_select():
+    # TV allumée: canal art (websocket) et envoi par socket D2D, sans passer par SmartThings
+    tv = MockFrameTV(port=free_port(), images=1)
+    await tv.start()
+    with tempfile.TemporaryDirectory() as cache_dir:
+        # API SmartThings injoignable: seul le chemin direct peut réussir
+        controller = make_controller(tv.port, f"http://127.0.0.1:{free_port()}/v1", cache_dir, device_id=DEVICE_ID)
+        controller.start()
+        try:
+            assert await controller.get_direct_client() is not None
+            assert await controller.supported(refresh=True)
+
+            data = b"\xff\xd8\xff\xe0" + bytes(range(256)) * 64
+            content_id = await controller.upload_image(data)
+            assert content_id in tv.content
+            assert tv.content[content_id]["file_size"] == len(data)
+            assert tv.stats["uploads"] == 1
+
+            assert await controller.select_image(content_id)
+            assert tv.current == content_id
+            current = await controller.get_current_art(refresh=True)
+            assert current["content_id"] == content_id
+            assert content_id in [item["content_id"] for item in await controller.available_art()]
+            assert controller.direct_breaker.state == "closed"
+        finally:
+            await controller.close()
+            await tv.stop()
+
+
+async def _fallback_to_smartthings():
+    # TV éteinte (port fermé): la connexion directe échoue, SmartThings prend le relais
+    tv = MockFrameTV(port=free_port())
+    server, task, base_url = await start_smartthings(tv, ApiFaults())
+    with tempfile.TemporaryDirectory() as cache_dir:
+        controller = make_controller(tv.port, base_url, cache_dir)
+        try:
+            assert await controller.find_device_id() == DEVICE_ID  # liste paginée
+            assert await controller.get_current_art(refresh=True) == {"mode": "Art"}
+            assert controller.direct_breaker.failures >= 1
+            assert controller.smartthings_breaker.state == "closed"
+
+            tv.art_mode = "off"
+            assert await controller.select_image("MY_F0001")
+            assert tv.art_mode == "on"
+        finally:
+            await controller.close()
+            server.should_exit = True
+            await task
+
+
+async def _job_retried_until_tv_returns():
+    # TV injoignable et SmartThings en erreur: le travail échoue, reste en attente
+    # sans consommer de tentative et la file se suspend; il aboutit dès que la TV
+    # et l'API reviennent
+    faults = ApiFaults(error_rate=1.0)
+    tv = MockFrameTV(port=free_port())
+    server, task, base_url = await start_smartthings(tv, faults)
+    with tempfile.TemporaryDirectory() as tmp:
+        controller = make_controller(tv.port, base_url, tmp, device_id=DEVICE_ID)
+
+        async def select(payload):
+            if not await controller.select_image(payload["content_id"]):
+                raise RuntimeError("Sélection impossible")
+            return {"content_id": payload["content_id"]}
+
+        queue = JobQueue(os.path.join(tmp, "jobs.db"), {"select": select}, controller.is_reachable,
+                         base_delay=0.05, probe_interval=0.1)
+        await queue.start()
+        try:
+            job = queue.enqueue("select", {"content_id": "MY_F0001"})
+            await wait_for(lambda: queue.get(job["id"])["last_error"] and not queue.tv_reachable)
+            assert queue.get(job["id"])["status"] == "pending"
+            assert queue.get(job["id"])["attempts"] == 0
+
+            faults.error_rate = 0.0
+            await tv.start()
+            await wait_for(lambda: queue.get(job["id"])["status"] == "done")
+            assert queue.tv_reachable
+        finally:
+            await queue.stop()
+            await controller.close()
+            await tv.stop()
+            server.should_exit = True
+            await task
+
+
+def test_direct_upload_and_select():
+    asyncio.run(_direct_upload_and_select())
+
+
+def test_fallback_to_smartthings():
+    asyncio.run(_fallback_to_smartthings())
+
+
+def test_job_retried_until_tv_returns():
+    asyncio.run(_job_retried_until_tv_returns())
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    test_direct_upload_and_select()
+    print("✅ Envoi et sélection par la connexion directe")
+    test_fallback_to_smartthings()
+    print("✅ Repli SmartThings")
+    test_job_retried_until_tv_returns()
+    print("✅ Reprise des travaux au retour de la TV")
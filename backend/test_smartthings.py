@@ -6,8 +6,12 @@ Script de test pour vérifier la configuration SmartThings
 import asyncio
 import logging
 import os
+import sys
 from dotenv import load_dotenv
-from tv_controller import TvController
+
+# tv_controller fait partie du package backend (imports relatifs)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from backend.tv_controller import TvController
 
 # Configuration des logs
 logging.basicConfig(
@@ -45,7 +49,8 @@ async def test_smartthings_config():
     tv_controller = TvController(
         tv_ip=tv_ip,
         smartthings_token=smartthings_token,
-        device_id=device_id
+        device_id=device_id,
+        smartthings_base_url=os.getenv("SMARTTHINGS_API_BASE", "https://api.smartthings.com/v1"),
     )
     
     try:
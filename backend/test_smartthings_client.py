@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Tests du client SmartThings (nouvelles tentatives, limite de débit, réponses
+illisibles) avec un transport httpx simulé, sans accès réseau.
+
+    python -m backend.test_smartthings_client
+"""
+
+import asyncio
+import email.utils
+import os
+import sys
+import time
+from typing import List
+
+import httpx
+
+# Modules du package backend (imports relatifs)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from backend.smartthings import SmartThingsClient, SmartThingsError, parse_retry_after
+
+
+def scripted_client(responses: List, **options) -> SmartThingsClient:
+    """
+    Client dont chaque requête reçoit la réponse suivante de `responses`
+    (une exception httpx est levée telle quelle)
+    """
+    remaining = list(responses)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        handler.calls += 1
+        answer = remaining.pop(0)
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+    handler.calls = 0
+    options.setdefault("base_delay", 0.01)
+    client = SmartThingsClient("token", base_url="http://smartthings.test/v1",
+                               transport=httpx.MockTransport(handler), **options)
+    client.calls = lambda: handler.calls
+    return client
+
+
+async def _run(client: SmartThingsClient, method: str = "GET", endpoint: str = "devices"):
+    try:
+        return await client.request(method, endpoint)
+    finally:
+        await client.close()
+
+
+def test_retry_after_pauses_requests():
+    client = scripted_client([
+        httpx.Response(429, headers={"Retry-After": "0.3"}),
+        httpx.Response(200, json={"items": []}),
+    ])
+    started = time.monotonic()
+    assert asyncio.run(_run(client)) == {"items": []}
+    assert time.monotonic() - started >= 0.3
+    assert client.calls() == 2
+
+
+def test_retries_server_errors():
+    client = scripted_client([
+        httpx.Response(503, text="indisponible"),
+        httpx.Response(500),
+        httpx.Response(200, json={"ok": True}),
+    ])
+    assert asyncio.run(_run(client)) == {"ok": True}
+    assert client.calls() == 3
+
+
+def test_retries_network_errors():
+    client = scripted_client([
+        httpx.ConnectError("connexion refusée"),
+        httpx.ReadTimeout("délai dépassé"),
+        httpx.Response(200, json={"ok": True}),
+    ])
+    assert asyncio.run(_run(client)) == {"ok": True}
+    assert client.calls() == 3
+
+
+def test_gives_up_after_max_retries():
+    client = scripted_client([httpx.ConnectError("connexion refusée")] * 3, max_retries=2)
+    try:
+        asyncio.run(_run(client))
+    except SmartThingsError as exc:
+        assert exc.status_code == 0
+    else:
+        raise AssertionError("SmartThingsError attendue")
+    assert client.calls() == 3
+
+
+def test_client_errors_are_not_retried():
+    client = scripted_client([httpx.Response(404, json={"error": {"code": "NotFoundError"}})])
+    try:
+        asyncio.run(_run(client))
+    except SmartThingsError as exc:
+        assert exc.status_code == 404
+    else:
+        raise AssertionError("SmartThingsError attendue")
+    assert client.calls() == 1
+
+
+def test_unreadable_response_is_502():
+    client = scripted_client([httpx.Response(200, text="<html>maintenance</html>")])
+    try:
+        asyncio.run(_run(client))
+    except SmartThingsError as exc:
+        assert exc.status_code == 502
+    else:
+        raise AssertionError("SmartThingsError attendue")
+    assert client.calls() == 1
+
+
+def test_commands_are_not_retried_after_server_errors():
+    # L'appareil a pu appliquer la commande avant l'erreur: pas de second envoi
+    for answer in (httpx.Response(503), httpx.ReadTimeout("délai dépassé")):
+        client = scripted_client([answer, httpx.Response(200, json={"results": []})])
+        try:
+            asyncio.run(_run(client, "POST", "devices/tv/commands"))
+        except SmartThingsError:
+            pass
+        else:
+            raise AssertionError("SmartThingsError attendue")
+        assert client.calls() == 1
+
+
+def test_commands_are_retried_when_not_processed():
+    client = scripted_client([
+        httpx.ConnectError("connexion refusée"),
+        httpx.Response(429, headers={"Retry-After": "0"}),
+        httpx.Response(200, json={"results": []}),
+    ])
+    assert asyncio.run(_run(client, "POST", "devices/tv/commands")) == {"results": []}
+    assert client.calls() == 3
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("2") == 2.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("bientôt") is None
+    later = email.utils.formatdate(time.time() + 60, usegmt=True)
+    assert 55 <= parse_retry_after(later) <= 60
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
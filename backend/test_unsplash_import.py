@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Tests de l'import Unsplash côté serveur (/api/unsplash/import) contre une API
+Unsplash simulée par un transport httpx, sans accès réseau: suivi des
+téléchargements, déduplication par contenu et isolement d'une photo en échec.
+
+    python -m backend.test_unsplash_import
+"""
+
+import asyncio
+import io
+import os
+import sys
+import tempfile
+from typing import Dict, List
+
+import httpx
+from PIL import Image
+
+# Base, cache et file de travaux temporaires, API Unsplash simulée (avant l'import du backend)
+TMP_DIR = tempfile.mkdtemp(prefix="unsplash-import-")
+os.environ.setdefault("TV_IP", "127.0.0.1")
+os.environ["UNSPLASH_ACCESS_KEY"] = "test-key"
+os.environ["UNSPLASH_API_BASE"] = "http://unsplash.test"
+os.environ["CATALOG_DB_PATH"] = os.path.join(TMP_DIR, "catalog.db")
+os.environ["JOBS_DB_PATH"] = os.path.join(TMP_DIR, "jobs.db")
+os.environ["CACHE_DIR"] = os.path.join(TMP_DIR, "cache")
+
+# Modules du package backend (imports relatifs)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from backend import main
+from backend.catalog import ImageCatalog
+from backend.unsplash import UnsplashClient
+
+
+def jpeg(color: str) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (32, 32), color).save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+class FakeUnsplash:
+    """
+    API Unsplash et CDN d'images simulés; `images` associe un identifiant de
+    photo à son contenu (une exception est levée telle quelle)
+    """
+
+    def __init__(self, images: Dict[str, object]):
+        self.images = images
+        self.tracked: List[str] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        base = os.environ["UNSPLASH_API_BASE"]
+        path = request.url.path
+        if request.url.host == "images.test":
+            answer = self.images[path.strip("/")]
+            if isinstance(answer, Exception):
+                raise answer
+            return httpx.Response(200, content=answer)
+        assert request.headers["Authorization"] == "Client-ID test-key"
+        photo_id = path.split("/")[2]
+        if path.endswith("/download"):
+            self.tracked.append(photo_id)
+            return httpx.Response(200, json={"url": f"http://images.test/{photo_id}"})
+        return httpx.Response(200, json={
+            "id": photo_id,
+            "urls": {"full": f"http://images.test/{photo_id}"},
+            "links": {"download_location": f"{base}/photos/{photo_id}/download"},
+        })
+
+
+async def _import(fake: FakeUnsplash, ids: List[str], image_dir: str) -> List[main.UnsplashImportResult]:
+    """Importe `ids` dans un dossier images et un catalogue vides"""
+    main.IMAGE_DIR = image_dir
+    main.catalog = ImageCatalog(os.path.join(image_dir, "catalog.db"), image_dir)
+    main._unsplash_import_slots = asyncio.Semaphore(main.UNSPLASH_IMPORT_CONCURRENCY)
+    main.unsplash = UnsplashClient(
+        "test-key", base_url=os.environ["UNSPLASH_API_BASE"], transport=httpx.MockTransport(fake)
+    )
+    try:
+        return await main.import_unsplash(main.UnsplashImportRequest(ids=ids))
+    finally:
+        await main.unsplash.close()
+        main.catalog.close()
+
+
+def images_in(directory: str) -> List[str]:
+    return sorted(name for name in os.listdir(directory) if not name.startswith("catalog.db"))
+
+
+def test_import_tracks_downloads_and_deduplicates():
+    # Deux photos Unsplash au contenu identique: une seule copie dans la bibliothèque
+    same = jpeg("red")
+    fake = FakeUnsplash({"first": same, "second": same, "other": jpeg("blue")})
+    with tempfile.TemporaryDirectory() as image_dir:
+        results = asyncio.run(_import(fake, ["first", "second", "other"], image_dir))
+        by_id = {result.id: result for result in results}
+        assert all(result.error is None for result in results)
+        assert sorted(fake.tracked) == ["first", "other", "second"]
+        assert [by_id["first"].duplicate, by_id["second"].duplicate].count(True) == 1
+        assert by_id["first"].file == by_id["second"].file
+        assert images_in(image_dir) == sorted({by_id["first"].file, by_id["other"].file})
+
+
+def test_failing_photo_does_not_abort_the_batch():
+    # Erreur inattendue (non httpx) pendant un téléchargement: seule cette photo échoue
+    fake = FakeUnsplash({"ok": jpeg("green"), "broken": RuntimeError("flux corrompu")})
+    with tempfile.TemporaryDirectory() as image_dir:
+        results = asyncio.run(_import(fake, ["ok", "broken"], image_dir))
+        by_id = {result.id: result for result in results}
+        assert by_id["ok"].error is None and by_id["ok"].file
+        assert by_id["broken"].error and by_id["broken"].file is None
+        # Pas de fichier temporaire abandonné par la photo en échec
+        assert images_in(image_dir) == [by_id["ok"].file]
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,67 @@
+# Génération et cache des miniatures de la bibliothèque locale
+
+import asyncio
+import logging
+from typing import Dict, Set
+
+from .disk_cache import DiskCache
+from .imaging import get_pool, render_thumbnail
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_SIZES = (256, 512, 1024)
+THUMBNAIL_FORMATS = {"webp": "image/webp", "jpeg": "image/jpeg"}
+
+# Taille et format générés dès l'upload (ceux de la grille du frontend)
+EAGER_VARIANTS = ((512, "webp"), (512, "jpeg"))
+
+
+class ThumbnailService:
+    """
+    Miniatures indexées par hash de contenu: une image renommée ou dupliquée
+    partage les mêmes fichiers en cache. Le rendu s'exécute dans le pool de processus.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self.cache = DiskCache(cache_dir, max_bytes)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._background: Set[asyncio.Task] = set()
+
+    @staticmethod
+    def cache_key(content_hash: str, size: int, fmt: str) -> str:
+        return f"{content_hash}_{size}.{fmt}"
+
+    async def get(self, source_path: str, content_hash: str, size: int, fmt: str) -> str:
+        """Retourne le chemin de la miniature, en la générant si nécessaire"""
+        key = self.cache_key(content_hash, size, fmt)
+        path = self.cache.get(key)
+        if path:
+            return path
+
+        # Une seule génération pour des requêtes simultanées sur la même miniature
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._render(key, source_path, size, fmt))
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(future)
+
+    async def _render(self, key: str, source_path: str, size: int, fmt: str) -> str:
+        loop = asyncio.get_running_loop()
+        data = await loop.run_in_executor(get_pool(), render_thumbnail, source_path, size, fmt)
+        path = await asyncio.to_thread(self.cache.put, key, data)
+        logger.info(f"Miniature générée: {key} ({len(data)} octets)")
+        return path
+
+    def warm(self, source_path: str, content_hash: str):
+        """Planifie en tâche de fond la génération des miniatures de la grille"""
+        async def _warm():
+            for size, fmt in EAGER_VARIANTS:
+                try:
+                    await self.get(source_path, content_hash, size, fmt)
+                except Exception as e:
+                    logger.warning(f"Erreur génération miniature {source_path}: {e}")
+
+        task = asyncio.create_task(_warm())
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
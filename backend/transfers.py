@@ -0,0 +1,256 @@
+# Envoi des images locales vers la TV
+
+import asyncio
+import logging
+import os
+import time
+import traceback
+import weakref
+from dataclasses import dataclass
+from typing import Optional, Dict, List, Any, AsyncIterator, Awaitable, Callable, Tuple
+
+from .budget import StorageBudget, StorageBudgetError
+from .catalog import ImageCatalog
+from .encoder import FrameEncoder
+from .scheduler import SchedulerBusy, CommandCancelled
+from .tv_controller import TvController
+
+logger = logging.getLogger(__name__)
+
+# Limite Samsung ~10MB par image
+TV_MAX_UPLOAD_BYTES = 10 * 1024 * 1024
+
+# Nombre d'images préparées d'avance pendant qu'un envoi est en cours
+PIPELINE_DEPTH = 2
+
+
+class TransferError(Exception):
+    """Échec d'envoi, avec le code HTTP correspondant"""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+@dataclass
+class PreparedTransfer:
+    file: str
+    content_hash: Optional[str]
+    remote_filename: Optional[str] = None  # déjà présent sur la TV
+    data: Optional[bytes] = None
+    error: Optional[TransferError] = None
+
+
+class TransferService:
+    """
+    Prépare (pré-encodage) et envoie les images du catalogue vers la TV.
+    Un seul envoi à la fois par contenu: les copies identiques attendent le premier.
+    """
+
+    def __init__(self, catalog: ImageCatalog, encoder: FrameEncoder,
+                 get_controller: Callable[[], Awaitable[TvController]], budget: Optional[StorageBudget] = None):
+        self.catalog = catalog
+        self.encoder = encoder
+        self.get_controller = get_controller
+        self.budget = budget
+        self._locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+    async def prepare(self, file: str) -> PreparedTransfer:
+        """Lit et pré-encode une image du catalogue (sans contacter la TV)"""
+        entry = self.catalog.get(file)
+        local_path = self.catalog.path_for(file)
+        if entry is None or not os.path.exists(local_path):
+            logger.error(f"Fichier local non trouvé: {local_path}")
+            raise TransferError(404, "Fichier non trouvé")
+
+        prepared = PreparedTransfer(file=file, content_hash=entry["content_hash"])
+        if entry["remote_filename"]:
+            prepared.remote_filename = entry["remote_filename"]
+            return prepared
+
+        # Préparer l'image au format natif de la Frame (JPEG 4K, taille cible)
+        logger.info(f"Préparation du fichier: {local_path}")
+        try:
+            prepared.data = await self.encoder.encode(local_path, entry["content_hash"])
+        except Exception as exc:
+            logger.error(f"Erreur préparation image: {exc}")
+            raise TransferError(400, f"Image illisible ou non supportée: {exc}")
+
+        logger.info(f"Taille du fichier préparé: {len(prepared.data)} bytes")
+        # Vérifier la taille du fichier (limite Samsung ~10MB)
+        if len(prepared.data) > TV_MAX_UPLOAD_BYTES:
+            logger.error(f"Fichier trop volumineux: {len(prepared.data)} bytes")
+            raise TransferError(400, "Fichier trop volumineux (max 10MB)")
+        return prepared
+
+    async def upload(self, prepared: PreparedTransfer, tv_controller: TvController) -> Tuple[str, Optional[int]]:
+        """
+        Envoie une image préparée et enregistre son remote_filename.
+        Retourne (remote_filename, octets envoyés); None si un mapping existant a été réutilisé.
+        """
+        lock = self._locks.setdefault(prepared.content_hash or prepared.file, asyncio.Lock())
+        async with lock:
+            # Relire l'entrée: une copie identique a pu être envoyée entre-temps
+            entry = self.catalog.get(prepared.file)
+            if entry and entry["remote_filename"]:
+                logger.info(f"Image déjà envoyée, remote_filename: {entry['remote_filename']}")
+                return entry["remote_filename"], None
+            if prepared.data is None:
+                # Le mapping a été invalidé depuis la préparation
+                prepared = await self.prepare(prepared.file)
+                if prepared.remote_filename:
+                    return prepared.remote_filename, None
+
+            if self.budget:
+                try:
+                    await self.budget.make_room(len(prepared.data))
+                except (StorageBudgetError, SchedulerBusy) as exc:
+                    raise TransferError(exc.status_code, exc.detail)
+                except CommandCancelled:
+                    raise TransferError(409, "Libération de place sur la TV annulée")
+                except Exception as exc:
+                    logger.error(f"Libération de place sur la TV impossible: {exc!r}")
+                    raise TransferError(502, f"Libération de place sur la TV impossible: {exc}")
+            try:
+                return await self._send_prepared(prepared, tv_controller), len(prepared.data)
+            finally:
+                if self.budget:
+                    self.budget.release(len(prepared.data))
+
+    async def _send_prepared(self, prepared: PreparedTransfer, tv_controller: TvController) -> str:
+        logger.info("Envoi JPEG vers la TV...")
+        try:
+            remote_filename = await tv_controller.upload_image(prepared.data, file_type="JPEG", matte="none")
+        except SchedulerBusy as exc:
+            raise TransferError(exc.status_code, exc.detail)
+        except CommandCancelled:
+            logger.info(f"Envoi de {prepared.file} annulé")
+            raise TransferError(409, "Envoi annulé")
+        except Exception as exc:
+            logger.error(f"Erreur envoi TV: {exc}")
+            logger.error(f"Type d'erreur: {type(exc).__name__}")
+            logger.error(f"Traceback complet:\n{traceback.format_exc()}")
+            raise TransferError(500, f"Erreur lors de l'envoi vers la TV: {exc}")
+        if not remote_filename:
+            raise TransferError(500, "Échec de l'upload via les deux méthodes (directe et SmartThings)")
+
+        logger.info(f"Envoi réussi, remote_filename: {remote_filename}")
+        await asyncio.to_thread(self.catalog.set_remote, prepared.file, remote_filename, len(prepared.data))
+        return remote_filename
+
+    async def _check_support(self, tv_controller: TvController):
+        logger.info("Vérification du support Art Mode")
+        try:
+            supported = await tv_controller.supported()
+        except SchedulerBusy as exc:
+            raise TransferError(exc.status_code, exc.detail)
+        except Exception as exc:
+            raise TransferError(500, f"Erreur lors de l'envoi vers la TV: {exc}")
+        if supported is None:
+            # TV endormie ou injoignable: réessayer plus tard
+            raise TransferError(503, "Support de l'Art Mode inconnu: TV injoignable")
+        if not supported:
+            logger.error("TV ne supporte pas l'Art Mode")
+            raise TransferError(400, "Cette TV ne supporte pas l'Art Mode")
+
+    async def send(self, file: str) -> str:
+        """Envoie une image vers la TV; retourne son remote_filename"""
+        prepared = await self.prepare(file)
+        if prepared.remote_filename:
+            logger.info(f"Image déjà envoyée, remote_filename: {prepared.remote_filename}")
+            return prepared.remote_filename
+
+        logger.info("Début envoi vers la TV")
+        tv_controller = await self.get_controller()
+        await self._check_support(tv_controller)
+        remote_filename, _ = await self.upload(prepared, tv_controller)
+        return remote_filename
+
+    async def send_batch(self, files: List[str]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Envoie une liste d'images sur une même session TV et produit un
+        événement de progression par image. La préparation des images suivantes
+        se fait pendant l'envoi en cours; un échec n'interrompt pas le lot.
+        """
+        total = len(files)
+        started = time.monotonic()
+        yield {"event": "start", "total": total}
+
+        tv_controller = await self.get_controller()
+        try:
+            await self._check_support(tv_controller)
+        except TransferError as exc:
+            yield {"event": "error", "detail": exc.detail}
+            yield {"event": "done", "total": total, "sent": 0, "skipped": 0, "failed": total, "results": []}
+            return
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=PIPELINE_DEPTH)
+        closing = asyncio.Event()  # le consommateur arrête le producteur
+
+        async def producer():
+            try:
+                for file in files:
+                    try:
+                        prepared = await self.prepare(file)
+                    except TransferError as exc:
+                        prepared = PreparedTransfer(file=file, content_hash=None, error=exc)
+                    except Exception as exc:
+                        # Erreur inattendue (encodeur, Pillow...): l'image échoue, le lot continue
+                        logger.error(f"Préparation de {file} impossible: {exc!r}")
+                        prepared = PreparedTransfer(
+                            file=file, content_hash=None, error=TransferError(500, f"Préparation impossible: {exc}"))
+                    await queue.put(prepared)
+            finally:
+                # Fin de production, normale ou non: le consommateur ne doit jamais attendre indéfiniment
+                if not closing.is_set():
+                    await queue.put(None)
+
+        producer_task = asyncio.create_task(producer())
+        results: List[Dict[str, Any]] = []
+        counts = {"sent": 0, "skipped": 0, "failed": 0}
+        sent_bytes = 0
+        exhausted = False
+        try:
+            for index in range(total):
+                prepared: Optional[PreparedTransfer] = None if exhausted else await queue.get()
+                if prepared is None:
+                    # Producteur interrompu avant la fin du lot
+                    exhausted = True
+                    prepared = PreparedTransfer(
+                        file=files[index], content_hash=None, error=TransferError(500, "Préparation interrompue"))
+                result: Dict[str, Any] = {"file": prepared.file, "remote_filename": None}
+                try:
+                    if prepared.error:
+                        raise prepared.error
+                    if prepared.remote_filename:
+                        result["remote_filename"] = prepared.remote_filename
+                        result["status"] = "skipped"
+                    else:
+                        result["remote_filename"], size = await self.upload(prepared, tv_controller)
+                        if size is None:
+                            # Envoyée entre-temps par un autre travail ou une autre requête
+                            result["status"] = "skipped"
+                        else:
+                            result["status"] = "sent"
+                            result["bytes"] = size
+                            sent_bytes += size
+                except TransferError as exc:
+                    result["status"] = "failed"
+                    result["error"] = exc.detail
+                except Exception as exc:
+                    # Erreur inattendue: l'image échoue, le lot continue jusqu'à l'événement done
+                    logger.error(f"Envoi de {prepared.file} impossible: {exc!r}")
+                    result["status"] = "failed"
+                    result["error"] = f"Erreur lors de l'envoi vers la TV: {exc}"
+                counts[result["status"]] += 1
+                results.append(result)
+                yield {"event": "progress", "index": index, "completed": index + 1, "total": total, **result}
+        finally:
+            closing.set()
+            producer_task.cancel()
+
+        elapsed = time.monotonic() - started
+        logger.info(f"Envoi groupé terminé en {elapsed:.1f}s: {counts}")
+        yield {"event": "done", "total": total, **counts, "bytes": sent_bytes, "elapsed": round(elapsed, 2),
+               "results": results}
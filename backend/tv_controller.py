@@ -3,128 +3,506 @@
 import logging
 import os
 import traceback
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, List, Any, Callable
 from samsungtvws.async_art import SamsungTVAsyncArt
-import requests
+from samsungtvws.exceptions import ConnectionFailure
+from websockets.exceptions import ConnectionClosed
 import json
 import asyncio
+import random
+import time
+
+from .circuit import CircuitBreaker
+from .scheduler import CommandScheduler, SchedulerBusy, INTERACTIVE, STATUS, BULK
+from .smartthings import SmartThingsClient, SmartThingsError, DeviceDirectory, DEFAULT_API_BASE
 
 logger = logging.getLogger(__name__)
 
+# Erreurs de transport: seules elles comptent comme une panne du chemin direct
+TRANSPORT_ERRORS = (OSError, asyncio.TimeoutError, ConnectionFailure, ConnectionClosed)
+
+class TvStateCache:
+    """
+    Dernier état connu de la TV (art affiché, mode Art, support, infos device),
+    tenu à jour par les événements du websocket art et réconcilié périodiquement.
+    Tant que la connexion directe est active, les valeurs restent valides; sinon
+    elles expirent après `offline_ttl` secondes.
+    """
+
+    # Événements du canal art qui changent l'image affichée
+    CONTENT_EVENTS = ("image_selected", "slideshow_image_changed", "auto_rotation_image_changed")
+
+    def __init__(self, offline_ttl: float = 10.0):
+        self.offline_ttl = offline_ttl
+        self.live = False
+        self.events_received = 0
+        self.last_event: Optional[str] = None
+        self.last_reconciled: Optional[float] = None
+        self.reconcile_requested = asyncio.Event()
+        self.listeners: List[Callable[[str, Any], None]] = []  # appelés quand une valeur change
+        self._values: Dict[str, Any] = {}
+        self._updated: Dict[str, float] = {}
+
+    def _changed(self, field: str, value: Any):
+        for listener in self.listeners:
+            try:
+                listener(field, value)
+            except Exception as e:
+                logger.warning(f"Erreur d'un abonné à l'état TV: {e}")
+
+    def set(self, field: str, value: Any):
+        previous = self._values.get(field)
+        self._values[field] = value
+        self._updated[field] = time.time()
+        if value != previous:
+            self._changed(field, value)
+
+    def invalidate(self, field: str):
+        self._updated.pop(field, None)
+        if self._values.pop(field, None) is not None:
+            self._changed(field, None)
+
+    def get(self, field: str) -> Optional[Any]:
+        """Valeur en cache, ou None si inconnue ou périmée"""
+        if field not in self._values:
+            return None
+        if not self.live and time.time() - self._updated[field] > self.offline_ttl:
+            return None
+        return self._values[field]
+
+    def attach(self, client: SamsungTVAsyncArt):
+        """Intercepte les événements reçus par le client (avant start_listening)"""
+        original = client.process_event
+
+        async def process_event(event, response=None, *args, **kwargs):
+            try:
+                self.handle_message(event, response)
+            except Exception as e:
+                logger.warning(f"Événement TV illisible ({event}): {e}")
+            return await original(event, response, *args, **kwargs)
+
+        client.process_event = process_event
+
+    def handle_message(self, event: str, response: Any):
+        if event != "d2d_service_message" or not isinstance(response, dict):
+            return
+        data = response.get("data")
+        if isinstance(data, str):
+            data = json.loads(data)
+        if isinstance(data, dict) and data.get("event"):
+            self.apply_event(data["event"], data)
+
+    def apply_event(self, event: str, data: Dict[str, Any]):
+        self.events_received += 1
+        self.last_event = event
+        if event == "art_mode_changed":
+            self.set("art_mode", data.get("status"))
+        elif event == "artmode_status":
+            self.set("art_mode", data.get("value"))
+        elif event in self.CONTENT_EVENTS and data.get("content_id"):
+            current = self._values.get("current_art") or {}
+            if current.get("content_id") != data["content_id"]:
+                self.set("current_art", {"content_id": data["content_id"]})
+                # Compléter les détails (matte, catégorie...) en arrière-plan
+                self.reconcile_requested.set()
+        elif event == "go_to_standby":
+            self.set("art_mode", "off")
+        elif event == "wakeup":
+            self.reconcile_requested.set()
+        else:
+            return
+        logger.info(f"État TV mis à jour par l'événement {event}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "live": self.live,
+            "current_art": self._values.get("current_art"),
+            "art_mode": self._values.get("art_mode"),
+            "supported": self._values.get("supported"),
+            "device_info": self._values.get("device_info"),
+            "updated_at": dict(self._updated),
+            "events_received": self.events_received,
+            "last_event": self.last_event,
+            "last_reconciled": self.last_reconciled,
+        }
+
+
 class TvController:
     """
     Contrôleur hybride pour TV Samsung Frame qui utilise l'API directe en premier,
     puis SmartThings API comme fallback.
     """
     
-    def __init__(self, tv_ip: str, smartthings_token: Optional[str] = None, device_id: Optional[str] = None):
+    def __init__(self, tv_ip: str, smartthings_token: Optional[str] = None, device_id: Optional[str] = None,
+                 port: int = 8002, smartthings_base_url: str = DEFAULT_API_BASE,
+                 device_cache_path: Optional[str] = None, device_cache_ttl: float = 86400.0, keepalive_interval: float = 30.0, ping_timeout: float = 10.0,
+                 connect_wait: float = 5.0, reconnect_base_delay: float = 1.0, reconnect_max_delay: float = 60.0,
+                 reconcile_interval: float = 60.0, max_concurrent_commands: int = 4,
+                 command_queue_limits: Optional[Dict[str, int]] = None):
         self.tv_ip = tv_ip
+        self.port = port
         self.smartthings_token = smartthings_token
         self.device_id = device_id
         self.direct_client: Optional[SamsungTVAsyncArt] = None
-        self.smartthings_base_url = "https://api.smartthings.com/v1"
-        
+        self.smartthings_base_url = smartthings_base_url
+        self.smartthings: Optional[SmartThingsClient] = (
+            SmartThingsClient(smartthings_token, base_url=smartthings_base_url) if smartthings_token else None
+        )
+        # Appareils du compte SmartThings (cache disque, indexés par capability)
+        self.devices = DeviceDirectory(self._list_devices, device_cache_path, ttl=device_cache_ttl)
+        # Santé de chaque chemin: un chemin en panne est ignoré jusqu'à la prochaine sonde
+        self.direct_breaker = CircuitBreaker("direct")
+        self.smartthings_breaker = CircuitBreaker("smartthings")
+        # Supervision de la connexion websocket directe
+        self.keepalive_interval = keepalive_interval
+        self.ping_timeout = ping_timeout
+        self.connect_wait = connect_wait
+        self.reconnect_base_delay = reconnect_base_delay
+        self.reconnect_max_delay = reconnect_max_delay
+        self.reconnects = 0
+        self._ready = asyncio.Event()
+        self._suspect = asyncio.Event()
+        self._supervisor: Optional[asyncio.Task] = None
+        # État de la TV servi depuis la mémoire
+        self.state = TvStateCache()
+        # Support de l'Art Mode: ne change pas, demandé une fois par connexion directe
+        self._supported: Optional[bool] = None
+        # Abonnés aux changements (événement, données): état TV et santé de la connexion
+        self.listeners: List[Callable[[str, Dict[str, Any]], None]] = []
+        self.state.listeners.append(self._state_changed)
+        self.direct_breaker.on_change = self._health_changed
+        self.smartthings_breaker.on_change = self._health_changed
+        self.reconcile_interval = reconcile_interval
+        self._reconciler: Optional[asyncio.Task] = None
+        # Appels identiques simultanés: une seule requête TV partagée
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.call_stats: Dict[str, Dict[str, int]] = {}
+        # Commandes TV ordonnancées par priorité (interactive > status > bulk)
+        self.scheduler = CommandScheduler(max_concurrent_commands, command_queue_limits)
+
+    def start(self):
+        """Démarre la supervision de la connexion directe (connexion ouverte dès maintenant)"""
+        if self._supervisor is None or self._supervisor.done():
+            self._supervisor = asyncio.create_task(self._supervise())
+        if self._reconciler is None or self._reconciler.done():
+            self._reconciler = asyncio.create_task(self._reconcile_loop())
+
+    async def _connect(self) -> Optional[SamsungTVAsyncArt]:
+        client = None
+        try:
+            logger.info(f"Création du client direct vers {self.tv_ip}")
+            client = SamsungTVAsyncArt(host=self.tv_ip, port=self.port)
+            self.state.attach(client)
+            await client.start_listening()
+            logger.info("Client direct créé avec succès")
+            return client
+        except Exception as e:
+            logger.error(f"Erreur création client direct: {e}")
+            if client is not None:
+                await self._close_client(client)
+            return None
+
+    async def _close_client(self, client: SamsungTVAsyncArt):
+        try:
+            await client.close()
+        except Exception as e:
+            logger.debug(f"Erreur fermeture client direct: {e}")
+
+    async def _ping(self, client: SamsungTVAsyncArt) -> bool:
+        """Vérifie que la connexion répond encore (requête légère sur le canal art)"""
+        is_alive = getattr(client, "is_alive", None)
+        if callable(is_alive) and not is_alive():
+            return False
+        try:
+            await asyncio.wait_for(client.get_api_version(), self.ping_timeout)
+            return True
+        except Exception as e:
+            logger.warning(f"Connexion directe sans réponse: {e or type(e).__name__}")
+            return False
+
+    async def _supervise(self):
+        """Maintient la connexion directe: keepalive, détection de coupure, reconnexion"""
+        attempt = 0
+        while True:
+            client = await self._connect()
+            if client is None:
+                # Délai exponentiel avec gigue pour ne pas marteler une TV en veille
+                delay = min(self.reconnect_max_delay, self.reconnect_base_delay * 2 ** attempt)
+                delay *= random.uniform(0.5, 1.5)
+                attempt += 1
+                logger.info(f"Nouvelle tentative de connexion directe dans {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+
+            if attempt or self.reconnects:
+                logger.info("Connexion directe rétablie")
+            attempt = 0
+            self._supported = None
+            self.direct_client = client
+            self.direct_breaker.record_success()
+            self._ready.set()
+            self.state.live = True
+            self.state.reconcile_requested.set()
+            self._health_changed()
+            try:
+                while True:
+                    try:
+                        await asyncio.wait_for(self._suspect.wait(), self.keepalive_interval)
+                    except asyncio.TimeoutError:
+                        pass
+                    self._suspect.clear()
+                    if not await self._ping(client):
+                        break
+            finally:
+                self._ready.clear()
+                self.state.live = False
+            self.direct_client = None
+            logger.warning("Connexion directe perdue, reconnexion")
+            self.reconnects += 1
+            self._health_changed()
+            await self._close_client(client)
+
+    async def reconcile(self):
+        """Relit l'état complet de la TV par la connexion directe et met à jour le cache"""
+        client = self.direct_client
+        if client is None:
+            return
+        try:
+            if self._supported is None:
+                self._supported = await client.supported()
+            self.state.set("supported", self._supported)
+            self.state.set("device_info", await client.get_device_info())
+            if hasattr(client, "get_artmode"):
+                self.state.set("art_mode", await client.get_artmode())
+            try:
+                self.state.set("current_art", await client.get_current())
+            except AssertionError:
+                # Aucune image affichée
+                self.state.invalidate("current_art")
+        except Exception as e:
+            logger.warning(f"Réconciliation de l'état TV impossible: {e}")
+            self._suspect.set()
+            return
+        self.state.last_reconciled = time.time()
+        logger.info("État TV réconcilié")
+
+    async def _reconcile_loop(self):
+        """Réconcilie l'état au (re)démarrage, sur demande et périodiquement"""
+        while True:
+            try:
+                await asyncio.wait_for(self.state.reconcile_requested.wait(), self.reconcile_interval)
+            except asyncio.TimeoutError:
+                pass
+            self.state.reconcile_requested.clear()
+            if self._ready.is_set():
+                try:
+                    await self.scheduler.run(STATUS, "reconcile", self.reconcile)
+                except SchedulerBusy:
+                    logger.info("Réconciliation reportée: file des commandes d'état pleine")
+
     async def get_direct_client(self) -> Optional[SamsungTVAsyncArt]:
-        """Obtient le client direct, le crée si nécessaire"""
-        if self.direct_client is None:
+        """Attend que la connexion directe soit prête (None si elle ne l'est pas à temps)"""
+        self.start()
+        if not self._ready.is_set():
             try:
-                logger.info(f"Création du client direct vers {self.tv_ip}")
-                self.direct_client = SamsungTVAsyncArt(host=self.tv_ip, port=8002)
-                await self.direct_client.start_listening()
-                logger.info("Client direct créé avec succès")
-            except Exception as e:
-                logger.error(f"Erreur création client direct: {e}")
+                await asyncio.wait_for(self._ready.wait(), self.connect_wait)
+            except asyncio.TimeoutError:
                 return None
         return self.direct_client
-    
+
+    def _direct_failed(self, error: Exception):
+        """
+        Échec de transport d'une requête directe: le superviseur vérifie la connexion
+        sans attendre. Les erreurs applicatives de la TV (pas d'image affichée,
+        content_id inconnu...) ne passent pas par ici: elles sont propagées.
+        """
+        self.direct_breaker.record_failure(error)
+        self._suspect.set()
+
+    def _direct_answered(self):
+        """
+        Erreur applicative d'une requête directe: la TV a répondu, le chemin
+        fonctionne (une sonde en cours se termine au lieu de rester en suspens)
+        """
+        self.direct_breaker.record_success()
+
+    async def _direct(self) -> Optional[SamsungTVAsyncArt]:
+        """Client direct si le chemin est disponible (None s'il est désactivé ou injoignable)"""
+        if not self.direct_breaker.allow():
+            logger.info("Méthode directe ignorée (chemin désactivé)")
+            return None
+        client = await self.get_direct_client()
+        if client is None:
+            self.direct_breaker.record_failure("Connexion directe indisponible")
+        return client
+
+    def _count(self, operation: str, counter: str):
+        stats = self.call_stats.setdefault(operation, {"cache_hits": 0, "calls": 0, "coalesced": 0})
+        stats[counter] += 1
+
+    async def _single_flight(self, operation: str, fetch: Callable[[], Any]) -> Any:
+        """Exécute `fetch`, ou rejoint l'appel identique déjà en cours"""
+        future = self._inflight.get(operation)
+        if future is None:
+            self._count(operation, "calls")
+            future = asyncio.ensure_future(fetch())
+            self._inflight[operation] = future
+            future.add_done_callback(lambda _: self._inflight.pop(operation, None))
+        else:
+            self._count(operation, "coalesced")
+        return await asyncio.shield(future)
+
+    def call_snapshot(self) -> Dict[str, Any]:
+        """Compteurs par opération et appels en cours (panneau de debug)"""
+        return {"calls": self.call_stats, "in_flight": sorted(self._inflight)}
+
+    def _notify(self, event: str, data: Dict[str, Any]):
+        for listener in self.listeners:
+            try:
+                listener(event, data)
+            except Exception as e:
+                logger.warning(f"Erreur d'un abonné aux événements TV: {e}")
+
+    def _state_changed(self, field: str, value: Any):
+        if field == "current_art":
+            self._notify("current-art", {"current_art": value})
+        elif field == "art_mode":
+            self._notify("art-mode", {"art_mode": value})
+
+    def _health_changed(self):
+        self._notify("connection-health", self.health())
+
+    def health(self) -> Dict[str, Any]:
+        """État des chemins direct et SmartThings"""
+        return {
+            "direct": {**self.direct_breaker.snapshot(), "connected": self._ready.is_set(),
+                       "reconnects": self.reconnects},
+            "smartthings": self.smartthings_breaker.snapshot(),
+        }
+
+    async def is_reachable(self, timeout: float = 3.0) -> bool:
+        """Vérifie rapidement (connexion TCP) que la TV répond sur le réseau"""
+        try:
+            _, writer = await asyncio.wait_for(asyncio.open_connection(self.tv_ip, self.port), timeout)
+            writer.close()
+            await writer.wait_closed()
+            return True
+        except (OSError, asyncio.TimeoutError):
+            return False
+
     async def _smartthings_request(self, method: str, endpoint: str, data: Optional[Dict] = None) -> Optional[Dict]:
         """Effectue une requête vers l'API SmartThings"""
-        if not self.smartthings_token:
+        if not self.smartthings:
             logger.error("Token SmartThings manquant")
             return None
-            
-        headers = {
-            "Authorization": f"Bearer {self.smartthings_token}",
-            "Content-Type": "application/json"
-        }
-        
-        url = f"{self.smartthings_base_url}/{endpoint}"
-        
+
+        if not self.smartthings_breaker.allow():
+            logger.info(f"SmartThings ignoré (chemin désactivé): {method} {endpoint}")
+            return None
+
         try:
-            # Utiliser asyncio.create_task pour exécuter la requête HTTP synchrone
-            loop = asyncio.get_event_loop()
-            
-            def make_request():
-                if method.upper() == "GET":
-                    response = requests.get(url, headers=headers, timeout=10)
-                elif method.upper() == "POST":
-                    response = requests.post(url, headers=headers, json=data, timeout=10)
-                elif method.upper() == "PUT":
-                    response = requests.put(url, headers=headers, json=data, timeout=10)
-                else:
-                    logger.error(f"Méthode HTTP non supportée: {method}")
-                    return None
-                    
-                response.raise_for_status()
-                return response.json()
-            
-            # Exécuter dans un thread séparé pour ne pas bloquer l'event loop
-            result = await loop.run_in_executor(None, make_request)
-            return result
-            
-        except Exception as e:
+            result = await self.smartthings.request(method, endpoint, data)
+        except SmartThingsError as e:
+            # Une erreur 4xx (hors 429) est une réponse valide: le chemin lui-même fonctionne
+            if 400 <= e.status_code < 500 and e.status_code != 429:
+                self.smartthings_breaker.record_success()
+            else:
+                self.smartthings_breaker.record_failure(e)
             logger.error(f"Erreur SmartThings API {method} {endpoint}: {e}")
             return None
+        except Exception as e:
+            # Erreur inattendue: la sonde se termine en échec au lieu de rester en suspens
+            self.smartthings_breaker.record_failure(e)
+            raise
+        self.smartthings_breaker.record_success()
+        return result
     
+    async def _list_devices(self) -> Optional[List[Dict]]:
+        """Liste complète des appareils du compte (toutes les pages)"""
+        items: List[Dict] = []
+        endpoint: Optional[str] = "devices"
+        while endpoint:
+            page = await self._smartthings_request("GET", endpoint)
+            if not page or "items" not in page:
+                logger.error("Impossible de récupérer la liste des appareils")
+                return None
+            items.extend(page["items"])
+            endpoint = ((page.get("_links") or {}).get("next") or {}).get("href")
+        return items
+
     async def find_device_id(self) -> Optional[str]:
         """Trouve automatiquement l'ID du device TV Samsung Frame"""
         if self.device_id:
             return self.device_id
+        if not self.smartthings:
+            logger.error("Token SmartThings manquant")
+            return None
             
         try:
-            devices = await self._smartthings_request("GET", "devices")
-            if not devices or "items" not in devices:
-                logger.error("Impossible de récupérer la liste des appareils")
+            device = await self.devices.find_frame()
+            if device is None:
+                logger.warning("Aucun device Frame trouvé automatiquement")
                 return None
-                
-            for device in devices["items"]:
-                # Recherche d'une TV Samsung Frame
-                if (device.get("name", "").lower().find("frame") != -1 or 
-                    device.get("label", "").lower().find("frame") != -1 or
-                    device.get("deviceTypeName", "").lower().find("tv") != -1):
-                    
-                    logger.info(f"Device trouvé: {device.get('name', device.get('label', 'Unknown'))}")
-                    self.device_id = device["deviceId"]
-                    return self.device_id
-                    
-            logger.warning("Aucun device Frame trouvé automatiquement")
-            return None
+
+            logger.info(f"Device trouvé: {device['name'] or device['label'] or 'Unknown'}")
+            self.device_id = device["deviceId"]
+            return self.device_id
             
         except Exception as e:
             logger.error(f"Erreur lors de la recherche du device: {e}")
             return None
     
-    async def supported(self) -> bool:
-        """Vérifie si la TV supporte l'Art Mode"""
+    async def supported(self, refresh: bool = False) -> Optional[bool]:
+        """
+        Vérifie si la TV supporte l'Art Mode (mémorisé par connexion sauf si `refresh`).
+        None si la réponse est inconnue (TV injoignable et SmartThings indisponible).
+        """
+        cached = None if refresh else self._supported
+        if cached is None and not refresh:
+            cached = self.state.get("supported")
+        if cached is not None:
+            self._count("supported", "cache_hits")
+            return cached
+        return await self._single_flight(
+            "supported", lambda: self.scheduler.run(STATUS, "supported", self._fetch_supported))
+
+    async def _fetch_supported(self) -> Optional[bool]:
         # Essai méthode directe
-        try:
-            client = await self.get_direct_client()
-            if client:
+        client = await self._direct()
+        if client:
+            try:
                 result = await client.supported()
+                self.direct_breaker.record_success()
+                self._supported = result
+                self.state.set("supported", result)
                 logger.info(f"Art Mode supporté (méthode directe): {result}")
                 return result
-        except Exception as e:
-            logger.warning(f"Erreur méthode directe pour supported(): {e}")
+            except TRANSPORT_ERRORS as e:
+                self._direct_failed(e)
+                logger.warning(f"Erreur méthode directe pour supported(): {e}")
+            except Exception:
+                self._direct_answered()
+                raise
         
         # Fallback SmartThings
         try:
             device_id = await self.find_device_id()
             if not device_id:
-                return False
+                logger.info("Support Art Mode inconnu: aucun chemin disponible")
+                return None
                 
+            # Capabilities déjà connues par l'annuaire des appareils
+            cached = self.devices.capabilities(device_id)
+            if cached is not None:
+                result = any("art" in cap.lower() for cap in cached)
+                logger.info(f"Art Mode {'supporté' if result else 'non détecté'} (SmartThings, cache)")
+                return result
+
             # Vérifier les capabilities du device
             capabilities = await self._smartthings_request("GET", f"devices/{device_id}")
-            if capabilities and "components" in capabilities:
+            if capabilities is None:
+                return None
+            if "components" in capabilities:
                 # Recherche de capabilities liées à l'art mode
                 for component in capabilities["components"]:
                     if "capabilities" in component:
@@ -138,20 +516,78 @@ class TvController:
             
         except Exception as e:
             logger.error(f"Erreur SmartThings pour supported(): {e}")
-            return False
+            return None
     
+    async def available_art(self, category: str = "MY-C0002") -> Optional[List[Dict]]:
+        """Images présentes sur la TV (connexion directe uniquement, None si indisponible)"""
+        return await self.scheduler.run(STATUS, "available_art", lambda: self._available_art(category))
+
+    async def _available_art(self, category: str) -> Optional[List[Dict]]:
+        client = await self._direct()
+        if client is None:
+            return None
+        try:
+            items = await client.available(category)
+            self.direct_breaker.record_success()
+            logger.info(f"{len(items)} images présentes sur la TV ({category})")
+            return items
+        except TRANSPORT_ERRORS as e:
+            self._direct_failed(e)
+            logger.warning(f"Erreur méthode directe pour available(): {e}")
+            return None
+        except Exception:
+            self._direct_answered()
+            raise
+
+    async def delete_images(self, content_ids: List[str]) -> bool:
+        """Supprime des images de la TV (connexion directe uniquement)"""
+        return await self.scheduler.run(
+            BULK, f"delete_images ({len(content_ids)})", lambda: self._delete_images(content_ids))
+
+    async def _delete_images(self, content_ids: List[str]) -> bool:
+        client = await self._direct()
+        if client is None:
+            return False
+        try:
+            logger.info(f"Suppression de {len(content_ids)} images sur la TV: {content_ids}")
+            await client.delete_list(content_ids)
+            self.direct_breaker.record_success()
+            return True
+        except TRANSPORT_ERRORS as e:
+            self._direct_failed(e)
+            logger.warning(f"Erreur méthode directe pour delete_list(): {e}")
+            return False
+        except Exception:
+            self._direct_answered()
+            raise
+
     async def upload_image(self, image_data: bytes, file_type: str = "JPEG", matte: str = "none") -> Optional[str]:
-        """Upload une image vers la TV"""
+        """Upload une image vers la TV (commande bulk, annulable)"""
+        return await self.scheduler.run(
+            BULK, f"upload_image ({len(image_data)} octets)",
+            lambda: self._upload_image(image_data, file_type, matte))
+
+    async def _upload_image(self, image_data: bytes, file_type: str, matte: str) -> Optional[str]:
         # Essai méthode directe
-        try:
-            client = await self.get_direct_client()
-            if client:
+        client = await self._direct()
+        if client:
+            try:
                 logger.info("Tentative upload image (méthode directe)")
                 remote_filename = await client.upload(image_data, file_type=file_type, matte=matte)
+                self.direct_breaker.record_success()
                 logger.info(f"Upload réussi (méthode directe): {remote_filename}")
                 return remote_filename
-        except Exception as e:
-            logger.warning(f"Erreur méthode directe pour upload(): {e}")
+            except asyncio.CancelledError:
+                # Envoi interrompu en plein transfert: vérifier l'état de la connexion
+                logger.warning("Upload annulé (méthode directe)")
+                self._suspect.set()
+                raise
+            except TRANSPORT_ERRORS as e:
+                self._direct_failed(e)
+                logger.warning(f"Erreur méthode directe pour upload(): {e}")
+            except Exception:
+                self._direct_answered()
+                raise
         
         # Fallback SmartThings
         # Note: SmartThings ne supporte pas l'upload direct d'images personnalisées
@@ -161,16 +597,26 @@ class TvController:
     
     async def select_image(self, remote_filename: str, show: bool = True) -> bool:
         """Sélectionne une image sur la TV"""
+        return await self.scheduler.run(
+            INTERACTIVE, f"select_image {remote_filename}", lambda: self._select_image(remote_filename, show))
+
+    async def _select_image(self, remote_filename: str, show: bool) -> bool:
         # Essai méthode directe
-        try:
-            client = await self.get_direct_client()
-            if client:
+        client = await self._direct()
+        if client:
+            try:
                 logger.info(f"Tentative sélection image (méthode directe): {remote_filename}")
                 await client.select_image(remote_filename, show=show)
+                self.direct_breaker.record_success()
+                self.state.apply_event("image_selected", {"content_id": remote_filename})
                 logger.info("Sélection image réussie (méthode directe)")
                 return True
-        except Exception as e:
-            logger.warning(f"Erreur méthode directe pour select_image(): {e}")
+            except TRANSPORT_ERRORS as e:
+                self._direct_failed(e)
+                logger.warning(f"Erreur méthode directe pour select_image(): {e}")
+            except Exception:
+                self._direct_answered()
+                raise
         
         # Fallback SmartThings
         try:
@@ -200,18 +646,32 @@ class TvController:
         
         return False
     
-    async def get_current_art(self) -> Optional[Dict]:
-        """Récupère l'art actuellement affiché"""
+    async def get_current_art(self, refresh: bool = False) -> Optional[Dict]:
+        """Récupère l'art actuellement affiché (depuis le cache sauf si `refresh`)"""
+        cached = None if refresh else self.state.get("current_art")
+        if cached is not None:
+            self._count("get_current_art", "cache_hits")
+            return cached
+        return await self._single_flight(
+            "get_current_art", lambda: self.scheduler.run(STATUS, "get_current_art", self._fetch_current_art))
+
+    async def _fetch_current_art(self) -> Optional[Dict]:
         # Essai méthode directe
-        try:
-            client = await self.get_direct_client()
-            if client:
+        client = await self._direct()
+        if client:
+            try:
                 logger.info("Tentative récupération art actuel (méthode directe)")
                 current = await client.get_current()
+                self.direct_breaker.record_success()
+                self.state.set("current_art", current)
                 logger.info(f"Art actuel récupéré (méthode directe): {current}")
                 return current
-        except Exception as e:
-            logger.warning(f"Erreur méthode directe pour get_current(): {e}")
+            except TRANSPORT_ERRORS as e:
+                self._direct_failed(e)
+                logger.warning(f"Erreur méthode directe pour get_current(): {e}")
+            except Exception:
+                self._direct_answered()
+                raise
         
         # Fallback SmartThings
         try:
@@ -222,29 +682,44 @@ class TvController:
             # Récupérer le statut du device
             status = await self._smartthings_request("GET", f"devices/{device_id}/status")
             if status and "components" in status:
-                # Recherche d'informations sur le mode actuel
-                for component in status["components"]:
-                    if "pictureMode" in component:
-                        return {"mode": component["pictureMode"]["value"]}
+                # Statut: {"components": {"main": {"custom.picturemode": {"pictureMode": {"value": ...}}}}}
+                for component in status["components"].values():
+                    attributes = component.get("custom.picturemode") or {}
+                    if "pictureMode" in attributes:
+                        return {"mode": attributes["pictureMode"]["value"]}
                         
         except Exception as e:
             logger.error(f"Erreur SmartThings pour get_current(): {e}")
         
         return None
     
-    async def get_device_info(self) -> Optional[Dict]:
-        """Récupère les informations du device"""
+    async def get_device_info(self, refresh: bool = False) -> Optional[Dict]:
+        """Récupère les informations du device (depuis le cache sauf si `refresh`)"""
+        cached = None if refresh else self.state.get("device_info")
+        if cached is not None:
+            self._count("get_device_info", "cache_hits")
+            return cached
+        return await self._single_flight(
+            "get_device_info", lambda: self.scheduler.run(STATUS, "get_device_info", self._fetch_device_info))
+
+    async def _fetch_device_info(self) -> Optional[Dict]:
         # Essai méthode directe
-        try:
-            client = await self.get_direct_client()
-            if client:
+        client = await self._direct()
+        if client:
+            try:
                 logger.info("Tentative récupération info device (méthode directe)")
                 info = await client.get_device_info()
+                self.direct_breaker.record_success()
                 if info:
+                    self.state.set("device_info", info)
                     logger.info("Info device récupérée (méthode directe)")
                     return info
-        except Exception as e:
-            logger.warning(f"Erreur méthode directe pour get_device_info(): {e}")
+            except TRANSPORT_ERRORS as e:
+                self._direct_failed(e)
+                logger.warning(f"Erreur méthode directe pour get_device_info(): {e}")
+            except Exception:
+                self._direct_answered()
+                raise
         
         # Fallback SmartThings
         try:
@@ -264,16 +739,24 @@ class TvController:
     
     async def send_key(self, key: str) -> bool:
         """Envoie une touche à la TV"""
+        return await self.scheduler.run(INTERACTIVE, f"send_key {key}", lambda: self._send_key(key))
+
+    async def _send_key(self, key: str) -> bool:
         # Essai méthode directe
-        try:
-            client = await self.get_direct_client()
-            if client and hasattr(client, 'send_key'):
+        client = await self._direct()
+        if client and hasattr(client, 'send_key'):
+            try:
                 logger.info(f"Tentative envoi touche (méthode directe): {key}")
                 await client.send_key(key)
+                self.direct_breaker.record_success()
                 logger.info("Touche envoyée (méthode directe)")
                 return True
-        except Exception as e:
-            logger.warning(f"Erreur méthode directe pour send_key(): {e}")
+            except TRANSPORT_ERRORS as e:
+                self._direct_failed(e)
+                logger.warning(f"Erreur méthode directe pour send_key(): {e}")
+            except Exception:
+                self._direct_answered()
+                raise
         
         # Fallback SmartThings
         try:
@@ -322,9 +805,21 @@ class TvController:
     
     async def close(self):
         """Ferme les connexions"""
+        if self._reconciler:
+            self._reconciler.cancel()
+            await asyncio.gather(self._reconciler, return_exceptions=True)
+            self._reconciler = None
+        if self._supervisor:
+            self._supervisor.cancel()
+            await asyncio.gather(self._supervisor, return_exceptions=True)
+            self._supervisor = None
         if self.direct_client:
             try:
                 await self.direct_client.close()
                 logger.info("Client direct fermé")
             except Exception as e:
                 logger.error(f"Erreur fermeture client direct: {e}")
+            self.direct_client = None
+        await self.devices.close()
+        if self.smartthings:
+            await self.smartthings.close()
@@ -0,0 +1,199 @@
+# Client Unsplash asynchrone avec cache
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, List, Any, Callable
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+class UnsplashError(Exception):
+    """Erreur de l'API Unsplash, avec le code HTTP à renvoyer"""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class TTLCache:
+    """Cache LRU en mémoire dont les entrées expirent après `ttl` secondes"""
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Any, tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: Any) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Any, value: Any):
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+def simplify_photo(p: Dict[str, Any]) -> Dict[str, Any]:
+    """Sous-ensemble des données d'une photo renvoyé au frontend"""
+    return {
+        "id": p["id"],
+        "description": p.get("description") or p.get("alt_description"),
+        "urls": p["urls"],
+        "user": {
+            "name": p["user"]["name"],
+            "profile": p["user"]["links"]["html"],
+        },
+        "download_location": p["links"].get("download_location"),
+    }
+
+
+class UnsplashClient:
+    """
+    Client HTTP asynchrone partagé (connexions keep-alive) pour l'API Unsplash.
+    Les réponses sont mises en cache par requête et page, et les recherches
+    identiques simultanées ne déclenchent qu'un seul appel.
+    """
+
+    def __init__(self, access_key: Optional[str], base_url: str = "https://api.unsplash.com",
+                 ttl: float = 300, max_entries: int = 256, featured_refresh: float = 240, per_page: int = 30,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.access_key = access_key
+        self.per_page = per_page
+        self.featured_refresh = featured_refresh
+        self.cache = TTLCache(ttl, max_entries)
+        self._inflight: Dict[Any, asyncio.Future] = {}
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._client = httpx.AsyncClient(
+            base_url=base_url,
+            timeout=10,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+            headers={"Accept-Version": "v1", "Authorization": f"Client-ID {access_key or ''}"},
+            transport=transport,  # httpx.MockTransport dans les tests
+        )
+        # Téléchargement des fichiers images (CDN, sans clé API, délais plus longs)
+        self._downloads = httpx.AsyncClient(
+            timeout=httpx.Timeout(60, connect=10),
+            limits=httpx.Limits(max_connections=10, max_keepalive_connections=5),
+            follow_redirects=True,
+            transport=transport,
+        )
+
+    async def _fetch(self, path: str, params: Dict[str, Any]) -> Any:
+        if not self.access_key:
+            logger.error("Clé API Unsplash manquante")
+            raise UnsplashError(500, "Clé API Unsplash manquante")
+        logger.info(f"Appel API Unsplash: {path} {params}")
+        try:
+            r = await self._client.get(path, params=params)
+        except httpx.HTTPError as exc:
+            logger.error(f"Erreur réseau Unsplash: {exc}")
+            raise UnsplashError(502, f"Erreur réseau Unsplash: {exc}")
+        logger.info(f"Réponse Unsplash: status={r.status_code}")
+        if r.status_code != 200:
+            logger.error(f"Erreur API Unsplash: {r.status_code} - {r.text}")
+            raise UnsplashError(r.status_code, "Erreur lors de l'appel Unsplash")
+        return r.json()
+
+    async def _cached(self, key: Any, path: str, params: Dict[str, Any], extract) -> List[Dict[str, Any]]:
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        # Coalescence: les appels identiques simultanés partagent la même requête
+        future = self._inflight.get(key)
+        if future is None:
+            async def load():
+                results = [simplify_photo(p) for p in extract(await self._fetch(path, params))]
+                self.cache.set(key, results)
+                return results
+
+            future = asyncio.ensure_future(load())
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(future)
+
+    async def search(self, query: str, page: int = 1) -> List[Dict[str, Any]]:
+        key = ("search", query.strip().lower(), page)
+        params = {"query": query, "page": page, "per_page": self.per_page}
+        return await self._cached(key, "/search/photos", params, lambda data: data.get("results", []))
+
+    async def featured(self, page: int = 1) -> List[Dict[str, Any]]:
+        key = ("featured", page)
+        params = {"page": page, "per_page": self.per_page, "order_by": "popular"}
+        return await self._cached(key, "/photos", params, lambda data: data)
+
+    async def photo(self, photo_id: str) -> Dict[str, Any]:
+        """Détails complets d'une photo (URLs de toutes les résolutions, lien de suivi)"""
+        return await self._fetch(f"/photos/{photo_id}", {})
+
+    async def track_download(self, photo: Dict[str, Any]):
+        """
+        Signale le téléchargement à Unsplash (obligatoire selon leurs règles d'utilisation).
+        Un échec est journalisé mais n'interrompt pas l'import.
+        """
+        download_location = photo.get("links", {}).get("download_location")
+        if not download_location:
+            return
+        try:
+            r = await self._client.get(download_location)
+            if r.status_code != 200:
+                logger.warning(f"Suivi du téléchargement Unsplash refusé: {r.status_code}")
+        except httpx.HTTPError as exc:
+            logger.warning(f"Suivi du téléchargement Unsplash impossible: {exc}")
+
+    async def download(self, url: str, write: Callable[[bytes], None]) -> int:
+        """
+        Télécharge une image en flux et passe chaque bloc à `write`, appelé dans
+        un thread (écriture disque); retourne la taille reçue
+        """
+        size = 0
+        try:
+            async with self._downloads.stream("GET", url) as r:
+                if r.status_code != 200:
+                    logger.error(f"Téléchargement Unsplash en erreur: {r.status_code} ({url})")
+                    raise UnsplashError(502, f"Téléchargement de l'image impossible ({r.status_code})")
+                async for chunk in r.aiter_bytes():
+                    await asyncio.to_thread(write, chunk)
+                    size += len(chunk)
+        except httpx.HTTPError as exc:
+            logger.error(f"Erreur réseau lors du téléchargement Unsplash: {exc}")
+            raise UnsplashError(502, f"Erreur réseau Unsplash: {exc}")
+        return size
+
+    async def _refresh_featured(self):
+        """Précharge puis rafraîchit périodiquement la première page des photos populaires"""
+        while True:
+            try:
+                data = await self._fetch("/photos", {"page": 1, "per_page": self.per_page, "order_by": "popular"})
+                self.cache.set(("featured", 1), [simplify_photo(p) for p in data])
+                logger.info(f"Photos Unsplash populaires préchargées: {len(data)} photos")
+            except UnsplashError as exc:
+                logger.warning(f"Préchargement Unsplash impossible: {exc.detail}")
+            except Exception as exc:
+                # Réponse inattendue: la tâche continue, le prochain rafraîchissement réessaiera
+                logger.error(f"Réponse Unsplash inattendue lors du préchargement: {exc!r}")
+            await asyncio.sleep(self.featured_refresh)
+
+    def start(self):
+        if self.access_key and self._refresh_task is None:
+            self._refresh_task = asyncio.create_task(self._refresh_featured())
+
+    async def close(self):
+        if self._refresh_task:
+            self._refresh_task.cancel()
+            self._refresh_task = None
+        await self._client.aclose()
+        await self._downloads.aclose()
@@ -0,0 +1,207 @@
+# Réception en flux des fichiers téléversés
+
+import asyncio
+import hashlib
+import logging
+import os
+import tempfile
+import time
+from typing import Optional, Dict, Tuple
+
+from starlette.requests import Request
+
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ImportError:  # anciennes versions de python-multipart
+    from multipart.multipart import MultipartParser, parse_options_header
+
+logger = logging.getLogger(__name__)
+
+# Signatures (magic bytes) des formats acceptés -> (type MIME, extension)
+IMAGE_SIGNATURES = {
+    b"\xff\xd8\xff": ("image/jpeg", ".jpg"),
+    b"\x89PNG\r\n\x1a\n": ("image/png", ".png"),
+}
+_SNIFF_BYTES = max(len(signature) for signature in IMAGE_SIGNATURES)
+
+# Préfixe des fichiers temporaires de réception (fichiers cachés, ignorés par le catalogue)
+TEMP_PREFIX = ".upload-"
+
+# Marge tolérée pour l'enveloppe multipart lors du contrôle de Content-Length
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+class UploadError(Exception):
+    """Erreur de téléversement, avec le code HTTP à renvoyer"""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def sniff_image_type(head: bytes) -> Optional[Tuple[str, str]]:
+    """Détermine le type d'image à partir des premiers octets"""
+    for signature, kind in IMAGE_SIGNATURES.items():
+        if head.startswith(signature):
+            return kind
+    return None
+
+
+class UploadSink:
+    """
+    Écrit un flux dans un fichier temporaire du dossier cible en calculant
+    le hash et le type réel à la volée. La mémoire utilisée ne dépend pas
+    de la taille du fichier.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.mime_type: Optional[str] = None
+        self.extension: Optional[str] = None
+        self._digest = hashlib.sha256()
+        self._head = b""
+        fd, self.tmp_path = tempfile.mkstemp(prefix=TEMP_PREFIX, dir=directory)
+        self._fp = os.fdopen(fd, "wb")
+
+    @property
+    def content_hash(self) -> str:
+        return self._digest.hexdigest()
+
+    def write(self, chunk: bytes):
+        self.size += len(chunk)
+        if self.size > self.max_bytes:
+            raise UploadError(413, f"Fichier trop volumineux (max {self.max_bytes // (1024 * 1024)}MB)")
+
+        if self.mime_type is None:
+            self._head += chunk[:_SNIFF_BYTES]
+            if len(self._head) >= _SNIFF_BYTES:
+                kind = sniff_image_type(self._head)
+                if kind is None:
+                    raise UploadError(400, "Seuls les fichiers JPEG ou PNG sont autorisés")
+                self.mime_type, self.extension = kind
+
+        self._digest.update(chunk)
+        self._fp.write(chunk)
+
+    def commit(self, filename: str) -> str:
+        """Publie atomiquement le fichier temporaire; retourne le nom final (sans collision)"""
+        if self.mime_type is None:
+            raise UploadError(400, "Fichier vide ou format non reconnu")
+        self._fp.flush()
+        os.fsync(self._fp.fileno())
+        self._fp.close()
+
+        # Sans point initial: un fichier caché serait ignoré par le catalogue
+        stem = os.path.splitext(os.path.basename(filename))[0].lstrip(".") or "image"
+        final_name = f"{stem}{self.extension}"
+        i = 1
+        while True:
+            # os.link échoue si le nom existe: réservation atomique, même
+            # si deux téléversements concurrents visent le même nom
+            try:
+                os.link(self.tmp_path, os.path.join(self.directory, final_name))
+                break
+            except FileExistsError:
+                final_name = f"{stem}_{i}{self.extension}"
+                i += 1
+        os.unlink(self.tmp_path)
+        return final_name
+
+    def abort(self):
+        if not self._fp.closed:
+            self._fp.close()
+        if os.path.exists(self.tmp_path):
+            os.unlink(self.tmp_path)
+
+
+def remove_stale_uploads(directory: str, max_age: float = 3600.0) -> int:
+    """Supprime les fichiers temporaires abandonnés (processus arrêté en pleine réception)"""
+    removed = 0
+    limit = time.time() - max_age
+    for name in os.listdir(directory):
+        if not name.startswith(TEMP_PREFIX):
+            continue
+        path = os.path.join(directory, name)
+        try:
+            if os.path.getmtime(path) < limit:
+                os.unlink(path)
+                removed += 1
+        except OSError as e:
+            logger.warning(f"Suppression de {path} impossible: {e}")
+    if removed:
+        logger.info(f"{removed} fichiers temporaires de téléversement supprimés")
+    return removed
+
+
+async def receive_multipart_file(request: Request, field_name: str, sink: UploadSink) -> str:
+    """
+    Lit le corps multipart de la requête au fil de l'eau et envoie le contenu
+    du champ fichier `field_name` dans `sink`. Retourne le nom de fichier client.
+    """
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > sink.max_bytes + MULTIPART_OVERHEAD:
+        # Rejet immédiat, sans lire le corps
+        raise UploadError(413, f"Fichier trop volumineux (max {sink.max_bytes // (1024 * 1024)}MB)")
+
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    boundary = params.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise UploadError(400, "Requête multipart/form-data attendue")
+
+    state: Dict[str, Optional[bytes]] = {"header_field": b"", "header_value": b"", "disposition": None}
+    part: Dict[str, Optional[str]] = {"name": None, "filename": None}
+    found: Dict[str, Optional[str]] = {"filename": None}
+
+    def on_part_begin():
+        state["disposition"] = None
+        part["name"] = part["filename"] = None
+
+    def on_header_field(data: bytes, start: int, end: int):
+        state["header_field"] += data[start:end]
+
+    def on_header_value(data: bytes, start: int, end: int):
+        state["header_value"] += data[start:end]
+
+    def on_header_end():
+        if state["header_field"].lower() == b"content-disposition":
+            state["disposition"] = state["header_value"]
+        state["header_field"] = state["header_value"] = b""
+
+    def on_headers_finished():
+        if state["disposition"]:
+            _, options = parse_options_header(state["disposition"])
+            part["name"] = options.get(b"name", b"").decode("utf-8", "replace")
+            if b"filename" in options:
+                part["filename"] = options[b"filename"].decode("utf-8", "replace")
+        if part["name"] == field_name and part["filename"] is not None:
+            if found["filename"] is not None:
+                raise UploadError(400, "Un seul fichier par requête")
+            found["filename"] = part["filename"]
+
+    def on_part_data(data: bytes, start: int, end: int):
+        if part["name"] == field_name and part["filename"] is not None:
+            sink.write(data[start:end])
+
+    parser = MultipartParser(
+        boundary,
+        {
+            "on_part_begin": on_part_begin,
+            "on_header_field": on_header_field,
+            "on_header_value": on_header_value,
+            "on_header_end": on_header_end,
+            "on_headers_finished": on_headers_finished,
+            "on_part_data": on_part_data,
+        },
+    )
+    async for chunk in request.stream():
+        if chunk:
+            # Écriture disque et hash hors de la boucle asyncio
+            await asyncio.to_thread(parser.write, chunk)
+    parser.finalize()
+
+    if found["filename"] is None:
+        raise UploadError(400, f"Champ fichier '{field_name}' manquant")
+    return found["filename"]
@@ -13,9 +13,9 @@ const CurrentArt: React.FC = () => {
   const [currentArt, setCurrentArt] = useState<CurrentArtData | null>(null);
   const [loading, setLoading] = useState(true);
 
-  const fetchCurrentArt = async () => {
+  const fetchCurrentArt = async (refresh = false) => {
     try {
-      const data = await api.getCurrentImage();
+      const data = await api.getCurrentImage(refresh);
       setCurrentArt(data);
     } catch (error) {
       console.error("Erreur lors de la récupération de l'image actuelle:", error);
@@ -27,6 +27,18 @@ const CurrentArt: React.FC = () => {
 
   useEffect(() => {
     fetchCurrentArt();
+    // Mises à jour poussées par le backend: plus besoin de recharger
+    const source = api.subscribeEvents({
+      "current-art": (data) => {
+        setCurrentArt(
+          data.current_art
+            ? data.current_art
+            : { status: "no_current_image", message: "Aucune image actuellement affichée sur la TV" }
+        );
+        setLoading(false);
+      },
+    });
+    return () => source.close();
   }, []);
 
   if (loading) {
@@ -49,7 +61,7 @@ const CurrentArt: React.FC = () => {
             {currentArt?.message || "Aucune image actuellement affichée"}
           </p>
           <button
-            onClick={fetchCurrentArt}
+            onClick={() => fetchCurrentArt(true)}
             className="px-4 py-2 bg-blue-600 text-white rounded hover:bg-blue-700"
           >
             Actualiser
@@ -71,7 +83,7 @@ const CurrentArt: React.FC = () => {
             Activez l'Art Mode sur votre TV pour voir l'image actuelle
           </p>
           <button
-            onClick={fetchCurrentArt}
+            onClick={() => fetchCurrentArt(true)}
             className="px-4 py-2 bg-blue-600 text-white rounded hover:bg-blue-700"
           >
             Actualiser
@@ -98,7 +110,7 @@ const CurrentArt: React.FC = () => {
         {currentArt.title && <p><strong>Titre:</strong> {currentArt.title}</p>}
         {currentArt.artist && <p><strong>Artiste:</strong> {currentArt.artist}</p>}
         <button
-          onClick={fetchCurrentArt}
+          onClick={() => fetchCurrentArt(true)}
           className="mt-4 px-4 py-2 bg-blue-600 text-white rounded hover:bg-blue-700"
         >
           Actualiser
@@ -34,6 +34,24 @@ const DebugPanel: React.FC = () => {
       description: "Statut complet de la TV (allumée, Art Mode, orientation, etc.)",
       fn: () => api.debugTvStatus(),
     },
+    {
+      title: "Appels TV",
+      command: "tv-calls",
+      description: "Réponses servies depuis le cache, appels réels et appels mutualisés",
+      fn: () => api.debugTvCalls(),
+    },
+    {
+      title: "Files TV",
+      command: "tv-commands",
+      description: "Commandes en cours, profondeur des files et temps d'attente par priorité",
+      fn: () => api.tvCommands(),
+    },
+    {
+      title: "Réconcilier le catalogue",
+      command: "tv-art/reconcile",
+      description: "Compare les images de la TV au catalogue (mappings obsolètes, images d'autres clients)",
+      fn: () => api.reconcileTvArt(),
+    },
     {
       title: "Images Disponibles",
       command: "available-art",
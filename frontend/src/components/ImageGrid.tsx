@@ -2,16 +2,23 @@
 import React, { useEffect, useState } from "react";
 import { api, ImageItem } from "@/lib/api";
 
+const PAGE_SIZE = 48;
+
 const ImageGrid: React.FC = () => {
   const [images, setImages] = useState<ImageItem[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [loading, setLoading] = useState(false);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState<string | null>(null);
+  const [batchProgress, setBatchProgress] = useState<string | null>(null);
+  const [queued, setQueued] = useState<{ [file: string]: boolean }>({});
 
   const fetchImages = async () => {
     setLoading(true);
     try {
-      const data = await api.listImages();
-      setImages(data);
+      const data = await api.listImages({ limit: PAGE_SIZE });
+      setImages(data.items);
+      setNextCursor(data.next_cursor ?? null);
     } catch (e: any) {
       setError(e.message);
     } finally {
@@ -19,18 +26,72 @@ const ImageGrid: React.FC = () => {
     }
   };
 
+  const fetchMore = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const data = await api.listImages({ limit: PAGE_SIZE, cursor: nextCursor });
+      setImages((prev) => [...prev, ...data.items]);
+      setNextCursor(data.next_cursor ?? null);
+    } catch (e: any) {
+      setError(e.message);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   useEffect(() => {
     fetchImages();
   }, []);
 
   const handleSendToTV = async (filename: string) => {
     try {
-      const updatedImage = await api.sendToTV(filename);
-      // Refresh the images list to show the updated state
-      fetchImages();
+      // L'envoi est mis en file côté backend : on suit le travail sans bloquer la requête
+      let job = await api.enqueueUpload(filename);
+      setQueued((prev) => ({ ...prev, [filename]: true }));
+      while (job.status === "pending" || job.status === "running") {
+        await new Promise((resolve) => setTimeout(resolve, 2000));
+        job = await api.getJob(job.id);
+      }
+      if (job.status === "failed") {
+        throw new Error(job.last_error || "Échec de l'envoi vers la TV");
+      }
+      const remote = job.result?.remote_filename ?? null;
+      setImages((prev) => prev.map((img) => (img.file === filename ? { ...img, remote_filename: remote } : img)));
       alert("Image envoyée à la TV !");
     } catch (e: any) {
       alert(e.message);
+    } finally {
+      setQueued((prev) => {
+        const { [filename]: _, ...rest } = prev;
+        return rest;
+      });
+    }
+  };
+
+  const handleSendAllToTV = async () => {
+    const pending = images.filter((img) => !img.remote_filename).map((img) => img.file);
+    if (pending.length === 0) return;
+    setBatchProgress(`0 / ${pending.length}`);
+    try {
+      await api.sendToTVBatch(pending, (e) => {
+        if (e.event === "progress") {
+          setBatchProgress(`${e.completed} / ${e.total}`);
+          if (e.remote_filename) {
+            setImages((prev) =>
+              prev.map((img) => (img.file === e.file ? { ...img, remote_filename: e.remote_filename } : img))
+            );
+          }
+        } else if (e.event === "error") {
+          alert(e.detail);
+        } else if (e.event === "done") {
+          alert(`Envoi terminé : ${e.sent} envoyée(s), ${e.skipped} déjà présente(s), ${e.failed} échec(s)`);
+        }
+      });
+    } catch (e: any) {
+      alert(e.message);
+    } finally {
+      setBatchProgress(null);
     }
   };
 
@@ -54,47 +115,79 @@ const ImageGrid: React.FC = () => {
     return <div className="text-red-500">Erreur: {error}</div>;
   }
 
+  const localCount = images.filter((img) => !img.remote_filename).length;
+
   return (
-    <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 xl:grid-cols-4 gap-6">
-      {images.map((img) => (
-        <div key={img.file} className="group relative overflow-hidden rounded-lg shadow-md hover:shadow-xl transition-shadow">
-          <img
-            src={`${IMG_BASE}/images/${img.file}`}
-            alt={img.file}
-            className="w-full h-64 object-cover group-hover:scale-105 transition-transform duration-300"
-          />
-          <div className="absolute inset-0 bg-black/0 group-hover:bg-black/30 transition-colors duration-300 flex items-center justify-center">
-            {!img.remote_filename ? (
-              <button
-                className="opacity-0 group-hover:opacity-100 transition-opacity duration-300 px-6 py-2 bg-blue-600 text-white rounded-full font-medium hover:bg-blue-700"
-                onClick={() => handleSendToTV(img.file)}
-              >
-                Envoyer à la TV
-              </button>
-            ) : (
-              <button
-                className="opacity-0 group-hover:opacity-100 transition-opacity duration-300 px-6 py-2 bg-green-600 text-white rounded-full font-medium hover:bg-green-700"
-                onClick={() => handleApplyArt(img.remote_filename!)}
-              >
-                Appliquer Art
-              </button>
-            )}
-          </div>
-          
-          {/* Status badge */}
-          <div className="absolute top-2 right-2">
-            {img.remote_filename ? (
-              <div className="bg-green-500 text-white px-2 py-1 rounded text-xs">
-                Sur la TV
-              </div>
-            ) : (
-              <div className="bg-orange-500 text-white px-2 py-1 rounded text-xs">
-                Local uniquement
-              </div>
-            )}
+    <div>
+      {localCount > 0 && (
+        <div className="mb-6 flex justify-end">
+          <button
+            onClick={handleSendAllToTV}
+            disabled={batchProgress !== null}
+            className="px-6 py-2 bg-blue-600 text-white rounded-full font-medium hover:bg-blue-700 disabled:opacity-50"
+          >
+            {batchProgress !== null ? `Envoi en cours… ${batchProgress}` : `Tout envoyer à la TV (${localCount})`}
+          </button>
+        </div>
+      )}
+      <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 xl:grid-cols-4 gap-6">
+        {images.map((img) => (
+          <div key={img.file} className="group relative overflow-hidden rounded-lg shadow-md hover:shadow-xl transition-shadow">
+            <img
+              src={`${IMG_BASE}/api/thumbnails/${encodeURIComponent(img.file)}?size=512`}
+              alt={img.file}
+              loading="lazy"
+              decoding="async"
+              className="w-full h-64 object-cover group-hover:scale-105 transition-transform duration-300"
+            />
+            <div className="absolute inset-0 bg-black/0 group-hover:bg-black/30 transition-colors duration-300 flex items-center justify-center">
+              {queued[img.file] ? (
+                <span className="px-6 py-2 bg-gray-700 text-white rounded-full font-medium">
+                  En file d'attente…
+                </span>
+              ) : !img.remote_filename ? (
+                <button
+                  className="opacity-0 group-hover:opacity-100 transition-opacity duration-300 px-6 py-2 bg-blue-600 text-white rounded-full font-medium hover:bg-blue-700"
+                  onClick={() => handleSendToTV(img.file)}
+                >
+                  Envoyer à la TV
+                </button>
+              ) : (
+                <button
+                  className="opacity-0 group-hover:opacity-100 transition-opacity duration-300 px-6 py-2 bg-green-600 text-white rounded-full font-medium hover:bg-green-700"
+                  onClick={() => handleApplyArt(img.remote_filename!)}
+                >
+                  Appliquer Art
+                </button>
+              )}
+            </div>
+            
+            {/* Status badge */}
+            <div className="absolute top-2 right-2">
+              {img.remote_filename ? (
+                <div className="bg-green-500 text-white px-2 py-1 rounded text-xs">
+                  Sur la TV
+                </div>
+              ) : (
+                <div className="bg-orange-500 text-white px-2 py-1 rounded text-xs">
+                  Local uniquement
+                </div>
+              )}
+            </div>
           </div>
+        ))}
+      </div>
+      {nextCursor && (
+        <div className="mt-8 text-center">
+          <button
+            onClick={fetchMore}
+            disabled={loadingMore}
+            className="px-6 py-2 bg-black text-white rounded-full font-medium hover:bg-gray-800 disabled:opacity-50"
+          >
+            {loadingMore ? "Chargement…" : "Charger plus"}
+          </button>
         </div>
-      ))}
+      )}
     </div>
   );
 };
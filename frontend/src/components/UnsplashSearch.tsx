@@ -31,18 +31,13 @@ const UnsplashSearch: React.FC<{ onSelect?: () => void }> = ({ onSelect }) => {
     }
   };
 
-  const handleUseImage = async (url: string, id: string, filename: string) => {
+  const handleUseImage = async (id: string) => {
     try {
-      // Track download on Unsplash
-      await api.trackDownload(`/photos/${id}/download`);
-      
-      // Download and upload to backend
-      const response = await fetch(url);
-      const blob = await response.blob();
-      const file = new File([blob], filename, { type: 'image/jpeg' });
-      
-      await api.uploadImage(file);
-      alert('Image téléchargée et sauvegardée localement !');
+      const [result] = await api.importUnsplash([id]);
+      if (result.error) throw new Error(result.error);
+      alert(result.duplicate
+        ? `Image déjà présente dans la bibliothèque (${result.file})`
+        : 'Image téléchargée et sauvegardée localement !');
     } catch (e: any) {
       alert(e.message);
     }
@@ -100,7 +95,7 @@ const UnsplashSearch: React.FC<{ onSelect?: () => void }> = ({ onSelect }) => {
           <div
             key={photo.id}
             className="group relative cursor-pointer overflow-hidden rounded-lg shadow-md hover:shadow-xl transition-shadow"
-            onClick={() => handleUseImage(photo.urls.regular, photo.id, `unsplash-${photo.id}.jpg`)}
+            onClick={() => handleUseImage(photo.id)}
           >
             <img
               src={photo.urls.small}
@@ -6,14 +6,19 @@ const UploadForm: React.FC<{ onUploaded?: () => void }> = ({ onUploaded }) => {
   const inputRef = useRef<HTMLInputElement>(null);
   const [uploading, setUploading] = useState(false);
   const [error, setError] = useState<string | null>(null);
+  const [notice, setNotice] = useState<string | null>(null);
 
   const handleFileChange = async (e: React.ChangeEvent<HTMLInputElement>) => {
     const file = e.target.files?.[0];
     if (!file) return;
     setUploading(true);
     setError(null);
+    setNotice(null);
     try {
-      await api.uploadImage(file);
+      const uploaded = await api.uploadImage(file);
+      if (uploaded.duplicate) {
+        setNotice(`Image déjà présente dans la bibliothèque (${uploaded.file})`);
+      }
       onUploaded?.();
       if (inputRef.current) inputRef.current.value = "";
     } catch (e: any) {
@@ -45,6 +50,7 @@ const UploadForm: React.FC<{ onUploaded?: () => void }> = ({ onUploaded }) => {
           </span>
         </label>
         {error && <p className="mt-2 text-sm text-red-500">{error}</p>}
+        {notice && <p className="mt-2 text-sm text-gray-600">{notice}</p>}
       </div>
     </div>
   );
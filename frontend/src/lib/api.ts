@@ -1,6 +1,91 @@
 export interface ImageItem {
   file: string;
   remote_filename?: string | null;
+  duplicate?: boolean;
+}
+
+export interface ImagePage {
+  items: ImageItem[];
+  next_cursor?: string | null;
+}
+
+export interface ListImagesParams {
+  cursor?: string | null;
+  limit?: number;
+  sort?: "name" | "added" | "size";
+  order?: "asc" | "desc";
+  status?: "local" | "remote";
+  q?: string;
+}
+
+export interface Job {
+  id: string;
+  kind: "upload" | "select";
+  status: "pending" | "running" | "done" | "failed";
+  attempts: number;
+  last_error?: string | null;
+  result?: { [key: string]: any } | null;
+}
+
+export interface UnsplashImportResult {
+  id: string;
+  file?: string | null;
+  remote_filename?: string | null;
+  duplicate: boolean;
+  job_id?: string | null;
+  error?: string | null;
+}
+
+export interface Playlist {
+  name: string;
+  files: string[];
+  updated_at: number;
+}
+
+export interface SlideshowState {
+  enabled: boolean;
+  playlist: string | null;
+  mode: "shuffle" | "sequential";
+  interval: number;
+  running: boolean;
+  current: string | null;
+  switched_at: number | null;
+  next_switch_at: number | null;
+  upcoming: string[];
+  last_error: string | null;
+}
+
+export interface BatchEvent {
+  event: "start" | "progress" | "error" | "done";
+  [key: string]: any;
+}
+
+// Lit un flux Server-Sent Events renvoyé par une requête POST
+async function readEventStream(res: Response, onEvent: (e: BatchEvent) => void) {
+  if (!res.ok || !res.body) {
+    await handleJson(res);
+    return;
+  }
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    let sep;
+    while ((sep = buffer.indexOf("\n\n")) !== -1) {
+      const raw = buffer.slice(0, sep);
+      buffer = buffer.slice(sep + 2);
+      let event = "message";
+      let data = "";
+      raw.split("\n").forEach((line) => {
+        if (line.startsWith("event:")) event = line.slice(6).trim();
+        else if (line.startsWith("data:")) data += line.slice(5).trim();
+      });
+      if (data) onEvent({ event, ...JSON.parse(data) } as BatchEvent);
+    }
+  }
 }
 
 const API_BASE = process.env.NEXT_PUBLIC_API_BASE || "http://localhost:8000";
@@ -14,8 +99,13 @@ async function handleJson(res: Response) {
 }
 
 export const api = {
-  async listImages(): Promise<ImageItem[]> {
-    const res = await fetch(`${API_BASE}/api/images`, { cache: "no-store" });
+  async listImages(params: ListImagesParams = {}): Promise<ImagePage> {
+    const qs = new URLSearchParams();
+    Object.entries(params).forEach(([key, value]) => {
+      if (value !== undefined && value !== null && value !== "") qs.set(key, String(value));
+    });
+    // "no-cache" : le navigateur revalide avec If-None-Match et réutilise sa copie sur 304
+    const res = await fetch(`${API_BASE}/api/images?${qs.toString()}`, { cache: "no-cache" });
     return handleJson(res);
   },
   async uploadImage(file: File): Promise<ImageItem> {
@@ -43,14 +133,25 @@ export const api = {
     const res = await fetch(`${API_BASE}/api/unsplash-featured`);
     return handleJson(res);
   },
-  async trackDownload(download_location: string) {
-    // Unsplash demande un appel sans authentification pour tracer les downloads
-    try {
-      await fetch(download_location, { mode: "no-cors" });
-    } catch {}
+  async importUnsplash(ids: string[], sendToTv = false): Promise<UnsplashImportResult[]> {
+    // Le backend télécharge la photo, signale le téléchargement à Unsplash et l'ajoute au catalogue
+    const res = await fetch(`${API_BASE}/api/unsplash/import`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ ids, send_to_tv: sendToTv }),
+    });
+    return handleJson(res);
+  },
+  // Flux des changements d'état (current-art, art-mode, upload-progress, connection-health)
+  subscribeEvents(handlers: { [event: string]: (data: any) => void }): EventSource {
+    const source = new EventSource(`${API_BASE}/api/events`);
+    Object.entries(handlers).forEach(([event, handler]) => {
+      source.addEventListener(event, (e) => handler(JSON.parse((e as MessageEvent).data)));
+    });
+    return source;
   },
-  async getCurrentImage() {
-    const res = await fetch(`${API_BASE}/api/current-image`);
+  async getCurrentImage(refresh = false) {
+    const res = await fetch(`${API_BASE}/api/current-image${refresh ? "?refresh=true" : ""}`);
     return handleJson(res);
   },
   async sendToTV(filename: string): Promise<ImageItem> {
@@ -61,6 +162,56 @@ export const api = {
     });
     return handleJson(res);
   },
+  async enqueueUpload(filename: string): Promise<Job> {
+    const res = await fetch(`${API_BASE}/api/jobs`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ kind: "upload", filename }),
+    });
+    return handleJson(res);
+  },
+  async getJob(id: string): Promise<Job> {
+    const res = await fetch(`${API_BASE}/api/jobs/${id}`, { cache: "no-store" });
+    return handleJson(res);
+  },
+  async sendToTVBatch(filenames: string[], onEvent: (e: BatchEvent) => void) {
+    const res = await fetch(`${API_BASE}/api/send-to-tv/batch`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ filenames }),
+    });
+    await readEventStream(res, onEvent);
+  },
+  async listPlaylists(): Promise<Playlist[]> {
+    const res = await fetch(`${API_BASE}/api/playlists`, { cache: "no-store" });
+    return handleJson(res);
+  },
+  async savePlaylist(name: string, files: string[]): Promise<Playlist> {
+    const res = await fetch(`${API_BASE}/api/playlists/${encodeURIComponent(name)}`, {
+      method: "PUT",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ files }),
+    });
+    return handleJson(res);
+  },
+  async getSlideshow(): Promise<SlideshowState> {
+    const res = await fetch(`${API_BASE}/api/slideshow`, { cache: "no-store" });
+    return handleJson(res);
+  },
+  async configureSlideshow(
+    config: Partial<Pick<SlideshowState, "enabled" | "playlist" | "mode" | "interval">>
+  ): Promise<SlideshowState> {
+    const res = await fetch(`${API_BASE}/api/slideshow`, {
+      method: "PUT",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify(config),
+    });
+    return handleJson(res);
+  },
+  async slideshowNext() {
+    const res = await fetch(`${API_BASE}/api/slideshow/next`, { method: "POST" });
+    return handleJson(res);
+  },
   // Debug endpoints
   async debugApiVersion() {
     const res = await fetch(`${API_BASE}/api/debug/api-version`);
@@ -70,6 +221,32 @@ export const api = {
     const res = await fetch(`${API_BASE}/api/debug/tv-status`);
     return handleJson(res);
   },
+  async debugTvCalls() {
+    const res = await fetch(`${API_BASE}/api/debug/tv-calls`);
+    return handleJson(res);
+  },
+  async tvCommands() {
+    const res = await fetch(`${API_BASE}/api/tv/commands`);
+    return handleJson(res);
+  },
+  async cancelTvCommand(id: number) {
+    const res = await fetch(`${API_BASE}/api/tv/commands/${id}`, { method: "DELETE" });
+    return handleJson(res);
+  },
+  async tvArt() {
+    const res = await fetch(`${API_BASE}/api/tv/art`, { cache: "no-store" });
+    return handleJson(res);
+  },
+  async reconcileTvArt() {
+    const res = await fetch(`${API_BASE}/api/tv/art/reconcile`, { method: "POST" });
+    return handleJson(res);
+  },
+  async pinTvArt(contentId: string, pinned: boolean) {
+    const res = await fetch(`${API_BASE}/api/tv/art/${encodeURIComponent(contentId)}/pin`, {
+      method: pinned ? "POST" : "DELETE",
+    });
+    return handleJson(res);
+  },
   async debugSetArtMode(mode: "on" | "off") {
     const res = await fetch(`${API_BASE}/api/debug/set-artmode`, {
       method: "POST",